@@ -0,0 +1,165 @@
+"""
+Elo Engine Benchmark
+
+Times the array-backed `calculate_elo_season` against the previous row-wise
+(`iterrows` + `.loc`) implementation and checks that both produce bit-identical
+HomeElo/AwayElo/HomeExpected/AwayExpected columns.
+
+Fixture lists are rebuilt from the processed multi-season files, so no raw
+downloads are needed:
+1. Per season: each (division, season) run from scratch
+2. Full history: every season of every division chained with carried ratings
+
+Usage:
+    python scripts/benchmark_elo.py [--processed-dir data/processed] [--country SP,IT] [--repeat 3]
+"""
+
+import argparse
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from footai.core.elo import calculate_elo_season, expected_score, new_elo
+from footai.utils.config import PROCESSED_DIR
+
+ELO_COLUMNS = ['HomeElo', 'AwayElo', 'HomeExpected', 'AwayExpected']
+
+
+def calculate_elo_season_rowwise(matches_df, initial_elo=1500, k_factor=32, team_starting_elos=None):
+    """Reference copy of the previous iterrows-based implementation."""
+    team_elos = defaultdict(lambda: initial_elo)
+    if team_starting_elos:
+        team_elos.update(team_starting_elos)
+
+    matches_df = matches_df.copy()
+    matches_df['Date'] = pd.to_datetime(matches_df['Date'], format='%d/%m/%Y', errors='coerce')
+    output_df = matches_df.copy()
+    for col in ELO_COLUMNS:
+        output_df[col] = 0.0
+
+    for idx, match in output_df.iterrows():
+        home_team = match['HomeTeam']
+        away_team = match['AwayTeam']
+        home_elo = team_elos[home_team]
+        away_elo = team_elos[away_team]
+        home_expected = expected_score(home_elo, away_elo)
+        away_expected = expected_score(away_elo, home_elo)
+        output_df.loc[idx, 'HomeElo'] = home_elo
+        output_df.loc[idx, 'AwayElo'] = away_elo
+        output_df.loc[idx, 'HomeExpected'] = home_expected
+        output_df.loc[idx, 'AwayExpected'] = away_expected
+
+        if match['FTHG'] > match['FTAG']:
+            home_actual, away_actual = 1.0, 0.0
+        elif match['FTHG'] < match['FTAG']:
+            home_actual, away_actual = 0.0, 1.0
+        else:
+            home_actual, away_actual = 0.5, 0.5
+        team_elos[home_team] = new_elo(home_elo, home_expected, home_actual, k_factor)
+        team_elos[away_team] = new_elo(away_elo, away_expected, away_actual, k_factor)
+
+    return output_df
+
+
+def load_season_fixtures(processed_dir, countries=None):
+    """
+    Rebuild per-season fixture lists from processed multi-season Elo files.
+
+    Returns:
+        dict: division -> list of (season, DataFrame) in season order
+    """
+    fixtures = {}
+    for path in sorted(Path(processed_dir).glob('*/*_to_*.csv')):
+        if countries and path.parent.name not in countries:
+            continue
+        division = path.name.split('_')[0]
+        df = pd.read_csv(path, usecols=['Date', 'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG', 'Season'])
+        fixtures[division] = [
+            (season, season_df.drop(columns='Season').reset_index(drop=True))
+            for season, season_df in df.groupby('Season', sort=True)
+        ]
+    return fixtures
+
+
+def run_history(season_fixtures, elo_fn):
+    """Chain every season of a division, carrying final ratings forward."""
+    outputs = []
+    carry = {}
+    for _, season_df in season_fixtures:
+        out = elo_fn(season_df, team_starting_elos=carry)
+        outputs.append(out)
+        home = out.drop_duplicates('HomeTeam', keep='last')
+        carry = dict(zip(home['HomeTeam'], home['HomeElo']))
+    return outputs
+
+
+def best_of(fn, repeat):
+    """Return (best wall time, last result) over `repeat` runs."""
+    best = np.inf
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def identical(outputs_a, outputs_b):
+    """Bit-level equality of the Elo columns across paired outputs."""
+    return all(
+        np.array_equal(a[col].to_numpy(), b[col].to_numpy())
+        for a, b in zip(outputs_a, outputs_b)
+        for col in ELO_COLUMNS
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Elo engine against the row-wise implementation')
+    parser.add_argument('--processed-dir', type=Path, default=PROCESSED_DIR, help='Directory with processed multi-season files')
+    parser.add_argument('--country', type=str, default=None, help='Comma-separated country codes (default: all found)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement, best time is reported')
+    args = parser.parse_args()
+
+    countries = args.country.split(',') if args.country else None
+    fixtures = load_season_fixtures(args.processed_dir, countries)
+    if not fixtures:
+        print(f"ERROR: No multi-season files found in {args.processed_dir}")
+        return 1
+
+    print("="*70)
+    print("PER SEASON")
+    print("="*70)
+    print(f"{'Division':<10}{'Season':<8}{'Matches':>8}{'Row-wise (s)':>14}{'Engine (s)':>12}{'Speedup':>10}")
+    for division, season_fixtures in fixtures.items():
+        for season, season_df in season_fixtures:
+            t_old, _ = best_of(lambda: calculate_elo_season_rowwise(season_df), args.repeat)
+            t_new, _ = best_of(lambda: calculate_elo_season(season_df), args.repeat)
+            print(f"{division:<10}{season:<8}{len(season_df):>8}{t_old:>14.4f}{t_new:>12.4f}{t_old / t_new:>9.1f}x")
+
+    print("\n" + "="*70)
+    print("FULL HISTORY")
+    print("="*70)
+    print(f"{'Division':<10}{'Seasons':>8}{'Matches':>9}{'Row-wise (s)':>14}{'Engine (s)':>12}{'Speedup':>10}  Identical")
+    total_old = total_new = 0.0
+    all_identical = True
+    for division, season_fixtures in fixtures.items():
+        n_matches = sum(len(df) for _, df in season_fixtures)
+        t_old, out_old = best_of(lambda: run_history(season_fixtures, calculate_elo_season_rowwise), args.repeat)
+        t_new, out_new = best_of(lambda: run_history(season_fixtures, calculate_elo_season), args.repeat)
+        same = identical(out_old, out_new)
+        all_identical = all_identical and same
+        total_old += t_old
+        total_new += t_new
+        print(f"{division:<10}{len(season_fixtures):>8}{n_matches:>9}{t_old:>14.4f}{t_new:>12.4f}{t_old / t_new:>9.1f}x  {same}")
+    print("-"*70)
+    print(f"{'Total':<27}{total_old:>14.4f}{total_new:>12.4f}{total_old / total_new:>9.1f}x")
+    print("="*70)
+    print("BIT-IDENTICAL OUTPUTS" if all_identical else "OUTPUTS DIFFER")
+    return 0 if all_identical else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
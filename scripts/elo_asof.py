@@ -0,0 +1,64 @@
+"""
+Elo As-Of Lookup
+
+Answers "what was a team's rating on a given date?" from the as-of index stored
+next to a multi-season Elo file, without loading the CSV. The index is built on
+first use if the Elo command has not written it yet.
+
+Usage:
+    python scripts/elo_asof.py --country SP --division SP1 --team Sevilla --date 2019-03-02
+    python scripts/elo_asof.py --country SP --division SP1 --team Sevilla --start 2019-01-01 --end 2019-03-31
+    python scripts/elo_asof.py --country SP --division SP1 --date 2019-03-02   # all teams
+"""
+
+import argparse
+from pathlib import Path
+
+from footai.core.elo_index import load_elo_index
+from footai.utils.config import PROCESSED_DIR
+from footai.utils.paths import get_multiseason_path, parse_start_years
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Look up Elo ratings by date')
+    parser.add_argument('--country', type=str, default='SP', help='Country code')
+    parser.add_argument('--division', type=str, default='SP1', help='Division code')
+    parser.add_argument('--season-start', type=str, default='15-25', help='Season range of the multi-season file')
+    parser.add_argument('--processed-dir', type=Path, default=PROCESSED_DIR, help='Directory with processed multi-season files')
+    parser.add_argument('--no-transfer', action='store_true', help='Use the _multi file instead of the _transfer one')
+    parser.add_argument('--team', type=str, default=None, help='Team name (default: all teams)')
+    parser.add_argument('--date', type=str, default=None, help='As-of date (YYYY-MM-DD)')
+    parser.add_argument('--start', type=str, default=None, help='Range start (YYYY-MM-DD)')
+    parser.add_argument('--end', type=str, default=None, help='Range end (YYYY-MM-DD)')
+    args = parser.parse_args()
+
+    seasons = parse_start_years(args.season_start)
+    args.elo_transfer = not args.no_transfer
+    path = get_multiseason_path(Path(args.processed_dir) / args.country, args.division, seasons[0], seasons[-1], args)
+    if not path.exists():
+        print(f"ERROR: Multi-season file not found: {path}")
+        return 1
+    index = load_elo_index(path)
+
+    if args.team and args.team not in index.team_index:
+        print(f"ERROR: Unknown team '{args.team}'. Teams: {', '.join(index.teams)}")
+        return 1
+
+    if args.date:
+        ratings = {args.team: index.rating_as_of(args.team, args.date)} if args.team else index.ratings_as_of(args.date)
+        print(f"Elo ratings on {args.date} ({args.division})")
+        for team, elo in sorted(ratings.items(), key=lambda x: x[1], reverse=True):
+            print(f"  {team:<25}{elo:>10.1f}")
+    elif args.team:
+        dates, elos = index.range(args.team, args.start, args.end)
+        print(f"{args.team}: {len(dates)} matches")
+        for date, elo in zip(dates, elos):
+            print(f"  {date}  {elo:>10.1f}")
+    else:
+        print("ERROR: Pass --date, or --team with an optional --start/--end range")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,7 +1,8 @@
 """download command handler for footAI."""
 from footai.utils.paths import get_season_paths
 from footai.data.team_colors import update_team_colors
-from footai.data.match_data import download_football_data
+from footai.data.match_data import download_seasons, print_download_summary, changed_files
+from footai.data.team_registry import update_team_registry
 
           
 def execute(countries, seasons, divisions, args, dirs):
@@ -15,14 +16,20 @@ def execute(countries, seasons, divisions, args, dirs):
         run_data = False
     if run_data:
         print(f"Downloading match data for: {', '.join(countries)}")
-        for country in countries:
-            for season in seasons:
-                for division in divisions[country]:
-                    paths = get_season_paths(country, season, division, dirs, args)
-                    download_football_data(season, division, paths['raw'])
+        downloads = [
+            (season, division, get_season_paths(country, season, division, dirs, args)['raw'])
+            for country in countries for season in seasons for division in divisions[country]
+        ]
+        results = download_seasons(downloads, workers=args.jobs)
+        print_download_summary(results)
+        changed = changed_files(results)
+        for path in changed:
+            print(f"Changed: {path}")
+        # Give new teams their stable ID right after they first appear
+        update_team_registry(changed)
     if run_colors:
         print(f"Updating team colors for: {', '.join(countries)}")
         
         for country in countries:
             # Path to the raw data directory for this country
-            update_team_colors(country, dirs[country]['raw'], output_dir=dirs[country]['col'])
+            update_team_colors(country, dirs[country]['raw'], output_dir=dirs[country]['col'], refresh=args.refresh_colors)
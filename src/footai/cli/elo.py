@@ -1,29 +1,68 @@
 """elo calculation command handler for footAI."""
 
+import io
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
-from footai.utils.paths import get_season_paths
-from footai.core.elo import calculate_elo_season, calculate_elo_multiseason
+from footai.utils.paths import get_season_paths, parse_start_years
+from footai.core.elo import calculate_elo_season, calculate_elo_multiseason, append_elo_multiseason
+from footai.core.elo_global import calculate_elo_global
 
 def execute(countries, seasons, divisions, args, dirs):
     print(args.decay_factors)
 
-    for country in countries:
-        if args.multi_season:
-            print("calculating multi season")
-            calculate_elo_multiseason(seasons, divisions[country], country, dirs, decay_factors=args.decay_factors, initial_elo=1500, k_factor=32, args=args)
-        else:
-            for season in seasons:
-                for division in divisions[country]:
-                    paths = get_season_paths(country, season, division, dirs, args)
-                    df = pd.read_csv(paths['raw'])
-                    df = df[
-                        df['HomeTeam'].notna() &
-                        df['AwayTeam'].notna() &
-                        (df['HomeTeam'].astype(str).str.strip().str.lower() != 'nan') &
-                        (df['AwayTeam'].astype(str).str.strip().str.lower() != 'nan') &
-                        (df['HomeTeam'].astype(str).str.strip() != '') &
-                        (df['AwayTeam'].astype(str).str.strip() != '')
-                    ].copy()
-                    df_with_elos = calculate_elo_season(df)
-                    df_with_elos.to_csv(paths['proc'], index=False)
-                    print(f"{season} / {division} saved to {paths['proc']}")
\ No newline at end of file
+    if args.global_elo:
+        # One rating table for every country and tier, single pass over all fixtures
+        calculate_elo_global(seasons, countries, divisions, dirs, decay_factors=args.decay_factors, initial_elo=1500, k_factor=32, args=args)
+        return
+
+    jobs = min(getattr(args, 'jobs', 1) or 1, len(countries))
+    if jobs <= 1:
+        for country in countries:
+            run_country(country, seasons, divisions[country], args, dirs)
+        return
+
+    # Countries are independent chains writing to their own files, so they can run
+    # in separate processes; console output is captured and printed in country order
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(_run_country_captured, country, seasons, divisions[country], args, dirs)
+            for country in countries
+        ]
+        for country, future in zip(countries, futures):
+            print(f"\n{'='*20} {country} {'='*20}")
+            print(future.result(), end='')
+
+
+def _run_country_captured(country, seasons, divisions, args, dirs):
+    """Worker entry point: run one country and return its console output."""
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        run_country(country, seasons, divisions, args, dirs)
+    return buffer.getvalue()
+
+
+def run_country(country, seasons, divisions, args, dirs):
+    """Compute Elo ratings for every requested season and division of one country."""
+    if args.multi_season:
+        if args.incremental and append_elo_multiseason(seasons, divisions, country, dirs, decay_factors=args.decay_factors, initial_elo=1500, k_factor=32, args=args):
+            return
+        print("calculating multi season")
+        resume_from = parse_start_years(args.resume_from)[0] if args.resume_from else None
+        calculate_elo_multiseason(seasons, divisions, country, dirs, decay_factors=args.decay_factors, initial_elo=1500, k_factor=32, args=args, resume_from=resume_from)
+    else:
+        for season in seasons:
+            for division in divisions:
+                paths = get_season_paths(country, season, division, dirs, args)
+                df = pd.read_csv(paths['raw'])
+                df = df[
+                    df['HomeTeam'].notna() &
+                    df['AwayTeam'].notna() &
+                    (df['HomeTeam'].astype(str).str.strip().str.lower() != 'nan') &
+                    (df['AwayTeam'].astype(str).str.strip().str.lower() != 'nan') &
+                    (df['HomeTeam'].astype(str).str.strip() != '') &
+                    (df['AwayTeam'].astype(str).str.strip() != '')
+                ].copy()
+                df_with_elos = calculate_elo_season(df)
+                df_with_elos.to_csv(paths['proc'], index=False)
+                print(f"{season} / {division} saved to {paths['proc']}")
@@ -2,28 +2,70 @@
 
 
 import pandas as pd
-from footai.utils.paths import get_season_paths, get_multiseason_path
-from footai.ml.feature_engineering.pipeline import engineer_features, save_features
+from footai.utils.paths import get_season_paths, get_multiseason_path, get_feature_cache_dir
+from footai.ml.feature_engineering.pipeline import engineer_features, update_features, save_features
+from footai.data.team_registry import read_match_csv
+from footai.data.feature_store import load_feature_store, feature_store_exists, read_feature_schema
+from footai.data.feature_cache import feature_cache_key, restore_cached_features, store_cached_features
+from footai.ml.feature_engineering.registry import FEATURE_VERSION
 
 
 def execute(countries, seasons, divisions, args, dirs):
     for country in countries:
+        cache_dir = get_feature_cache_dir(dirs[country]['feat'])
         if args.multi_season:
             for division in divisions[country]:
                 elo_dir = get_multiseason_path(dirs[country]['proc'], division, seasons[0], seasons[-1], args)
-                df = pd.read_csv(elo_dir)
-                enriched_df = engineer_features(df, window_sizes=[3, 5], verbose=True)
                 proc_dir = get_multiseason_path(dirs[country]['feat'], division, seasons[0], seasons[-1], args)
-                save_features(enriched_df, proc_dir, verbose=True)
+                _build_features(elo_dir, proc_dir, args, cache_dir, incremental=args.incremental)
 
         else:
             for season in seasons:
                 for division in divisions[country]:
                     paths = get_season_paths(country, season, division, dirs, args)
-                    # Load your elo-enriched data
-                    df = pd.read_csv(paths['proc'])
+                    _build_features(paths['proc'], paths['feat'], args, cache_dir)
 
-                    # Engineer features
-                    enriched_df = engineer_features(df, window_sizes=[3, 5], verbose=True)
-                    # Save
-                    save_features(enriched_df, paths['feat'], verbose=True)
\ No newline at end of file
+
+def _build_features(elo_path, feat_path, args, cache_dir, incremental=False):
+    """Features of an Elo file: from the cache if its inputs are unchanged, computed otherwise."""
+    key = None
+    if not args.no_cache:
+        key = feature_cache_key(elo_path, FEATURE_VERSION, window_sizes=args.windows, draw_windows=args.draw_windows,
+                                trend_halflife=args.trend_halflife, feature_set=args.features_set)
+        if restore_cached_features(cache_dir, key, feat_path):
+            print(f"Features unchanged (cache {key[:12]}): {feat_path}")
+            if not (cache_dir / key).is_dir():
+                store_cached_features(cache_dir, key, feat_path, max_bytes=args.cache_size * 1024 ** 2)
+            return
+
+    # Load your elo-enriched data
+    df = read_match_csv(elo_path)
+    enriched_df = None
+    if incremental and feature_store_exists(feat_path):
+        enriched_df = _update_stored_features(feat_path, df, args)
+    if enriched_df is None:
+        # Engineer features
+        enriched_df = engineer_features(df, window_sizes=args.windows, verbose=True, draw_windows=args.draw_windows, trend_halflife=args.trend_halflife, feature_set=args.features_set)
+    # Save
+    # The set is recorded so training refuses a file built for another set
+    metadata = {'feature_set': args.features_set}
+    if key:
+        metadata['cache_key'] = key
+    save_features(enriched_df, feat_path, verbose=True, metadata=metadata)
+    if key:
+        evicted = store_cached_features(cache_dir, key, feat_path, max_bytes=args.cache_size * 1024 ** 2)
+        if evicted:
+            print(f"Evicted {len(evicted)} cached feature files")
+
+
+def _update_stored_features(feat_path, df, args):
+    """Stored features extended with the new matches of `df`, or None if a full run is needed."""
+    schema = read_feature_schema(feat_path)
+    if schema is None or schema.get('version') != FEATURE_VERSION:
+        print(f"Features at {feat_path} were built by another feature-code version, running full computation")
+        return None
+    if schema.get('feature_set') != args.features_set:
+        print(f"Features at {feat_path} were built for another feature set, running full computation")
+        return None
+    return update_features(load_feature_store(feat_path), df, window_sizes=args.windows, verbose=True, draw_windows=args.draw_windows,
+                           trend_halflife=args.trend_halflife, feature_set=args.features_set)
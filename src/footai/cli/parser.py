@@ -7,7 +7,7 @@ from footai.utils.config import (
     FEATURE_SETS
 )
 from footai.ml.models import MODEL_METADATA
-from footai.utils.validators import ValidateDivisionAction, validate_decay_factors
+from footai.utils.validators import ValidateDivisionAction, validate_decay_factors, validate_float_list, validate_decay_list, validate_window_list
 
 def create_parser():
     '''Create and configure the argument parser.'''
@@ -30,9 +30,27 @@ def create_parser():
     group = p_down.add_mutually_exclusive_group()
     group.add_argument('--only-data', action='store_true', help='Download match data only')
     group.add_argument('--only-colors', action='store_true', help='Download/update team colors only')
+    p_down.add_argument('--jobs', '-j', type=int, default=4, help='Number of files downloaded concurrently, sharing one connection pool (default: 4)')
+    p_down.add_argument('--refresh-colors', action='store_true', help='Fetch team colors from the API even if the local cache is recent (cache is refreshed weekly otherwise)')
     p_promo = sub.add_parser('promotion-relegation', help='Identify promoted/relegated teams between seasons')
     p_elo = sub.add_parser('elo', help='Calculate ELO rankings')
+    p_elo.add_argument('--resume-from', type=str, default=None, help='Multi-season only: resume from the saved snapshot at this season start year (e.g. 24), reusing earlier rows of the existing file')
+    p_elo.add_argument('--incremental', action='store_true', help='Multi-season only: process just the matches added to the current season since the last run')
+    p_elo.add_argument('--jobs', '-j', type=int, default=1, help='Number of worker processes; countries are computed in parallel (default: 1)')
+    p_sweep = sub.add_parser('elo-sweep', help='Score a grid of Elo parameters (k-factor, decays, initial Elo) in one pass')
+    p_sweep.add_argument('--k-factors', type=validate_float_list, default=[16, 24, 32, 40], help='K-factors to evaluate (default: 16,24,32,40)')
+    p_sweep.add_argument('--tier1-decays', type=validate_decay_list, default=[0.85, 0.90, 0.95, 1.0], help='Tier 1 decay factors to evaluate (default: 0.85,0.9,0.95,1.0)')
+    p_sweep.add_argument('--tier2-decays', type=validate_decay_list, default=[0.85, 0.90, 0.95, 1.0], help='Tier 2 decay factors to evaluate (default: 0.85,0.9,0.95,1.0)')
+    p_sweep.add_argument('--initial-elos', type=validate_float_list, default=[1500], help='Initial Elo values to evaluate (default: 1500)')
+    p_sweep.add_argument('--burn-in', type=int, default=1, help='Leading seasons excluded from the scores (default: 1)')
+    p_sweep.add_argument('--top-n', type=int, default=10, help='Number of best variants to print')
     p_feat = sub.add_parser('features', help='Calculate feature analysis varialbes')
+    p_feat.add_argument('--windows', type=validate_window_list, default=[3, 5], help='Rolling window sizes in matches, computed in one pass (default: 3,5)')
+    p_feat.add_argument('--draw-windows', type=validate_window_list, default=[10], help='Windows of the team draw rates, over home/away and all matches (default: 10)')
+    p_feat.add_argument('--trend-halflife', type=float, default=None, help='Also add exponentially weighted momentum trends (*_ewtrend_L5) with this half-life in matches')
+    p_feat.add_argument('--incremental', action='store_true', help='Multi-season only: compute just the matches added to the Elo file since the last run and append them')
+    p_feat.add_argument('--no-cache', action='store_true', help='Always recompute, ignoring (and not filling) the features cache')
+    p_feat.add_argument('--cache-size', type=int, default=1024, help='Size bound of the features cache in MB; least recently used entries are evicted (default: 1024)')
     p_plot = sub.add_parser('plot', help='Plot ELO rankings')
     p_plot.add_argument('--results-json', help='Model results JSON for performance plots')
     p_plot.add_argument('--output-dir', default='figures/model_viz', help='Output directory')
@@ -43,7 +61,7 @@ def create_parser():
     p_train.add_argument('--tune-iterations', type=int, default=30, help='Number of hyperparameter combinations to try (default: 30)')
     p_train.add_argument('--no-viz', action='store_true', help='Skip automatic visualization generation')
     
-    for sp in (p_down, p_elo, p_feat, p_plot, p_promo,p_train):
+    for sp in (p_down, p_elo, p_sweep, p_feat, p_plot, p_promo,p_train):
         sp.add_argument( '--season-start', type=str, help='Season year (e.g., 2024 for 2024-25 season)', default='2024')
         sp.add_argument( '--division', '-div', action=ValidateDivisionAction, default=None, help='League division (default: First two tiers for given country)')
         sp.add_argument( '--countries', '--country', dest='countries', type=str, default='SP', help='Country code(s). Can take single entry: eg (default: SP for Spain/La Liga) or multiple ones (eg SP,IT or SP IT for both Spanish and italian data)')
@@ -56,8 +74,11 @@ def create_parser():
         sp.add_argument('-v', '--verbose', action='store_true', help='Verbose additional info')
         sp.add_argument( '--decay-factors', '-df', type=validate_decay_factors, help='Decay factors for tier1 and tier2', default={'tier1':0.95, 'tier2': 0.90})
         sp.add_argument('--elo-transfer', action='store_true', help='Transfer ELO ratings from relegated to promoted teams')
+        sp.add_argument('--global-elo', action='store_true', help='Use one Elo table for all countries and tiers (implies multi-season; must match elo command)')
         sp.add_argument('-md', '--multi-division', action='store_true', help='Train on multiple divisions (e.g., SP1+SP2).')
         sp.add_argument('-mc', '--multi-countries', action='store_true', help='Train on multiple countries (Eg SP+EN).')
+    # features computes every feature unless a set is asked for
+    p_feat.set_defaults(features_set=None)
 
     return parser
 
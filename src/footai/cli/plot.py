@@ -3,7 +3,8 @@
 from footai.utils.paths import (
     get_data_loc,
     get_season_paths,
-    get_multiseason_path
+    get_multiseason_path,
+    get_elo_suffix
 )
 from footai.utils.config import COUNTRIES
 from footai.viz.plotter import plot_elo_rankings
@@ -24,7 +25,7 @@ def execute(countries, seasons, divisions, args, dirs):
     #ELO PLOTTER
     for country in countries:
         if args.multi_season:
-            suffix = '_transfer' if args.elo_transfer else '_multi'  
+            suffix = get_elo_suffix(args)
             for division in divisions[country]:
                 path = get_multiseason_path(dirs[country]['proc'], division, seasons[0],seasons[-1], args)
                 fig = plot_elo_rankings(path, division=division, country=country, selected_seasons=seasons, custom_title=f"for {COUNTRIES[country]['divisions'][division]} ({COUNTRIES[country]['name']}, seasons {seasons[0]}-{seasons[-1]})")
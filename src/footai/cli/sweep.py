@@ -0,0 +1,34 @@
+"""Elo parameter sweep command handler for footAI."""
+
+import time
+import pandas as pd
+from footai.core.elo_sweep import build_param_grid, sweep_elo_parameters, pool_sweep_results
+from footai.utils.paths import get_elo_sweep_path
+
+
+def execute(countries, seasons, divisions, args, dirs):
+    grid = build_param_grid(args.k_factors, args.tier1_decays, args.tier2_decays, args.initial_elos)
+    print(f"Evaluating {len(grid)} Elo parameter variants over seasons {seasons[0]} to {seasons[-1]}")
+    print("ELO TRANSFER MODE:", args.elo_transfer)
+
+    all_results = []
+    for country in countries:
+        start = time.perf_counter()
+        country_results = sweep_elo_parameters(seasons, divisions[country], country, dirs, grid, args=args, burn_in=args.burn_in)
+        all_results.append(country_results)
+        print(f"{country}: scored {country_results['n_matches'].iloc[0]} matches in {time.perf_counter() - start:.1f}s")
+
+    results = pd.concat(all_results, ignore_index=True)
+    if len(countries) > 1:
+        results = pd.concat([results, pool_sweep_results(results)], ignore_index=True)
+
+    summary_country = 'ALL' if len(countries) > 1 else countries[0]
+    best = results[results['country'] == summary_country].sort_values('log_loss').head(args.top_n)
+    print("\n" + "="*70)
+    print(f"TOP {len(best)} VARIANTS BY LOG-LOSS ({summary_country})")
+    print("="*70)
+    print(best.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+
+    output_path = get_elo_sweep_path(countries, seasons, args)
+    results.to_csv(output_path, index=False)
+    print(f"\nSaved sweep results to {output_path}")
@@ -1,8 +1,14 @@
+import hashlib
+import json
+import numpy as np
 import pandas as pd
 import warnings
-from collections import defaultdict
+from pathlib import Path
 from footai.core.team_movements import load_promotion_relegation
-from footai.utils.paths import get_season_paths, get_multiseason_path
+from footai.core.elo_index import EloHistoryIndex, load_elo_index
+from footai.data.team_registry import read_match_csv
+from footai.data.match_data import file_sha256
+from footai.utils.paths import get_season_paths, get_multiseason_path, get_elo_state_path, get_elo_snapshot_path, get_elo_index_path
 warnings.filterwarnings('ignore', message='Could not infer format')
 
 def expected_score(elo_a, elo_b):
@@ -52,7 +58,187 @@ def apply_rating_transfer(target_teams_list, source_teams_data, target_division,
             print(f" {target_division}: {target_team} inherits {source_elo:.1f} -> {decayed_elo:.1f} from {source_team}")
 
 
-def calculate_elo_season(matches_df, initial_elo=1500, k_factor=32, team_starting_elos=None):
+def apply_promotion_transfers(promo_relego_df, tier1_final_elos, tier2_final_elos, team_elos_carry, divisions, decay_factors, initial_elo=1500, verbose=False):
+    """
+    Seed teams that changed tier with the decayed ratings of the teams they replace.
+
+    The tier 1 <-> tier 2 swap and the tier 3 -> tier 2 transfer are independent:
+    each runs whenever its own teams moved, also in seasons without tier 2 relegations.
+
+    Args:
+        promo_relego_df: Promotion/relegation table (columns: tier, team, status)
+        tier1_final_elos, tier2_final_elos: End-of-season ratings of the previous season per tier
+        team_elos_carry: Dict division -> {team: rating} updated in place
+        divisions: [tier1_division, tier2_division]
+        decay_factors: Dict with 'tier1' and 'tier2' decay
+        initial_elo: Rating for unknown teams, also the regression point of the decay
+    """
+    relegated_t1 = promo_relego_df[(promo_relego_df['status']=='relegated') & (promo_relego_df['tier']=='tier1')]['team'].tolist()
+    promoted_t1 = promo_relego_df[(promo_relego_df['status']=='promoted') & (promo_relego_df['tier']=='tier1')]['team'].tolist()
+    
+    relegated_t2 = promo_relego_df[(promo_relego_df['status']=='relegated') & (promo_relego_df['tier']=='tier2')]['team'].tolist()
+    promoted_t2 = promo_relego_df[(promo_relego_df['status']=='promoted') & (promo_relego_df['tier']=='tier2')]['team'].tolist()
+
+    # T1 Relegated
+    relegated_data_t1 = [(team, tier1_final_elos.get(team, initial_elo)) for team in relegated_t1]
+    # T1 Promoted
+    promoted_data_t1 = [(team, tier2_final_elos.get(team, initial_elo)) for team in promoted_t1]
+    # T2 Relegated
+    relegated_data_t2 = [(team, tier2_final_elos.get(team, initial_elo)) for team in relegated_t2]
+
+    # Transfer Relegated -> Promoted (Entering T1)
+    apply_rating_transfer(
+        target_teams_list=promoted_data_t1,
+        source_teams_data=relegated_data_t1,
+        target_division=divisions[0],
+        team_elos_carry=team_elos_carry,
+        decay=decay_factors['tier1'],
+        regression_point=initial_elo,
+        verbose=verbose
+    )
+
+    # Transfer Promoted -> Relegated (Entering T2)
+    apply_rating_transfer(
+        target_teams_list=relegated_data_t1,
+        source_teams_data=promoted_data_t1,
+        target_division=divisions[1],
+        team_elos_carry=team_elos_carry,
+        decay=decay_factors['tier2'],
+        regression_point=initial_elo,
+        verbose=verbose
+    )
+
+    # Teams arriving from tier 3 inherit the ratings of tier 2 leavers
+    apply_rating_transfer(
+        target_teams_list=promoted_t2,
+        source_teams_data=relegated_data_t2,
+        target_division=divisions[1],
+        team_elos_carry=team_elos_carry,
+        decay=decay_factors['tier2'],
+        regression_point=initial_elo,
+        verbose=verbose
+    )
+
+
+class EloEngine:
+    """
+    Array-backed Elo rating table.
+
+    Teams are mapped to integer codes once and their ratings live in a NumPy
+    array indexed by code, so a fixture list can be processed as contiguous
+    arrays instead of row-by-row DataFrame access. The per-match arithmetic is
+    the same `expected_score`/`new_elo` formula used everywhere else, applied in
+    file order, so results are bit-identical to the row-wise implementation.
+
+    Args:
+        initial_elo: Rating given to a team the first time it is seen
+        k_factor: Rating volatility (higher = more change per match)
+        team_starting_elos: Optional dict team -> rating to seed the table
+    """
+
+    def __init__(self, initial_elo=1500, k_factor=32, team_starting_elos=None):
+        self.initial_elo = initial_elo
+        self.k_factor = k_factor
+        self.team_index = {}
+        self.teams = []
+        self.ratings = np.empty(0, dtype=np.float64)
+        if team_starting_elos:
+            codes = self.encode(list(team_starting_elos.keys()))
+            self.ratings[codes] = list(team_starting_elos.values())
+
+    @staticmethod
+    def _team_key(team):
+        # Missing team names (trailing empty rows in raw files) share one slot
+        return None if pd.isna(team) else team
+
+    def encode(self, teams):
+        """
+        Map team names to integer codes, registering unseen teams at `initial_elo`.
+
+        Args:
+            teams: Sequence of team names
+
+        Returns:
+            np.ndarray of int64 codes aligned with `teams`
+        """
+        # Categorical team columns (see data.team_registry) factorize on their integer codes
+        teams = teams if isinstance(teams, pd.Categorical) else np.asarray(teams, dtype=object)
+        codes, uniques = pd.factorize(teams, use_na_sentinel=False)
+        lookup = np.empty(len(uniques), dtype=np.int64)
+        new_teams = 0
+        for i, team in enumerate(uniques):
+            key = self._team_key(team)
+            code = self.team_index.get(key)
+            if code is None:
+                code = len(self.teams)
+                self.team_index[key] = code
+                self.teams.append(key)
+                new_teams += 1
+            lookup[i] = code
+        if new_teams:
+            self.ratings = np.concatenate([self.ratings, np.full(new_teams, self.initial_elo, dtype=np.float64)])
+        return lookup[codes]
+
+    def process(self, home_teams, away_teams, home_goals, away_goals):
+        """
+        Run the Elo update over a fixture list in the given order.
+
+        Args:
+            home_teams, away_teams: Sequences of team names
+            home_goals, away_goals: Sequences of full-time goals
+
+        Returns:
+            dict of np.ndarray with pre-match 'HomeElo', 'AwayElo',
+            'HomeExpected' and 'AwayExpected' per fixture
+        """
+        home_codes = self.encode(home_teams).tolist()
+        away_codes = self.encode(away_teams).tolist()
+        home_goals = np.asarray(home_goals, dtype=np.float64)
+        away_goals = np.asarray(away_goals, dtype=np.float64)
+
+        # NaN goals compare False both ways and count as a draw, as before
+        home_actual = np.where(home_goals > away_goals, 1.0, np.where(home_goals < away_goals, 0.0, 0.5)).tolist()
+        away_actual = np.where(home_goals > away_goals, 0.0, np.where(home_goals < away_goals, 1.0, 0.5)).tolist()
+
+        n_matches = len(home_codes)
+        home_elo_out = [0.0] * n_matches
+        away_elo_out = [0.0] * n_matches
+        home_exp_out = [0.0] * n_matches
+        away_exp_out = [0.0] * n_matches
+
+        # Hot loop runs on Python floats; the array is refreshed once at the end
+        ratings = self.ratings.tolist()
+        k_factor = self.k_factor
+        for i in range(n_matches):
+            home, away = home_codes[i], away_codes[i]
+            home_elo = ratings[home]
+            away_elo = ratings[away]
+
+            home_expected = expected_score(home_elo, away_elo)
+            away_expected = expected_score(away_elo, home_elo)
+
+            home_elo_out[i] = home_elo
+            away_elo_out[i] = away_elo
+            home_exp_out[i] = home_expected
+            away_exp_out[i] = away_expected
+
+            ratings[home] = new_elo(home_elo, home_expected, home_actual[i], k_factor)
+            ratings[away] = new_elo(away_elo, away_expected, away_actual[i], k_factor)
+        self.ratings = np.array(ratings, dtype=np.float64)
+
+        return {
+            'HomeElo': np.array(home_elo_out, dtype=np.float64),
+            'AwayElo': np.array(away_elo_out, dtype=np.float64),
+            'HomeExpected': np.array(home_exp_out, dtype=np.float64),
+            'AwayExpected': np.array(away_exp_out, dtype=np.float64),
+        }
+
+    def final_ratings(self):
+        """Current rating of every known team as a plain dict team -> rating."""
+        return {team: rating for team, rating in zip(self.teams, self.ratings.tolist()) if team is not None}
+
+
+def calculate_elo_season(matches_df, initial_elo=1500, k_factor=32, team_starting_elos=None, return_state=False):
     """
     Calculate ELO ratings for all teams based on match results.
     
@@ -60,175 +246,147 @@ def calculate_elo_season(matches_df, initial_elo=1500, k_factor=32, team_startin
     - matches_df: DataFrame with columns: Date, HomeTeam, AwayTeam, FTHG (Full time home goals), FTAG (full time away goals)
     - initial_elo: Starting ELO for all teams (default: 1500)
     - k_factor: Rating volatility (default: 32, higher = more change per match)
+    - team_starting_elos: Optional dict team -> rating carried over from a previous season
+    - return_state: Also return the post-match rating of every team (default: False)
     
     Returns:
-    - dict: Team name -> list of (date, elo) tuples
     - DataFrame: Original data with added ELO columns
+    - dict (only if return_state): Team name -> rating after the last processed match
     """
-    
-    # Initialize ELO ratings
-    team_elos = defaultdict(lambda: initial_elo)
-    if team_starting_elos:
-        team_elos.update(team_starting_elos)
-    team_history = defaultdict(list)
-    
-    # Sort chronologically
     # Convert Date to datetime (handle format properly)
-    matches_df = matches_df.copy()
-    matches_df['Date'] = pd.to_datetime(matches_df['Date'], format='%d/%m/%Y', errors='coerce')
-    
-    # Create output with ELO columns
     output_df = matches_df.copy()
-    output_df['HomeElo'] = 0.0
-    output_df['AwayElo'] = 0.0
-    output_df['HomeExpected'] = 0.0
-    output_df['AwayExpected'] = 0.0
-    
-    # Process each match
-    for idx, match in output_df.iterrows():
-        home_team = match['HomeTeam']
-        away_team = match['AwayTeam']
-        
-        # Pre-match ELO values
-        home_elo = team_elos[home_team]
-        away_elo = team_elos[away_team]
-        
-        # Expected probabilities
-        home_expected = expected_score(home_elo, away_elo)
-        away_expected = expected_score(away_elo, home_elo)
-        
-        # Store pre-match values
-        output_df.loc[idx, 'HomeElo'] = home_elo
-        output_df.loc[idx, 'AwayElo'] = away_elo
-        output_df.loc[idx, 'HomeExpected'] = home_expected
-        output_df.loc[idx, 'AwayExpected'] = away_expected
-        
-        # Determine actual result
-        home_goals = match['FTHG']
-        away_goals = match['FTAG']
-        
-        if home_goals > away_goals:
-            home_actual, away_actual = 1.0, 0.0
-        elif home_goals < away_goals:
-            home_actual, away_actual = 0.0, 1.0
-        else:
-            home_actual, away_actual = 0.5, 0.5
-        
-        # Calculate new ELO ratings
-        new_home_elo = new_elo(home_elo, home_expected, home_actual)
-        new_away_elo = new_elo(away_elo, away_expected, away_actual)
-        
-        # Update for next match
-        team_elos[home_team] = new_home_elo
-        team_elos[away_team] = new_away_elo
-        
-        # Store history
-        team_history[home_team].append((match['Date'], new_home_elo))
-        team_history[away_team].append((match['Date'], new_away_elo))
+    output_df['Date'] = pd.to_datetime(output_df['Date'], format='%d/%m/%Y', errors='coerce')
+
+    engine = EloEngine(initial_elo=initial_elo, k_factor=k_factor, team_starting_elos=team_starting_elos)
+    elo_columns = engine.process(
+        output_df['HomeTeam'].array,
+        output_df['AwayTeam'].array,
+        output_df['FTHG'].to_numpy(),
+        output_df['FTAG'].to_numpy(),
+    )
+    # Pre-match values for every row, assigned once
+    for col, values in elo_columns.items():
+        output_df[col] = values
 
+    if return_state:
+        return output_df, engine.final_ratings()
     return output_df
 
-def calculate_elo_multiseason(seasons, divisions, country, dirs, decay_factors={'tier1':0.95, 'tier2': 0.95}, initial_elo=1500, k_factor=32, args=None):
+def calculate_elo_multiseason(seasons, divisions, country, dirs, decay_factors={'tier1':0.95, 'tier2': 0.95}, initial_elo=1500, k_factor=32, args=None, resume_from=None):
     """
     Process Elo ratings across multiple seasons with continuity and decay.
     
     Carries forward team Elo between seasons with decay factor to reflect
-    that team strength degrades slightly during off-season.
+    that team strength degrades slightly during off-season. The carried rating
+    is the one after each team's last match, taken from the engine's table.
+
+    The rating state at every season boundary is written to a snapshot, so a
+    later run can pass `resume_from` (a season code) and only read the raw
+    files from that season onward. Rows of earlier seasons are taken from the
+    existing multi-season file. If the decay factors (or other parameters)
+    differ from the snapshot, the boundary is rebuilt from the stored
+    end-of-season ratings, so the new decay applies from `resume_from` on.
     """
     
     regression_point = initial_elo
     team_elos_carry = {div: {} for div in divisions}  # Track per division
+    prev_final_elos = {div: {} for div in divisions}  # Pre-decay ratings at the end of the previous season
 
     all_season_dfs = {div: [] for div in divisions}
+    last_states = {}  # Live ratings at the end of the last season, for --incremental
 
     print("ELO TRANSFER MODE:", args.elo_transfer)
     tier1_final_elos = None
     tier2_final_elos = None
+    start_idx = 0
+    snapshot_params = {
+        'decay_factors': decay_factors,
+        'initial_elo': initial_elo,
+        'k_factor': k_factor,
+        'elo_transfer': args.elo_transfer,
+    }
+    resume_point = load_resume_point(resume_from, seasons, divisions, country, dirs, args) if resume_from else None
+    if resume_point is not None:
+        snapshot, earlier_season_dfs = resume_point
+        start_idx = seasons.index(resume_from)
+        print(f"Resuming {country} from snapshot at season {resume_from}")
+        for division in divisions:
+            all_season_dfs[division].append(earlier_season_dfs[division])
+            prev_final_elos[division] = snapshot['final'][division]
+        tier1_final_elos = prev_final_elos[divisions[0]]
+        if len(divisions) > 1:
+            tier2_final_elos = prev_final_elos[divisions[1]]
+        if all(snapshot[key] == value for key, value in snapshot_params.items()):
+            team_elos_carry = snapshot['start']
+        else:
+            # Parameters changed: redo decay here and let the transfer below run again
+            for div_idx, division in enumerate(divisions):
+                decay_factor = decay_factors.get(f'tier{div_idx + 1}', 0.95)
+                team_elos_carry[division] = {
+                    team: regression_point + (elo - regression_point) * decay_factor
+                    for team, elo in prev_final_elos[division].items()
+                }
+            snapshot = None
+
     for season_idx, season in enumerate(seasons):
+        if season_idx < start_idx:
+            continue
         tier1_final_elos_this_season = None
         tier2_final_elos_this_season = None
 
          # if we have previous season data and the flag is on, do ELO transfer
-        if args.elo_transfer and season_idx > 0 and len(divisions) == 2:
+        resumed_boundary = resume_point is not None and snapshot is not None and season_idx == start_idx
+        if args.elo_transfer and season_idx > 0 and len(divisions) == 2 and not resumed_boundary:
             promo_relego_df = load_promotion_relegation(season, country, dirs)
             if args.verbose: print(promo_relego_df)
             if promo_relego_df is not None:
                 if tier1_final_elos is None or tier2_final_elos is None:
                     print("Skipping ELO transfer because previous season data missing")
                 else:
-                    relegated_t1 = promo_relego_df[(promo_relego_df['status']=='relegated') & (promo_relego_df['tier']=='tier1')]['team'].tolist()
-                    promoted_t1 = promo_relego_df[(promo_relego_df['status']=='promoted') & (promo_relego_df['tier']=='tier1')]['team'].tolist()
-                    
-                    relegated_t2 = promo_relego_df[(promo_relego_df['status']=='relegated') & (promo_relego_df['tier']=='tier2')]['team'].tolist()
-                    promoted_t2 = promo_relego_df[(promo_relego_df['status']=='promoted') & (promo_relego_df['tier']=='tier2')]['team'].tolist()
-                    relegated_data_t1 = []
-
-                    for team in relegated_t1:
-                        elo = tier1_final_elos.get(team, initial_elo)
-                        relegated_data_t1.append((team, elo))
-                        
-                    # T1 Promoted
-                    promoted_data_t1 = []
-                    for team in promoted_t1:
-                        elo = tier2_final_elos.get(team, initial_elo)
-                        promoted_data_t1.append((team, elo))
-
-                    # T2 Relegated
-                    relegated_data_t2 = []
-                    for team in relegated_t2:
-                        elo = tier2_final_elos.get(team, initial_elo)
-                        relegated_data_t2.append((team, elo))
-                    # Transfer Relegated -> Promoted (Entering T1)
-                        apply_rating_transfer(
-                            target_teams_list=promoted_data_t1,
-                            source_teams_data=relegated_data_t1,
-                            target_division=divisions[0],
-                            team_elos_carry=team_elos_carry,
-                            decay=decay_factors['tier1'],
-                            verbose=args.verbose
-                        )
-                        
-                        # Transfer Promoted -> Relegated (Entering T2)
-                        apply_rating_transfer(
-                            target_teams_list=relegated_data_t1,
-                            source_teams_data=promoted_data_t1,
-                            target_division=divisions[1],
-                            team_elos_carry=team_elos_carry,
-                            decay=decay_factors['tier2'],
-                            verbose=args.verbose
-                        )
-                            
-                        apply_rating_transfer(
-                            target_teams_list=promoted_t2,
-                            source_teams_data=relegated_data_t2,
-                            target_division=divisions[1],
-                            team_elos_carry=team_elos_carry,
-                            decay=decay_factors['tier2'],
-                            verbose=args.verbose
-                        )
+                    apply_promotion_transfers(
+                        promo_relego_df,
+                        tier1_final_elos,
+                        tier2_final_elos,
+                        team_elos_carry,
+                        divisions,
+                        decay_factors,
+                        initial_elo=initial_elo,
+                        verbose=args.verbose
+                    )
+
+        save_elo_snapshot(
+            dict(snapshot_params, country=country, season=season, final=prev_final_elos, start=team_elos_carry),
+            get_elo_snapshot_path(dirs, country, season, args)
+        )
 
         for div_idx, division in enumerate(divisions):
             tier_key = f'tier{div_idx + 1}'
             decay_factor = decay_factors.get(tier_key, 0.95)
             paths = get_season_paths(country, season, division, dirs, args)
             
-            df = pd.read_csv(paths['raw'])
-            df['Date'] = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce')
+            df = read_raw_season(paths['raw'])
 
-            df_with_elos = calculate_elo_season(df, initial_elo=initial_elo,k_factor=k_factor, team_starting_elos=team_elos_carry[division])
+            df_with_elos, season_state = calculate_elo_season(df, initial_elo=initial_elo,k_factor=k_factor, team_starting_elos=team_elos_carry[division], return_state=True)
             df_with_elos['Season'] = season
+            last_states[division] = {
+                'season': season,
+                'raw_rows': len(df),
+                'raw_key_hash': fixture_key_hash(df),
+                'raw_sha256': file_sha256(paths['raw']),
+                **snapshot_params,
+                'ratings': season_state,
+            }
             dates = df_with_elos['Date']
             if args.verbose: print(f"{season},  - {dates.min()} to {dates.max()} ({len(df)} matches)")
             all_season_dfs[division].append(df_with_elos)
-            # Extract and decay
-            final_elos = {
-                team: df_with_elos[df_with_elos['HomeTeam'] == team].iloc[-1]['HomeElo']
-                for team in df_with_elos['HomeTeam'].dropna().unique()
-            }
+            # Post-season ratings of the teams that played this season, then decay
+            season_teams = pd.concat([df_with_elos['HomeTeam'], df_with_elos['AwayTeam']]).dropna().unique()
+            final_elos = {team: season_state[team] for team in season_teams}
             team_elos_carry[division]= {
                 team: regression_point + (elo - regression_point) * decay_factor
                 for team, elo in final_elos.items()
             }
+            prev_final_elos[division] = final_elos
             if division == divisions[0]:
                 tier1_final_elos_this_season = final_elos.copy()
             else:
@@ -247,8 +405,159 @@ def calculate_elo_multiseason(seasons, divisions, country, dirs, decay_factors={
             # Save with multi-season naming
             multi_season_file = get_multiseason_path(dirs[country]['proc'], division, seasons[0],seasons[-1], args)
             combined_df.to_csv(multi_season_file, index=False)
+            save_elo_state(last_states[division], get_elo_state_path(multi_season_file))
+            EloHistoryIndex.from_elo_frame(combined_df, k_factor=k_factor).save(get_elo_index_path(multi_season_file))
             
             print(f"\nCombined multi-season file: {multi_season_file}")
             print(f"  Total matches: {len(combined_df)}")
             print(f"  Seasons: {seasons[0]} to {seasons[-1]}")
-       
+
+
+def read_raw_season(raw_path):
+    """Load a raw season CSV with dates parsed the way the multi-season chain expects."""
+    df = read_match_csv(raw_path)
+    df['Date'] = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce')
+    return df
+
+
+def fixture_key_hash(df):
+    """Fingerprint of the (Date, HomeTeam, AwayTeam) keys, used to detect edits to already processed rows."""
+    row_hashes = pd.util.hash_pandas_object(df[['Date', 'HomeTeam', 'AwayTeam']], index=False)
+    return hashlib.sha256(row_hashes.to_numpy().tobytes()).hexdigest()
+
+
+def save_elo_state(state, path):
+    """Save the end-of-file rating state of a multi-season Elo file to JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+
+
+def load_elo_state(path):
+    """Load a previously saved rating state, or None if it does not exist."""
+    if not Path(path).exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_elo_snapshot(snapshot, path):
+    """Save the rating state at a season boundary as compact JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, separators=(',', ':'), ensure_ascii=False)
+
+
+def load_elo_snapshot(path):
+    """Load a season-boundary snapshot, or None if it does not exist."""
+    if not Path(path).exists():
+        print(f"  File not found: {path}")
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_resume_point(resume_from, seasons, divisions, country, dirs, args):
+    """
+    Collect what is needed to resume a multi-season run at `resume_from`.
+
+    Returns:
+        tuple: (snapshot dict, dict division -> DataFrame with the rows of the
+        seasons before `resume_from` from the existing multi-season file),
+        or None if the snapshot or the existing file is missing
+    """
+    if resume_from not in seasons[1:]:
+        print(f"Cannot resume from {resume_from}: not one of seasons {seasons[1:]}")
+        return None
+    snapshot = load_elo_snapshot(get_elo_snapshot_path(dirs, country, resume_from, args))
+    if snapshot is None or any(division not in snapshot['final'] for division in divisions):
+        print(f"No usable Elo snapshot for {country} {resume_from}, running all seasons")
+        return None
+
+    earlier_seasons = seasons[:seasons.index(resume_from)]
+    earlier_season_dfs = {}
+    for division in divisions:
+        multi_season_file = get_multiseason_path(dirs[country]['proc'], division, seasons[0], seasons[-1], args)
+        if not multi_season_file.exists():
+            print(f"  File not found: {multi_season_file}, running all seasons")
+            return None
+        existing = pd.read_csv(multi_season_file, low_memory=False, float_precision='round_trip')
+        existing['Season'] = existing['Season'].astype(str)
+        existing['Date'] = pd.to_datetime(existing['Date'])
+        earlier_season_dfs[division] = existing[existing['Season'].isin(earlier_seasons)]
+    return snapshot, earlier_season_dfs
+
+
+def append_elo_multiseason(seasons, divisions, country, dirs, decay_factors={'tier1':0.95, 'tier2': 0.95}, initial_elo=1500, k_factor=32, args=None):
+    """
+    Append matches published since the last run to the multi-season Elo files.
+
+    Resumes from the rating state saved by `calculate_elo_multiseason` and runs
+    the Elo update only over raw rows of the current season that were not
+    processed yet, so a weekly refresh costs as much as the new matchday.
+    Nothing is written unless every division can be updated this way.
+
+    Returns:
+        bool: True if the files are up to date, False if a full recomputation
+        is needed (missing state, other parameters, new season, edited raw rows
+        or new columns)
+    """
+    season = seasons[-1]
+    run_params = {
+        'decay_factors': decay_factors,
+        'initial_elo': initial_elo,
+        'k_factor': k_factor,
+        'elo_transfer': args.elo_transfer,
+    }
+    pending = []
+    for division in divisions:
+        multi_season_file = get_multiseason_path(dirs[country]['proc'], division, seasons[0], seasons[-1], args)
+        state_path = get_elo_state_path(multi_season_file)
+        state = load_elo_state(state_path)
+        if state is None or not multi_season_file.exists():
+            print(f"{division}: no saved Elo state, running full computation")
+            return False
+        if state['season'] != season:
+            print(f"{division}: saved state is for season {state['season']}, running full computation")
+            return False
+        changed = [key for key, value in run_params.items() if state.get(key) != value]
+        if changed:
+            print(f"{division}: saved state was built with other {', '.join(changed)}, running full computation")
+            return False
+
+        raw_path = get_season_paths(country, season, division, dirs, args)['raw']
+        raw_sha256 = file_sha256(raw_path)
+        if raw_sha256 == state.get('raw_sha256'):
+            # Same bytes as last run (e.g. the download got a 304): nothing to parse or append
+            print(f"{division}: up to date (raw file unchanged)")
+            continue
+        df = read_raw_season(raw_path)
+        processed_rows = state['raw_rows']
+        if len(df) < processed_rows or fixture_key_hash(df.iloc[:processed_rows]) != state['raw_key_hash']:
+            print(f"{division}: already processed rows of {season} changed, running full computation")
+            return False
+
+        header = pd.read_csv(multi_season_file, nrows=0).columns
+        new_columns = set(df.columns) - set(header) - {'HomeElo', 'AwayElo', 'HomeExpected', 'AwayExpected', 'Season'}
+        if new_columns and len(df) > processed_rows:
+            print(f"{division}: new raw columns {sorted(new_columns)}, running full computation")
+            return False
+        pending.append((division, multi_season_file, state_path, state, df, header, raw_sha256))
+
+    for division, multi_season_file, state_path, state, df, header, raw_sha256 in pending:
+        new_matches = df.iloc[state['raw_rows']:]
+        if new_matches.empty:
+            print(f"{division}: up to date ({state['raw_rows']} matches in {season})")
+            state['raw_sha256'] = raw_sha256
+            save_elo_state(state, state_path)
+            continue
+
+        new_with_elos, ratings = calculate_elo_season(new_matches, initial_elo=initial_elo, k_factor=k_factor, team_starting_elos=state['ratings'], return_state=True)
+        new_with_elos['Season'] = season
+        previous_index = load_elo_index(multi_season_file, k_factor=k_factor)
+        new_with_elos.reindex(columns=header).to_csv(multi_season_file, mode='a', header=False, index=False)
+        index = EloHistoryIndex.concat([previous_index, EloHistoryIndex.from_elo_frame(new_with_elos, k_factor=k_factor)])
+        index.save(get_elo_index_path(multi_season_file))
+
+        state.update(raw_rows=len(df), raw_key_hash=fixture_key_hash(df), raw_sha256=raw_sha256, ratings=ratings)
+        save_elo_state(state, state_path)
+        print(f"{division}: appended {len(new_matches)} new matches to {multi_season_file}")
+    return True
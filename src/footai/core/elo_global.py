@@ -0,0 +1,104 @@
+"""
+Global Elo engine across countries and tiers.
+
+Instead of one chain per country with a rating dict per division, a single
+`EloEngine` holds every team of every league. Each season's fixtures from all
+countries and tiers are merged and processed in date order in one call, and
+each raw file is read once.
+
+Promotion and relegation need no transfer step: a team keeps its own rating
+entry and simply shows up in another division's fixtures. Teams seen for the
+first time (e.g. arriving from tier 3) start at `initial_elo`.
+
+At each season boundary, teams that played the season regress towards
+`initial_elo` with the decay factor of the tier they played in; teams that
+did not play keep their rating until they reappear.
+"""
+
+import numpy as np
+import pandas as pd
+from footai.core.elo import EloEngine, read_raw_season
+from footai.core.elo_index import EloHistoryIndex
+from footai.utils.paths import get_season_paths, get_multiseason_path, get_elo_index_path
+
+FIXTURE_COLUMNS = ['Date', 'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG']
+
+
+def calculate_elo_global(seasons, countries, divisions, dirs, decay_factors={'tier1': 0.95, 'tier2': 0.90}, initial_elo=1500, k_factor=32, args=None):
+    """
+    Process Elo ratings for all countries and tiers with one rating table.
+
+    Writes one multi-season file per division (suffix `_global`), with the same
+    columns as `calculate_elo_multiseason`, plus its as-of index.
+
+    Args:
+        seasons: List of season codes
+        countries: List of country codes
+        divisions: Dict country -> [tier1_division, tier2_division, ...]
+        dirs: Directory structure
+        decay_factors: Dict 'tier1', 'tier2', ... -> off-season decay
+        initial_elo: Rating of a team the first time it is seen, also the regression point
+        k_factor: Rating volatility
+        args: Command-line arguments
+
+    Returns:
+        EloEngine: the engine with every team's rating, decayed for the next season
+    """
+    engine = EloEngine(initial_elo=initial_elo, k_factor=k_factor)
+    files = [(country, division, div_idx + 1) for country in countries for div_idx, division in enumerate(divisions[country])]
+    all_season_dfs = {(country, division): [] for country, division, _ in files}
+
+    for season in seasons:
+        season_dfs = []
+        for file_id, (country, division, tier) in enumerate(files):
+            season_dfs.append(read_raw_season(get_season_paths(country, season, division, dirs, args)['raw']))
+
+        # All leagues of the season in one date-ordered fixture list; file order breaks ties
+        fixtures = pd.concat(
+            [df[FIXTURE_COLUMNS].assign(file_id=file_id, row=np.arange(len(df))) for file_id, df in enumerate(season_dfs)],
+            ignore_index=True
+        ).sort_values('Date', kind='stable', na_position='last')
+
+        elo_columns = engine.process(
+            fixtures['HomeTeam'].to_numpy(),
+            fixtures['AwayTeam'].to_numpy(),
+            fixtures['FTHG'].to_numpy(),
+            fixtures['FTAG'].to_numpy(),
+        )
+
+        # Scatter the results back to the rows of each raw file
+        file_ids = fixtures['file_id'].to_numpy()
+        rows = fixtures['row'].to_numpy()
+        for file_id, (country, division, tier) in enumerate(files):
+            mask = file_ids == file_id
+            order = rows[mask]
+            df = season_dfs[file_id]
+            file_columns = {}
+            for col, values in elo_columns.items():
+                file_columns[col] = np.empty(len(df), dtype=np.float64)
+                file_columns[col][order] = values[mask]
+            file_columns['Season'] = season
+            all_season_dfs[(country, division)].append(pd.concat([df, pd.DataFrame(file_columns, index=df.index)], axis=1))
+            if args.verbose: print(f"{country} {division} {season}: {len(df)} matches")
+
+        # Off-season regression, by the tier each team played in this season
+        for file_id, (country, division, tier) in enumerate(files):
+            df = season_dfs[file_id]
+            codes = engine.encode(pd.concat([df['HomeTeam'], df['AwayTeam']]).dropna().unique())
+            decay = decay_factors.get(f'tier{tier}', 0.95)
+            engine.ratings[codes] = initial_elo + (engine.ratings[codes] - initial_elo) * decay
+        print(f"Season {season}: {len(fixtures)} matches, {len(engine.teams)} teams rated")
+
+    for (country, division), season_dfs in all_season_dfs.items():
+        combined_df = pd.concat(season_dfs, ignore_index=True)
+        combined_df = combined_df.sort_values('Date').reset_index(drop=True)
+
+        multi_season_file = get_multiseason_path(dirs[country]['proc'], division, seasons[0], seasons[-1], args)
+        combined_df.to_csv(multi_season_file, index=False)
+        EloHistoryIndex.from_elo_frame(combined_df, k_factor=k_factor).save(get_elo_index_path(multi_season_file))
+
+        print(f"\nCombined multi-season file: {multi_season_file}")
+        print(f"  Total matches: {len(combined_df)}")
+        print(f"  Seasons: {seasons[0]} to {seasons[-1]}")
+
+    return engine
@@ -0,0 +1,175 @@
+"""
+As-of Elo rating index.
+
+Stores every team's rating history as a sorted, array-backed time series so a
+question like "what was Sevilla's rating on 2019-03-02?" is a binary search
+instead of a scan of the multi-season CSV. Histories share two flat arrays
+(dates, ratings); team `i` owns the slice `offsets[i]:offsets[i + 1]`, sorted
+by date. Ratings are post-match: the value stored at a match date already
+includes that match's result.
+
+The index is saved as an `.npz` file next to each multi-season Elo file
+(see `get_elo_index_path`) and loaded without pickling.
+"""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from footai.utils.paths import get_elo_index_path
+
+
+class EloHistoryIndex:
+    """
+    Per-team Elo time series with as-of and range queries.
+
+    Args:
+        teams: Team names, one per history
+        offsets: (n_teams + 1,) start of each team's slice in `dates`/`ratings`
+        dates: datetime64[D] match dates, sorted within each team
+        ratings: float64 post-match ratings aligned with `dates`
+    """
+
+    def __init__(self, teams, offsets, dates, ratings):
+        self.teams = [str(team) for team in teams]
+        self.team_index = {team: i for i, team in enumerate(self.teams)}
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        self.ratings = np.asarray(ratings, dtype=np.float64)
+
+    @classmethod
+    def from_elo_frame(cls, df, k_factor=32):
+        """
+        Build the index from a frame with Elo columns (as written by the Elo commands).
+
+        Post-match ratings are rebuilt from the pre-match HomeElo/AwayElo and
+        HomeExpected/AwayExpected with the same update as `new_elo`, so they
+        equal the engine's ratings exactly.
+
+        Args:
+            df: DataFrame with Date, HomeTeam, AwayTeam, FTHG, FTAG and the Elo columns
+            k_factor: K-factor the ratings were computed with
+        """
+        home_goals = df['FTHG'].to_numpy(dtype=np.float64)
+        away_goals = df['FTAG'].to_numpy(dtype=np.float64)
+        # NaN goals count as a draw, as in the engine
+        home_actual = np.where(home_goals > away_goals, 1.0, np.where(home_goals < away_goals, 0.0, 0.5))
+        away_actual = np.where(home_goals > away_goals, 0.0, np.where(home_goals < away_goals, 1.0, 0.5))
+        home_post = df['HomeElo'].to_numpy(dtype=np.float64) + k_factor * (home_actual - df['HomeExpected'].to_numpy(dtype=np.float64))
+        away_post = df['AwayElo'].to_numpy(dtype=np.float64) + k_factor * (away_actual - df['AwayExpected'].to_numpy(dtype=np.float64))
+
+        dates = pd.to_datetime(df['Date'], errors='coerce').to_numpy(dtype='datetime64[D]')
+        long_df = pd.DataFrame({
+            'team': pd.concat([df['HomeTeam'].astype(object), df['AwayTeam'].astype(object)], ignore_index=True),
+            'date': np.concatenate([dates, dates]),
+            'elo': np.concatenate([home_post, away_post]),
+            'order': np.concatenate([np.arange(len(df)) * 2, np.arange(len(df)) * 2 + 1]),
+        }).dropna(subset=['team', 'date'])
+        return cls._from_long(long_df.sort_values(['team', 'date', 'order'], kind='stable'))
+
+    @classmethod
+    def concat(cls, indices):
+        """Merge indices (e.g. an existing one and one built from newly appended matches)."""
+        teams = np.concatenate([np.repeat(np.array(index.teams, dtype=object), np.diff(index.offsets)) for index in indices])
+        long_df = pd.DataFrame({
+            'team': teams,
+            'date': np.concatenate([index.dates for index in indices]),
+            'elo': np.concatenate([index.ratings for index in indices]),
+        })
+        return cls._from_long(long_df.sort_values(['team', 'date'], kind='stable'))
+
+    @classmethod
+    def _from_long(cls, long_df):
+        # Rows are already sorted by team, then date
+        codes, teams = pd.factorize(long_df['team'], sort=True)
+        offsets = np.zeros(len(teams) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(codes, minlength=len(teams)))
+        return cls(list(teams), offsets, long_df['date'].to_numpy(), long_df['elo'].to_numpy())
+
+    @classmethod
+    def load(cls, path):
+        """Load an index saved with `save`."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['teams'].tolist(), data['offsets'], data['dates'], data['ratings'])
+
+    def save(self, path):
+        """Save the index as an uncompressed `.npz` file."""
+        np.savez(path, teams=np.array(self.teams, dtype=str), offsets=self.offsets, dates=self.dates, ratings=self.ratings)
+
+    def _slice(self, team):
+        i = self.team_index.get(team)
+        if i is None:
+            raise KeyError(f"Team not in Elo index: {team}")
+        return slice(self.offsets[i], self.offsets[i + 1])
+
+    def history(self, team):
+        """
+        Full rating history of a team.
+
+        Returns:
+            tuple: (dates, ratings) array views, sorted by date
+        """
+        s = self._slice(team)
+        return self.dates[s], self.ratings[s]
+
+    def rating_as_of(self, team, date):
+        """
+        Rating of `team` after all its matches played on or before `date`.
+
+        Args:
+            team: Team name
+            date: Date (string, datetime or datetime64), or an array of dates
+
+        Returns:
+            float (or array for array input); NaN before the team's first match
+        """
+        dates, ratings = self.history(team)
+        query = np.asarray(pd.to_datetime(date), dtype='datetime64[D]')
+        pos = np.searchsorted(dates, query, side='right') - 1
+        values = np.where(pos >= 0, ratings[np.maximum(pos, 0)], np.nan)
+        return float(values) if values.ndim == 0 else values
+
+    def ratings_as_of(self, date, teams=None):
+        """
+        Rating of every team (or of `teams`) as of `date`.
+
+        Returns:
+            dict: team -> rating, teams without a match before `date` are left out
+        """
+        values = {}
+        for team in (self.teams if teams is None else teams):
+            rating = self.rating_as_of(team, date)
+            if not np.isnan(rating):
+                values[team] = rating
+        return values
+
+    def range(self, team, start=None, end=None):
+        """
+        Ratings of `team` for matches with start <= date <= end (either bound optional).
+
+        Returns:
+            tuple: (dates, ratings) array views
+        """
+        dates, ratings = self.history(team)
+        lo = 0 if start is None else np.searchsorted(dates, np.datetime64(pd.to_datetime(start), 'D'), side='left')
+        hi = len(dates) if end is None else np.searchsorted(dates, np.datetime64(pd.to_datetime(end), 'D'), side='right')
+        return dates[lo:hi], ratings[lo:hi]
+
+
+def build_elo_index(multiseason_path, k_factor=32):
+    """Build and save the index of a multi-season Elo file; returns the index."""
+    df = pd.read_csv(multiseason_path, usecols=['Date', 'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG', 'HomeElo', 'AwayElo', 'HomeExpected', 'AwayExpected'], float_precision='round_trip')
+    index = EloHistoryIndex.from_elo_frame(df, k_factor=k_factor)
+    index.save(get_elo_index_path(multiseason_path))
+    return index
+
+
+def load_elo_index(multiseason_path, k_factor=32):
+    """
+    Load the index of a multi-season Elo file, (re)building it if it is missing
+    or older than the file.
+    """
+    multiseason_path = Path(multiseason_path)
+    index_path = get_elo_index_path(multiseason_path)
+    if index_path.exists() and index_path.stat().st_mtime >= multiseason_path.stat().st_mtime:
+        return EloHistoryIndex.load(index_path)
+    return build_elo_index(multiseason_path, k_factor=k_factor)
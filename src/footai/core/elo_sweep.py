@@ -0,0 +1,173 @@
+"""
+Vectorized Elo parameter sweep.
+
+Evaluates a grid of (k_factor, tier1 decay, tier2 decay, initial_elo) variants
+in one pass over the fixture list. Ratings are held in a (teams x variants)
+matrix, so every match updates all variants at once; season boundaries (decay
+and promotion transfers) reuse the same logic as `calculate_elo_multiseason`.
+Each variant is scored by the log-loss and Brier score of HomeExpected against
+the actual result (1 win, 0.5 draw, 0 loss).
+"""
+
+import itertools
+import numpy as np
+import pandas as pd
+from footai.core.elo import read_raw_season, apply_promotion_transfers
+from footai.core.team_movements import load_promotion_relegation
+from footai.utils.paths import get_season_paths
+
+PARAM_COLUMNS = ['k_factor', 'decay_tier1', 'decay_tier2', 'initial_elo']
+
+
+def build_param_grid(k_factors, tier1_decays, tier2_decays, initial_elos):
+    """Cartesian product of the parameter lists, one row per variant."""
+    grid = itertools.product(k_factors, tier1_decays, tier2_decays, initial_elos)
+    return pd.DataFrame(list(grid), columns=PARAM_COLUMNS)
+
+
+def run_season_matrix(home_codes, away_codes, home_actual, away_actual, starting_ratings, k_factors):
+    """
+    Run one season's fixtures for every variant at once.
+
+    Args:
+        home_codes, away_codes: Integer team codes per match (rows of the rating matrix)
+        home_actual, away_actual: Match scores (1, 0.5, 0) per match
+        starting_ratings: (n_teams, n_variants) ratings before the first match
+        k_factors: (n_variants,) k-factor per variant
+
+    Returns:
+        tuple: (HomeExpected, ratings) with the (n_matches, n_variants) pre-match
+        home expectations and the (n_teams, n_variants) ratings after the last match
+    """
+    ratings = starting_ratings.copy()
+    n_matches, n_variants = len(home_codes), ratings.shape[1]
+    home_expected = np.empty((n_matches, n_variants))
+
+    for i in range(n_matches):
+        home, away = home_codes[i], away_codes[i]
+        home_rating = ratings[home].copy()
+        away_rating = ratings[away].copy()
+        diff = (away_rating - home_rating) / 400
+        home_exp = 1 / (1 + 10 ** diff)
+        away_exp = 1 / (1 + 10 ** -diff)
+
+        home_expected[i] = home_exp
+        ratings[home] = home_rating + k_factors * (home_actual[i] - home_exp)
+        ratings[away] = away_rating + k_factors * (away_actual[i] - away_exp)
+
+    return home_expected, ratings
+
+
+def sweep_elo_parameters(seasons, divisions, country, dirs, grid, args=None, burn_in=1):
+    """
+    Score every parameter variant of the multi-season Elo chain for one country.
+
+    Each raw season file is read once. The first `burn_in` seasons are
+    processed but excluded from the scores, since every rating starts equal.
+
+    Args:
+        seasons: List of season codes
+        divisions: [tier1_division, tier2_division] (or a single division)
+        country: Country code
+        dirs: Directory structure
+        grid: DataFrame from `build_param_grid`
+        args: Command-line arguments (elo_transfer, verbose)
+        burn_in: Number of leading seasons left out of the scores
+
+    Returns:
+        DataFrame: grid columns plus country, n_matches, log_loss and brier
+    """
+    n_variants = len(grid)
+    k_factors = grid['k_factor'].to_numpy(dtype=np.float64)
+    initial_elos = grid['initial_elo'].to_numpy(dtype=np.float64)
+    decays = [{'tier1': d1, 'tier2': d2} for d1, d2 in zip(grid['decay_tier1'], grid['decay_tier2'])]
+
+    # Same per-variant state as calculate_elo_multiseason keeps for a single run
+    team_elos_carry = [{div: {} for div in divisions} for _ in range(n_variants)]
+    prev_final_elos = None
+
+    log_loss_sum = np.zeros(n_variants)
+    brier_sum = np.zeros(n_variants)
+    n_scored = 0
+
+    for season_idx, season in enumerate(seasons):
+        if args.elo_transfer and prev_final_elos is not None and len(divisions) == 2:
+            promo_relego_df = load_promotion_relegation(season, country, dirs)
+            if promo_relego_df is not None:
+                for variant in range(n_variants):
+                    apply_promotion_transfers(
+                        promo_relego_df,
+                        prev_final_elos[variant][divisions[0]],
+                        prev_final_elos[variant][divisions[1]],
+                        team_elos_carry[variant],
+                        divisions,
+                        decays[variant],
+                        initial_elo=initial_elos[variant]
+                    )
+
+        season_final_elos = [{} for _ in range(n_variants)]
+        for div_idx, division in enumerate(divisions):
+            tier_key = f'tier{div_idx + 1}'
+            paths = get_season_paths(country, season, division, dirs, args)
+            df = read_raw_season(paths['raw'])
+            n_matches = len(df)
+
+            teams = pd.concat([df['HomeTeam'], df['AwayTeam']], ignore_index=True)
+            codes, uniques = pd.factorize(teams, use_na_sentinel=False)
+            home_codes, away_codes = codes[:n_matches].tolist(), codes[n_matches:].tolist()
+            team_pos = {team: pos for pos, team in enumerate(uniques) if not pd.isna(team)}
+
+            starting = np.tile(initial_elos, (len(uniques), 1))
+            for variant in range(n_variants):
+                for team, rating in team_elos_carry[variant][division].items():
+                    pos = team_pos.get(team)
+                    if pos is not None:
+                        starting[pos, variant] = rating
+
+            home_goals = df['FTHG'].to_numpy(dtype=np.float64)
+            away_goals = df['FTAG'].to_numpy(dtype=np.float64)
+            home_actual = np.where(home_goals > away_goals, 1.0, np.where(home_goals < away_goals, 0.0, 0.5))
+            away_actual = 1.0 - home_actual
+            home_expected, final_ratings = run_season_matrix(home_codes, away_codes, home_actual.tolist(), away_actual.tolist(), starting, k_factors)
+
+            if season_idx >= burn_in:
+                scored = ~(np.isnan(home_goals) | np.isnan(away_goals))
+                outcome = home_actual[scored][:, None]
+                prob = np.clip(home_expected[scored], 1e-15, 1 - 1e-15)
+                log_loss_sum -= (outcome * np.log(prob) + (1 - outcome) * np.log(1 - prob)).sum(axis=0)
+                brier_sum += ((prob - outcome) ** 2).sum(axis=0)
+                n_scored += int(scored.sum())
+
+            # Carry-over mirrors the single-run chain: post-season rating, then decay
+            season_teams = list(team_pos)
+            final_matrix = final_ratings[list(team_pos.values())]
+            decay = np.array([d[tier_key] for d in decays])
+            decayed_matrix = initial_elos + (final_matrix - initial_elos) * decay
+            for variant in range(n_variants):
+                season_final_elos[variant][division] = dict(zip(season_teams, final_matrix[:, variant].tolist()))
+                team_elos_carry[variant][division] = dict(zip(season_teams, decayed_matrix[:, variant].tolist()))
+
+            if args.verbose:
+                print(f"{country} {division} {season}: {n_matches} matches x {n_variants} variants")
+
+        prev_final_elos = season_final_elos
+
+    results = grid.copy()
+    results.insert(0, 'country', country)
+    results['n_matches'] = n_scored
+    results['log_loss'] = log_loss_sum / n_scored if n_scored else np.nan
+    results['brier'] = brier_sum / n_scored if n_scored else np.nan
+    return results
+
+
+def pool_sweep_results(results):
+    """Combine per-country sweep results into match-weighted scores per variant."""
+    weighted = results.assign(
+        log_loss=results['log_loss'] * results['n_matches'],
+        brier=results['brier'] * results['n_matches'],
+    )
+    pooled = weighted.groupby(PARAM_COLUMNS, as_index=False)[['n_matches', 'log_loss', 'brier']].sum()
+    pooled['log_loss'] /= pooled['n_matches']
+    pooled['brier'] /= pooled['n_matches']
+    pooled.insert(0, 'country', 'ALL')
+    return pooled
@@ -1,7 +1,147 @@
-import os
+import json
 import pandas as pd
+from pathlib import Path
 from footai.utils.config import COUNTRIES
-from footai.utils.paths import get_season_paths, get_promotion_relegation_file
+from footai.utils.paths import get_season_paths, get_promotion_relegation_file, get_roster_index_path, get_previous_season
+from footai.data.team_registry import get_team_registry
+
+ROSTER_INDEX_FORMAT = 2
+
+def load_roster_index(seasons, country, dirs, args, registry=None):
+    """
+    Team rosters (season x division -> set of team IDs) from the cached roster index.
+
+    The index is stored next to the raw data (see `get_roster_index_path`).
+    A raw file is parsed only if it is new or changed since it was indexed
+    (size or modification time), and then only its HomeTeam column.
+    The index keeps team names, encoded with `registry` on load, so it stays
+    valid whatever IDs the registry gives out.
+
+    Args:
+        seasons: Season codes to return rosters for
+        country: Country code
+        registry: TeamRegistry for the IDs (default: the shared one)
+
+    Returns:
+        dict: (season, division) -> set of team IDs, for raw files that exist
+    """
+    registry = registry or get_team_registry()
+    index_path = get_roster_index_path(dirs, country)
+    index = {'format': ROSTER_INDEX_FORMAT, 'files': {}}
+    if index_path.exists():
+        with open(index_path, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        # Older indexes hold registry IDs, which are not checked against the registry: rebuild them
+        if stored.get('format') == ROSTER_INDEX_FORMAT:
+            index = stored
+
+    rosters = {}
+    changed = False
+    for season in seasons:
+        for division in COUNTRIES[country]['divisions']:
+            raw_path = Path(get_season_paths(country, season, division, dirs, args)['raw'])
+            if not raw_path.exists():
+                continue
+            stat = raw_path.stat()
+            entry = index['files'].get(raw_path.name)
+            stale = (
+                entry is None
+                or entry['size'] != stat.st_size
+                or entry['mtime_ns'] != stat.st_mtime_ns
+            )
+            if stale:
+                teams = pd.read_csv(raw_path, usecols=['HomeTeam'])['HomeTeam'].dropna().unique()
+                entry = {
+                    'season': season,
+                    'division': division,
+                    'size': stat.st_size,
+                    'mtime_ns': stat.st_mtime_ns,
+                    'teams': sorted(str(team) for team in teams),
+                }
+                index['files'][raw_path.name] = entry
+                changed = True
+            rosters[(season, division)] = set(registry.encode(entry['teams']).tolist())
+
+    if changed:
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=1, ensure_ascii=False)
+    return rosters
+
+
+def identify_promotions_relegations(seasons, country, dirs, args, prev_seasons=None, registry=None):
+    """
+    Identify promoted and relegated teams for every season in one pass over the roster index.
+
+    Args:
+        seasons: Season codes to compare with their previous season
+        country: Country code (e.g., 'SP')
+        prev_seasons: Season each one is compared with (default: the season before)
+
+    Returns:
+        dict: season -> pd.DataFrame with columns [season, tier, team, status],
+        or None when the previous season's rosters are missing
+    """
+    registry = registry or get_team_registry()
+    prev_seasons = prev_seasons or [get_previous_season(season) for season in seasons]
+    rosters = load_roster_index(sorted(set(seasons) | set(prev_seasons)), country, dirs, args, registry=registry)
+    divisions = list(COUNTRIES[country]['divisions'].keys())
+    tier1_div = divisions[0]  # e.g., 'SP1' for Spain
+    tier2_div = divisions[1]  # e.g., 'SP2' for Spain
+
+    results = {}
+    for season, prev_season in zip(seasons, prev_seasons):
+        missing = [div for div in (tier1_div, tier2_div) if (prev_season, div) not in rosters]
+        if missing:
+            print(f" WARNING: Previous season data not found: {get_season_paths(country, prev_season, missing[0], dirs, args)['raw']}")
+            print(f"   Skipping promotion-relegation for season {season}")
+            print(f"   To identify promotions/relegations, download season {prev_season} first:")
+            print(f"   footai download --country {country} --div {tier1_div},{tier2_div} --season-start {prev_season}")
+            results[season] = None
+            continue
+        missing = [div for div in (tier1_div, tier2_div) if (season, div) not in rosters]
+        if missing:
+            print(f" WARNING: Season data not found: {get_season_paths(country, season, missing[0], dirs, args)['raw']}")
+            print(f"   Skipping promotion-relegation for season {season}")
+            results[season] = None
+            continue
+
+        teams_prev_tier1 = rosters[(prev_season, tier1_div)]
+        teams_prev_tier2 = rosters[(prev_season, tier2_div)]
+        teams_curr_tier1 = rosters[(season, tier1_div)]
+        teams_curr_tier2 = rosters[(season, tier2_div)]
+
+        # Identify promotions and relegations
+        movements = [
+            ('tier1', 'relegated', teams_prev_tier1 - teams_curr_tier1),
+            ('tier1', 'promoted', teams_curr_tier1 - teams_prev_tier1),
+            ('tier2', 'relegated', teams_prev_tier2 - teams_curr_tier2),
+            ('tier2', 'promoted', teams_curr_tier2 - teams_prev_tier2),
+        ]
+        # Names sorted within each group so the file (and blind T3->T2 transfers) are reproducible
+        results_df = pd.DataFrame(
+            [
+                {'season': f"{prev_season}_{season}", 'tier': tier, 'team': team, 'status': status}
+                for tier, status, team_ids in movements
+                for team in sorted(registry.names[team_id] for team_id in team_ids)
+            ],
+            columns=['season', 'tier', 'team', 'status']
+        )
+
+        # Validation
+        relegated_from_tier1, promoted_to_tier1 = movements[0][2], movements[1][2]
+        num_relegated = len(relegated_from_tier1)
+        num_promoted = len(promoted_to_tier1)
+
+        if num_relegated != num_promoted:
+            print(f"Warning: {num_relegated} team relegated but {num_promoted} promoted from tier1!")
+        if args.verbose:
+            print(f"Identified {num_relegated} relegated and {num_promoted} promoted teams\n")
+            print(f"Relegated: {set(registry.names[team_id] for team_id in relegated_from_tier1)}")
+            print(f"Promoted: {set(registry.names[team_id] for team_id in promoted_to_tier1)}\n")
+        results[season] = results_df
+
+    return results
+
 
 def identify_promotions_relegations_for_season(season, country, prev_season, dirs, args):
     """
@@ -15,101 +155,7 @@ def identify_promotions_relegations_for_season(season, country, prev_season, dir
     Returns:
         pd.DataFrame with columns: [season, tier, team, status]
     """
-    divisions = list(COUNTRIES[country]['divisions'].keys())
-    tier1_div = divisions[0]  # e.g., 'SP1' for Spain
-    tier2_div = divisions[1]  # e.g., 'SP2' for Spain
-    
-    # Load previous season data
-    paths_prev_tier1 = get_season_paths(country, prev_season, tier1_div, dirs, args)
-    paths_prev_tier2 = get_season_paths(country, prev_season, tier2_div, dirs, args)
-    
-    # Check if previous season files exist
-    if not os.path.exists(paths_prev_tier1['raw']):
-        print(f" WARNING: Previous season data not found: {paths_prev_tier1['raw']}")
-        print(f"   Skipping promotion-relegation for season {season}")
-        print(f"   To identify promotions/relegations, download season {prev_season} first:")
-        print(f"   footai download --country {country} --div {tier1_div},{tier2_div} --season-start {prev_season}")
-        return None
-    
-    if not os.path.exists(paths_prev_tier2['raw']):
-        print(f" WARNING: Previous season data not found: {paths_prev_tier2['raw']}")
-        print(f"   Skipping promotion-relegation for season {season}")
-        return None
-    
-    # Load previous season data if exists
-    df_prev_tier1 = pd.read_csv(paths_prev_tier1['raw'])
-    df_prev_tier2 = pd.read_csv(paths_prev_tier2['raw'])
-    
-    teams_prev_tier1 = set(df_prev_tier1['HomeTeam'].dropna().unique())
-    teams_prev_tier2 = set(df_prev_tier2['HomeTeam'].dropna().unique())
-    
-    # Load current season data
-    paths_curr_tier1 = get_season_paths(country, season, tier1_div, dirs, args)
-    paths_curr_tier2 = get_season_paths(country, season, tier2_div, dirs, args)
-    
-    df_curr_tier1 = pd.read_csv(paths_curr_tier1['raw'])
-    df_curr_tier2 = pd.read_csv(paths_curr_tier2['raw'])
-    
-    teams_curr_tier1 = set(df_curr_tier1['HomeTeam'].dropna().unique())
-    teams_curr_tier2 = set(df_curr_tier2['HomeTeam'].dropna().unique())
-    
-    # Identify promotions and relegations
-    relegated_from_tier1 = teams_prev_tier1 - teams_curr_tier1
-    promoted_to_tier1 = teams_curr_tier1 - teams_prev_tier1
-    
-    relegated_from_tier2 = teams_prev_tier2 - teams_curr_tier2
-    promoted_to_tier2 = teams_curr_tier2 - teams_prev_tier2
-    
-    # Build results DataFrame
-    results = []
-    
-    for team in relegated_from_tier1:
-        results.append({
-            'season': f"{prev_season}_{season}",
-            'tier': 'tier1',
-            'team': team,
-            'status': 'relegated'
-        })
-    
-    for team in promoted_to_tier1:
-        results.append({
-            'season': f"{prev_season}_{season}",
-            'tier': 'tier1',
-            'team': team,
-            'status': 'promoted'
-        })
-    for team in relegated_from_tier2:
-        results.append({
-            'season': f"{prev_season}_{season}",
-            'tier': 'tier2',
-            'team': team,
-            'status': 'relegated'
-        })
-    
-    for team in promoted_to_tier2:
-        results.append({
-            'season': f"{prev_season}_{season}",
-            'tier': 'tier2',
-            'team': team,
-            'status': 'promoted'
-        })
-       
-    
-    results_df = pd.DataFrame(results)
-    
-    # Validation
-    num_relegated = len(relegated_from_tier1)
-    num_promoted = len(promoted_to_tier1)
-    
-    if num_relegated != num_promoted:
-        print(f"Warning: {num_relegated} team relegated but {num_promoted} promoted from tier1!")
-    if args.verbose:
-        print(f"Identified {num_relegated} relegated and {num_promoted} promoted teams\n")
-        print(f"Relegated: {relegated_from_tier1}")
-        print(f"Promoted: {promoted_to_tier1}\n")
-    
-    return results_df
-
+    return identify_promotions_relegations([season], country, dirs, args, prev_seasons=[prev_season])[season]
 
 
 def load_promotion_relegation(season, country, dirs):
@@ -0,0 +1,134 @@
+"""
+Features Cache
+==============
+
+Content-addressed copies of `footai features` outputs. The key is a hash of
+the Elo file's SHA-256, the feature options (windows, draw windows, trend
+half-life, feature set) and the feature-code version, so any change to the
+input or to the feature code gives a new key.
+
+An entry is a copy of the stored feature file (see `feature_store`) in
+`cache/<key>/`, with the key recorded in its schema. Restoring an entry
+copies it to the features path, or does nothing when the features path
+already holds it. Entries beyond the size bound are evicted, least recently
+used first.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from footai.data.match_data import file_sha256
+from footai.data.feature_store import feature_store_exists, feature_store_files, read_feature_schema
+
+ENTRY_STEM = 'features'
+
+
+def feature_cache_key(elo_path, version, **options):
+    """
+    Cache key of the features of an Elo file.
+
+    Args:
+        elo_path: Elo CSV the features are computed from
+        version: Feature-code version
+        **options: Feature options (window_sizes, draw_windows, trend_halflife, feature_set)
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    payload = {'elo_sha256': file_sha256(elo_path), 'version': version, **options}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def restore_cached_features(cache_dir, key, feat_path):
+    """
+    Put the cached features of `key` at `feat_path`.
+
+    Returns:
+        bool: True on a cache hit (`feat_path` now holds the features of `key`)
+    """
+    entry = Path(cache_dir) / key
+    schema = read_feature_schema(feat_path)
+    if schema is not None and schema.get('cache_key') == key and feature_store_exists(feat_path):
+        if entry.is_dir():
+            os.utime(entry)
+        return True
+    if not entry.is_dir():
+        return False
+
+    feat_path = Path(feat_path)
+    for item in feature_store_files(feat_path):
+        _remove(item)
+    for item in entry.iterdir():
+        target = feat_path.with_name(feat_path.stem + item.name[len(ENTRY_STEM):])
+        _copy(item, target)
+    os.utime(entry)
+    return True
+
+
+def store_cached_features(cache_dir, key, feat_path, max_bytes):
+    """
+    Copy the stored features at `feat_path` into the cache as entry `key`,
+    then evict old entries down to `max_bytes`.
+    """
+    cache_dir = Path(cache_dir)
+    feat_path = Path(feat_path)
+    tmp_dir = Path(tempfile.mkdtemp(dir=cache_dir, prefix=f'.{key}.'))
+    try:
+        for item in feature_store_files(feat_path):
+            _copy(item, tmp_dir / (ENTRY_STEM + item.name[len(feat_path.stem):]))
+        _remove(cache_dir / key)
+        os.replace(tmp_dir, cache_dir / key)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return evict_feature_cache(cache_dir, max_bytes)
+
+
+def evict_feature_cache(cache_dir, max_bytes):
+    """
+    Remove the least recently used entries until the cache fits in `max_bytes`.
+
+    The most recently used entry is always kept, even if it alone is larger.
+
+    Returns:
+        list of str: Keys of the evicted entries
+    """
+    entries = [entry for entry in Path(cache_dir).iterdir() if entry.is_dir() and not entry.name.startswith('.')]
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    total, evicted = 0, []
+    for position, entry in enumerate(entries):
+        size = _size(entry)
+        if position > 0 and total + size > max_bytes:
+            shutil.rmtree(entry, ignore_errors=True)
+            evicted.append(entry.name)
+        else:
+            total += size
+    return evicted
+
+
+def _size(path):
+    if path.is_file():
+        return path.stat().st_size
+    return sum(item.stat().st_size for item in path.rglob('*') if item.is_file())
+
+
+def _remove(path):
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+def _copy(source, target):
+    """Copy a file or directory to `target` atomically."""
+    tmp_path = target.with_name(f'.{target.name}.tmp')
+    _remove(tmp_path)
+    if source.is_dir():
+        shutil.copytree(source, tmp_path)
+    else:
+        shutil.copy2(source, tmp_path)
+    os.replace(tmp_path, target)
@@ -2,6 +2,34 @@
 import pandas as pd
 from pathlib import Path
 from footai.utils.paths import get_multiseason_path, get_season_paths
+from footai.data.team_registry import compact_match_columns
+from footai.data.feature_store import save_feature_store, load_feature_store, feature_store_exists, read_feature_schema
+from footai.ml.feature_engineering.definitions import FEATURE_SETS, OPTIONAL_FEATURES
+from footai.ml.feature_engineering.registry import FEATURE_VERSION, training_columns
+
+
+def check_feature_set(feat_path, feature_set, columns):
+    """
+    Raise ValueError if the features at `feat_path` cannot be trained on `feature_set`.
+
+    Files written by `footai features --features-set X` hold only the columns of X,
+    so they are rejected for any other set; any file must have every column of the set.
+
+    Args:
+        feat_path: Feature CSV path
+        feature_set: Feature set to train on
+        columns: Columns loaded from the file
+    """
+    schema = read_feature_schema(feat_path) or {}
+    built_for = schema.get('feature_set')
+    if built_for is not None and built_for != feature_set:
+        raise ValueError(f"{feat_path} was built for feature set '{built_for}', not '{feature_set}'. "
+                         f"Run features with --features-set {feature_set} or without --features-set")
+    if feature_set in FEATURE_SETS:
+        missing = [col for col in FEATURE_SETS[feature_set] if col not in set(columns) and col not in OPTIONAL_FEATURES]
+        if missing:
+            raise ValueError(f"{feat_path} is missing columns of feature set '{feature_set}': {missing}")
+
 
 def load_combined_features(countries, divisions, seasons, dirs, args):
     """
@@ -42,25 +70,28 @@ def load_combined_features(countries, divisions, seasons, dirs, args):
                 season_dfs = []
                 for season in seasons:
                     paths = get_season_paths(country, season, division, dirs, args)
-                    if Path(paths['feat']).exists():
-                        season_dfs.append(pd.read_csv(paths['feat']))
+                    if feature_store_exists(paths['feat']):
+                        season_df = load_feature_store(paths['feat'], columns=training_columns(args.features_set))
+                        check_feature_set(paths['feat'], args.features_set, season_df.columns)
+                        season_dfs.append(season_df)
                 
                 if not season_dfs:
                     print(f"Warning: No season data for {country}/{division}")
                     continue
                 
-                feat_df = pd.concat(season_dfs, ignore_index=True)
+                feat_df = compact_match_columns(pd.concat(season_dfs, ignore_index=True))
                 # Save temporary combined file
                 temp_dir = Path(f"data/features/{country}")
                 temp_dir.mkdir(parents=True, exist_ok=True)
                 feat_path = temp_dir / f"{division}_{seasons[0]}_to_{seasons[-1]}_combined.csv"
-                feat_df.to_csv(feat_path, index=False)
+                save_feature_store(feat_df, feat_path, version=FEATURE_VERSION, metadata={'feature_set': args.features_set})
             
-            if not Path(feat_path).exists():
+            if not feature_store_exists(feat_path):
                 print(f"Warning: {feat_path} not found, skipping {country}/{division}")
                 continue
             
-            df = pd.read_csv(feat_path)
+            df = load_feature_store(feat_path, columns=training_columns(args.features_set))
+            check_feature_set(feat_path, args.features_set, df.columns)
             
             # Add metadata columns
             df['Country'] = country
@@ -73,8 +104,8 @@ def load_combined_features(countries, divisions, seasons, dirs, args):
     if not dfs:
         raise ValueError(f"No feature files found for specified countries/divisions")
     
-    # Concatenate all DataFrames
-    combined_df = pd.concat(dfs, ignore_index=True)
+    # Concatenate all DataFrames; categories differ per file, so re-compact the result
+    combined_df = compact_match_columns(pd.concat(dfs, ignore_index=True))
     
     # Sort by date to maintain temporal order for CV
     combined_df = combined_df.sort_values('Date').reset_index(drop=True)
@@ -96,6 +127,6 @@ def load_combined_features(countries, divisions, seasons, dirs, args):
         temp_path = Path(f"data/temp/{country}_multidiv_{seasons[0]}_to_{seasons[-1]}_{args.features_set}.csv")
     
     temp_path.parent.mkdir(parents=True, exist_ok=True)
-    combined_df.to_csv(temp_path, index=False)
+    save_feature_store(combined_df, temp_path, version=FEATURE_VERSION, metadata={'feature_set': args.features_set})
     
     return str(temp_path)
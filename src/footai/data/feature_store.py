@@ -0,0 +1,192 @@
+"""
+Columnar Feature Store
+======================
+
+Feature files are addressed by their CSV path (as built by `get_multiseason_path`
+and `get_season_paths`). With pyarrow installed they are stored next to it as a
+Parquet dataset, one file per season:
+
+    features/SP/SP1_1516_to_2526_transfer.parquet/
+        _schema.json
+        Season=1516.parquet
+        ...
+
+so the country/division/season layout is in the path and readers load only
+the columns they ask for. `_schema.json` records the column order, the dtype
+of every column and the feature-code version the file was built with.
+
+Without pyarrow the CSV is written as before, with the same schema in a
+`.schema.json` sidecar; the integer, text and date columns are read back
+with their stored dtypes instead of inferring types.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+from footai.data.team_registry import compact_match_columns
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+STORE_FORMAT = 1
+SCHEMA_FILE = '_schema.json'
+PARTITION_COLUMN = 'Season'
+
+
+def has_columnar_store():
+    """True if pyarrow is installed and features are stored as Parquet."""
+    return pq is not None
+
+
+def dataset_path(path):
+    """Parquet dataset directory of a feature file."""
+    return Path(path).with_suffix('.parquet')
+
+
+def schema_path(path):
+    """Schema file of a feature file (inside the dataset, or the CSV sidecar)."""
+    dataset = dataset_path(path)
+    if dataset.is_dir():
+        return dataset / SCHEMA_FILE
+    return Path(path).with_suffix('.schema.json')
+
+
+def feature_store_files(path):
+    """Files and directories that make up a stored feature file."""
+    candidates = [dataset_path(path), Path(path), Path(path).with_suffix('.schema.json')]
+    return [candidate for candidate in candidates if candidate.exists()]
+
+
+def feature_store_exists(path):
+    """True if the feature file exists in either format."""
+    return (has_columnar_store() and dataset_path(path).is_dir()) or Path(path).exists()
+
+
+def _plain_dtype(dtype):
+    """Storage dtype of a column: categoricals are stored as their categories' dtype."""
+    if isinstance(dtype, pd.CategoricalDtype):
+        dtype = dtype.categories.dtype
+    if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_datetime64_any_dtype(dtype):
+        return str(dtype)
+    return 'str'
+
+
+def save_feature_store(df, path, version=None, metadata=None):
+    """
+    Write a feature frame, replacing any previous version of the file.
+
+    Args:
+        df: Feature DataFrame
+        path: Feature CSV path (the dataset goes next to it)
+        version: Feature-code version the features were built with
+        metadata: Extra entries for the schema (e.g. the features cache key)
+
+    Returns:
+        Path: Dataset directory or CSV file written
+    """
+    path = Path(path)
+    schema = {
+        'format': STORE_FORMAT,
+        'version': version,
+        'rows': len(df),
+        'columns': list(df.columns),
+        'dtypes': {col: _plain_dtype(df[col].dtype) for col in df.columns},
+        'partitions': [],
+        **(metadata or {}),
+    }
+    # Team and label categories depend on the registry, so categoricals are stored as plain values
+    categorical = {
+        col: object if schema['dtypes'][col] == 'str' else schema['dtypes'][col]
+        for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)
+    }
+    if categorical:
+        df = df.astype(categorical)
+
+    if not has_columnar_store():
+        df.to_csv(path, index=False)
+        _write_json(schema, schema_path(path))
+        return path
+
+    dataset = dataset_path(path)
+    tmp_dir = Path(tempfile.mkdtemp(dir=path.parent, prefix=f'.{dataset.name}.'))
+    try:
+        if PARTITION_COLUMN in df.columns:
+            groups = sorted(df.groupby(PARTITION_COLUMN, sort=False, dropna=False), key=lambda item: pd.to_datetime(item[1]['Date']).min())
+        else:
+            groups = [(None, df)]
+        for key, part in groups:
+            name = 'part.parquet' if key is None else f'{PARTITION_COLUMN}={key}.parquet'
+            table = pa.Table.from_pandas(part, preserve_index=False)
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'footai': json.dumps({'version': version}).encode()})
+            pq.write_table(table, tmp_dir / name)
+            schema['partitions'].append(name)
+        _write_json(schema, tmp_dir / SCHEMA_FILE)
+        # Swap in the complete dataset; the CSV of an earlier non-columnar run is now stale
+        shutil.rmtree(dataset, ignore_errors=True)
+        os.replace(tmp_dir, dataset)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    path.unlink(missing_ok=True)
+    path.with_suffix('.schema.json').unlink(missing_ok=True)
+    return dataset
+
+
+def read_feature_schema(path):
+    """Stored schema of a feature file (columns, dtypes, version), or None if it has none."""
+    schema_file = schema_path(path)
+    if not schema_file.exists():
+        return None
+    with open(schema_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_feature_store(path, columns=None, registry=None):
+    """
+    Read a feature file written by `save_feature_store` (or a plain features CSV).
+
+    Args:
+        path: Feature CSV path
+        columns: Column names or a `usecols`-style callable (default: all columns)
+        registry: TeamRegistry for the team columns (default: the shared one)
+
+    Returns:
+        DataFrame with the stored dtypes, Date as datetime and compact team/label columns
+    """
+    schema = read_feature_schema(path)
+    if schema is not None and columns is not None:
+        selected = [col for col in schema['columns'] if (columns(col) if callable(columns) else col in set(columns))]
+    else:
+        selected = columns
+
+    if has_columnar_store() and dataset_path(path).is_dir():
+        dataset = dataset_path(path)
+        df = pd.concat([
+            pq.read_table(dataset / name, columns=selected).to_pandas()
+            for name in schema['partitions']
+        ], ignore_index=True)
+    elif schema is not None:
+        # Floats are left to the parser (typing them explicitly only slows it down)
+        dtypes = {col: dtype for col, dtype in schema['dtypes'].items() if selected is None or col in selected}
+        dates = [col for col, dtype in dtypes.items() if dtype.startswith('datetime')]
+        df = pd.read_csv(path, usecols=selected, parse_dates=dates,
+                         dtype={col: dtype for col, dtype in dtypes.items() if col not in dates and dtype != 'float64'})
+    else:
+        df = pd.read_csv(path, usecols=columns, low_memory=False)
+        if 'Date' in df.columns:
+            df['Date'] = pd.to_datetime(df['Date'])
+    return compact_match_columns(df, registry=registry)
+
+
+def _write_json(data, path):
+    fd, tmp_path = tempfile.mkstemp(dir=Path(path).parent, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp_path, path)
@@ -1,47 +1,306 @@
+import codecs
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
 from footai.utils.config import DATA_DIR
+from footai.utils.paths import get_download_manifest_path
 
-def download_football_data(season, division, filepath=DATA_DIR):
+FOOTBALL_DATA_URL = "https://www.football-data.co.uk/mmz4281"
+RETRY_STATUS = {429, 500, 502, 503, 504}
+CHUNK_SIZE = 64 * 1024
+
+
+def create_session(pool_size=4):
+    """HTTP session whose connection pool keeps up to `pool_size` connections alive."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def file_sha256(path):
+    """SHA-256 of a file's bytes, or None if it does not exist."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def load_download_manifest(path):
+    """Manifest entries by raw file name, empty if there is no manifest yet."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['files']
+
+
+def save_download_manifest(entries, path):
+    """Write the manifest atomically."""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump({'files': dict(sorted(entries.items()))}, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def download_football_data(season, division, filepath=DATA_DIR, session=None, retries=3, backoff=0.5,
+                           base_url=FOOTBALL_DATA_URL, verbose=True):
     """
     Download football match data from football-data.co.uk
-    
+
+    The request is conditional on the ETag/Last-Modified recorded in the
+    download manifest, and the file is only rewritten if its content changed.
+
     Parameters:
     - season (int or str): Season year (e.g., 2024 for 2024-25 season)
     - division (int): League division
     - filepath (str): Directory to save CSV files (default: 'football_data')
-    
+    - session (requests.Session): Shared session to reuse connections (default: one-off request)
+    - retries (int): Extra attempts on connection errors, timeouts and 429/5xx answers
+    - backoff (float): Seconds before the first retry, doubled after each attempt
+
     Returns:
-    - tuple: (filepath, success_bool, message)
+    - tuple: (success_bool, message)
     """
+    manifest_path = get_download_manifest_path(filepath)
+    manifest = load_download_manifest(manifest_path)
+    result = _fetch_season(season, division, filepath, manifest.get(Path(filepath).name), session, retries, backoff, base_url, verbose)
+    if result['success']:
+        manifest[Path(filepath).name] = result['manifest']
+        save_download_manifest(manifest, manifest_path)
+    return result['success'], result['message']
+
+
+def _fetch_season(season, division, filepath, entry, session, retries, backoff, base_url, verbose):
+    """Download one season file; returns a summary row (see `download_seasons`)."""
     # Build the URL
-    url = f"https://www.football-data.co.uk/mmz4281/{season}/{division}.csv"
-    
-    print(f"URL: {url}")
-    print(f"Output: {filepath}")
+    url = f"{base_url}/{season}/{division}.csv"
+
+    if verbose:
+        print(f"URL: {url}")
+        print(f"Output: {filepath}")
+
+    # Validators are only trusted while the local file is the one they describe
+    headers = {}
+    if entry and entry.get('url') == url and file_sha256(filepath) == entry['sha256']:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    get = session.get if session is not None else requests.get
+    start = time.perf_counter()
+    result = {'season': season, 'division': division, 'file': str(filepath), 'success': False, 'changed': False,
+              'matches': 0, 'attempts': 0, 'manifest': entry}
+    for attempt in range(retries + 1):
+        result['attempts'] = attempt + 1
+        try:
+            with get(url, headers=headers, timeout=10, stream=True) as response:
+                if response.status_code == 304:
+                    result.update(success=True, matches=entry['rows'], message=f"UNCHANGED: {entry['rows']} matches (not modified).")
+                    break
+                if response.status_code == 200:
+                    sha256, num_matches, changed = _stream_to_file(response, filepath, f"{division} {season}")
+                    result.update(
+                        success=True, changed=changed, matches=num_matches,
+                        message=f"SUCCESS: Downloaded {num_matches} matches." if changed else f"UNCHANGED: {num_matches} matches (same content).",
+                        manifest={
+                            'url': url,
+                            'etag': response.headers.get('ETag'),
+                            'last_modified': response.headers.get('Last-Modified'),
+                            'sha256': sha256,
+                            'rows': num_matches,
+                        },
+                    )
+                    break
+                result['message'] = f"FAILED: Status code {response.status_code}."
+                if response.status_code not in RETRY_STATUS:
+                    break
+        except requests.exceptions.RequestException as e:
+            result['message'] = f"ERROR: {str(e)}"
+        if attempt < retries:
+            time.sleep(backoff * 2 ** attempt)
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+class _RawFileWriter:
+    """Temp file next to the target that hashes the written bytes and counts matches on the fly."""
+
+    def __init__(self, filepath):
+        fd, self.tmp_path = tempfile.mkstemp(dir=Path(filepath).parent, prefix=f".{Path(filepath).name}.", suffix='.part')
+        self.file = os.fdopen(fd, 'wb')
+        self.sha256 = hashlib.sha256()
+        self.header = None
+        self.partial = ''
+        self.matches = 0
+
+    def write(self, text):
+        data = text.encode('utf-8')
+        self.file.write(data)
+        self.sha256.update(data)
+        # Same count as before streaming: non-empty lines other than the header
+        lines = (self.partial + text).split('\n')
+        self.partial = lines.pop()
+        for line in lines:
+            self._count(line)
+
+    def _count(self, line):
+        if self.header is None:
+            self.header = line
+        elif line.strip() and line != self.header:
+            self.matches += 1
+
+    def close(self):
+        """Flush to disk; returns (sha256 hex digest, number of matches)."""
+        self._count(self.partial)
+        self.partial = ''
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        return self.sha256.hexdigest(), self.matches
 
+    def discard(self):
+        self.file.close()
+        Path(self.tmp_path).unlink(missing_ok=True)
+
+
+def _stream_to_file(response, filepath, label):
+    """
+    Stream a CSV response into `filepath` as UTF-8 without BOM, atomically.
+
+    Chunks are decoded as they arrive (a UTF-8 BOM is dropped once, at the
+    start). If a byte is not valid UTF-8 the whole file is Latin-1: the part
+    already written is transcoded from the temp file and decoding goes on as
+    Latin-1. The temp file replaces `filepath` only when complete and
+    different, so readers never see a partial file.
+
+    Returns:
+        tuple: (sha256 of the file content, number of matches, changed)
+    """
+    writer = _RawFileWriter(filepath)
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    head, fed = b'', 0
     try:
-        response = requests.get(url, timeout=10)
-        
-        if response.status_code == 200:
-            #Remove byte order mark
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            if decoder is None:
+                writer.write(chunk.decode('latin-1'))
+                continue
+            pending, _ = decoder.getstate()
+            head = (head + chunk)[:len(codecs.BOM_UTF8)]
             try:
-                content = response.content.decode('utf-8-sig')
+                writer.write(decoder.decode(chunk))
+                fed += len(chunk)
             except UnicodeDecodeError:
-                content = response.content.decode('latin-1')
-                print(f"Note: Used Latin-1 encoding for {division} {season}")            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            # Count matches
-            lines = response.text.split('\n')
-            num_matches = len([l for l in lines if l.strip() and l != lines[0]])
-            
-            message = f"SUCCESS: Downloaded {num_matches} matches."
-            return True, message
-        else:
-            message = f"FAILED: Status code {response.status_code}."
-            return False, message
-    
-    except requests.exceptions.RequestException as e:
-        message = f"ERROR: {str(e)}"
-        return False, message
\ No newline at end of file
+                print(f"Note: Used Latin-1 encoding for {label}")
+                # Latin-1 files keep every byte, including a BOM the UTF-8 decoder already dropped
+                dropped = head == codecs.BOM_UTF8 and fed - len(pending) >= len(codecs.BOM_UTF8)
+                bom = codecs.BOM_UTF8 if dropped else b''
+                decoder = None
+                writer = _transcode_latin1(writer, filepath, prefix=bom)
+                writer.write((pending + chunk).decode('latin-1'))
+        if decoder is not None:
+            writer.write(decoder.decode(b'', final=True))
+        sha256, num_matches = writer.close()
+    except BaseException:
+        writer.discard()
+        raise
+
+    changed = sha256 != file_sha256(filepath)
+    if changed:
+        os.replace(writer.tmp_path, filepath)
+    else:
+        Path(writer.tmp_path).unlink()
+    return sha256, num_matches, changed
+
+
+def _transcode_latin1(writer, filepath, prefix=b''):
+    """Re-read what `writer` wrote (valid UTF-8, i.e. the raw bytes) as Latin-1 into a new writer."""
+    writer.file.flush()
+    latin1 = _RawFileWriter(filepath)
+    latin1.write(prefix.decode('latin-1'))
+    with open(writer.tmp_path, 'rb') as f:
+        while chunk := f.read(CHUNK_SIZE):
+            latin1.write(chunk.decode('latin-1'))
+    writer.discard()
+    return latin1
+
+
+def download_seasons(downloads, workers=4, retries=3, backoff=0.5, base_url=FOOTBALL_DATA_URL):
+    """
+    Download many season files over one pooled session with bounded concurrency.
+
+    Args:
+        downloads: Iterable of (season, division, filepath)
+        workers: Maximum number of downloads in flight
+        retries: Extra attempts per file on transient errors
+        backoff: Seconds before the first retry, doubled after each attempt
+        base_url: Server root (football-data.co.uk, or a local mirror in tests)
+
+    Returns:
+        list of dict: one row per file, in input order, with keys
+        season, division, file, success, changed, matches, attempts, seconds,
+        message and manifest
+    """
+    downloads = list(downloads)
+    manifests = {}
+    for _, _, filepath in downloads:
+        manifest_path = get_download_manifest_path(filepath)
+        if manifest_path not in manifests:
+            manifests[manifest_path] = load_download_manifest(manifest_path)
+
+    workers = max(1, min(workers, len(downloads) or 1))
+    with create_session(pool_size=workers) as session, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                _fetch_season, season, division, filepath,
+                manifests[get_download_manifest_path(filepath)].get(Path(filepath).name),
+                session, retries, backoff, base_url, False
+            )
+            for season, division, filepath in downloads
+        ]
+        results = [future.result() for future in futures]
+
+    # Manifests are written once, from this thread, after all downloads finished
+    updated = defaultdict(bool)
+    for row in results:
+        manifest_path = get_download_manifest_path(row['file'])
+        name = Path(row['file']).name
+        if row['success'] and manifests[manifest_path].get(name) != row['manifest']:
+            manifests[manifest_path][name] = row['manifest']
+            updated[manifest_path] = True
+    for manifest_path in updated:
+        save_download_manifest(manifests[manifest_path], manifest_path)
+    return results
+
+
+def changed_files(results):
+    """Raw files whose content changed in a `download_seasons` run."""
+    return [row['file'] for row in results if row['changed']]
+
+
+def print_download_summary(results):
+    """Print one line per downloaded file and the totals."""
+    print(f"\n{'Season':<8}{'Div':<6}{'Status':<8}{'Matches':>8}{'Tries':>7}{'Time':>8}  File")
+    print("-" * 80)
+    for row in results:
+        status = ('NEW' if row['changed'] else 'SAME') if row['success'] else 'FAILED'
+        print(f"{row['season']:<8}{row['division']:<6}{status:<8}{row['matches']:>8}{row['attempts']:>7}{row['seconds']:>7.2f}s  {row['file']}")
+        if not row['success']:
+            print(f"        {row['message']}")
+    ok = sum(row['success'] for row in results)
+    print("-" * 80)
+    print(f"{ok}/{len(results)} files downloaded, {len(changed_files(results))} changed, {sum(row['matches'] for row in results)} matches\n")
@@ -5,16 +5,62 @@ Usage:
     python scripts/update_team_colors.py --country SP
 """
 
+import hashlib
 import json
 import re
+import time
 import unicodedata
 import argparse
+from collections import Counter, defaultdict
 from pathlib import Path
 from typing import Dict, Set, Optional
 import pandas as pd
 import requests
 
 
+COLORS_URL = "https://teamcolours.netlify.app/data.json"
+CACHE_FILENAME = "team_colors_cache.json"
+# Bump when normalization or matching rules change, so cached resolutions are recomputed
+MATCHER_VERSION = 1
+
+# Abbreviation expansions, applied in order
+_EXPANSIONS = [
+    (re.compile(pattern, flags=re.IGNORECASE), replacement)
+    for pattern, replacement in [
+        (r'\bAth\s+Bilbao\b', 'Athletic Bilbao'),
+        (r'\bMan\s+City\b', 'Manchester City'),
+        (r'\bMan\s+United\b', 'Manchester United'),
+        (r"\bNott'?m\s+Forest\b", 'Nottingham Forest'),
+        (r'\bQPR\b', 'Queens Park Rangers'),
+        (r'\bEin\s+Frankfurt\b', 'Eintracht Frankfurt'),
+        (r'\bFrankfurt\s+FSV\b', 'FSV Frankfurt'),
+        (r"\bM'?gladbach\b", 'Borussia Monchengladbach'),
+        (r'\bMunich\s+1860\b', 'TSV 1860 Munich'),
+        (r'\bParis\s+SG\b', 'Paris Saint-Germain'),
+        (r'\bUlm\b', 'SSV Ulm'),
+        (r'\bAth\b', 'Atletico'),
+        (r'\bSp\b', 'Sporting'),
+    ]
+]
+
+# Prefixes/suffixes removed, applied in order
+_REMOVE_PATTERNS = [
+    re.compile(pattern, flags=re.IGNORECASE)
+    for pattern in [
+        r'\bFC\b', r'\bCF\b', r'\bCD\b', r'\bSD\b', r'\bAC\b',
+        r'\bAS\b', r'\bSC\b', r'\bRC\b', r'\bUD\b', r'\bReal\b',
+        r'\bClub\b', r'\bSA\.?D\.?\b',
+    ]
+]
+_NON_WORD = re.compile(r'[^\w\s]')
+_SPACES = re.compile(r'\s+')
+
+# Exclusion list for teams that cause false matches
+_EXCLUSIONS = {
+    'espanol': ['spain', 'española', 'español'],  # Don't match Espanyol to Spain/Española teams
+}
+
+
 def normalize_for_matching(team_name: str) -> str:
     """
     Normalize team name for fuzzy matching.
@@ -25,131 +71,202 @@ def normalize_for_matching(team_name: str) -> str:
     name = team_name.strip()
     
     # Expand abbreviations
-    expansions = {
-        r'\bAth\s+Bilbao\b': 'Athletic Bilbao',
-        r'\bMan\s+City\b': 'Manchester City',
-        r'\bMan\s+United\b': 'Manchester United',
-        r"\bNott'?m\s+Forest\b": 'Nottingham Forest',
-        r'\bQPR\b': 'Queens Park Rangers',
-        r'\bEin\s+Frankfurt\b': 'Eintracht Frankfurt',
-        r'\bFrankfurt\s+FSV\b': 'FSV Frankfurt',
-        r"\bM'?gladbach\b": 'Borussia Monchengladbach',
-        r'\bMunich\s+1860\b': 'TSV 1860 Munich',
-        r'\bParis\s+SG\b': 'Paris Saint-Germain',
-        r'\bUlm\b': 'SSV Ulm',
-        r'\bAth\b': 'Atletico',
-        r'\bSp\b': 'Sporting',
-    }
-    for pattern, replacement in expansions.items():
-        name = re.sub(pattern, replacement, name, flags=re.IGNORECASE)
+    for pattern, replacement in _EXPANSIONS:
+        name = pattern.sub(replacement, name)
     
     # Remove accents (Köln -> Koln, Málaga -> Malaga)
     name = unicodedata.normalize('NFKD', name)
     name = ''.join([c for c in name if not unicodedata.combining(c)])
     
     # Remove prefixes/suffixes
-    remove_patterns = [
-        r'\bFC\b', r'\bCF\b', r'\bCD\b', r'\bSD\b', r'\bAC\b',
-        r'\bAS\b', r'\bSC\b', r'\bRC\b', r'\bUD\b', r'\bReal\b',
-        r'\bClub\b', r'\bSA\.?D\.?\b',
-    ]
-    for pattern in remove_patterns:
-        name = re.sub(pattern, '', name, flags=re.IGNORECASE)
+    for pattern in _REMOVE_PATTERNS:
+        name = pattern.sub('', name)
     
     # Clean up
-    name = re.sub(r'[^\w\s]', '', name)
-    name = re.sub(r'\s+', ' ', name).strip()
+    name = _NON_WORD.sub('', name)
+    name = _SPACES.sub(' ', name).strip()
     
     return name.lower()
 
 
-def fetch_all_team_colors() -> Dict[str, str]:
+def _parse_team_colors(data) -> Dict[str, str]:
+    """Map short and long team names of the API entries to their upper-case colors."""
+    teams_dict = {}
+    
+    for team in data:
+        team_short = team.get('TeamShort', '')
+        team_long = team.get('TeamLong', '')
+        colors = team.get('TeamColours', [])
+        
+        if colors and len(colors) > 0:
+            colors = team.get('TeamColours', [])
+            if not colors: continue
+            
+            # Normalize all to upper case
+            colors = [c.upper() for c in colors]
+            # Store both short and long names
+            if team_short:
+                teams_dict[team_short] = colors
+            if team_long:
+                teams_dict[team_long] = colors
+    return teams_dict
+
+
+def fetch_all_team_colors(return_hash: bool = False):
     """
     Fetch all team colors from the JSON API.
     
+    Args:
+        return_hash: Also return the SHA-256 of the downloaded JSON
+    
     Returns:
-        Dictionary mapping team names to hex colors
+        Dictionary mapping team names to hex colors (and the hash, if requested)
     """
-    url = "https://teamcolours.netlify.app/data.json"
+    url = COLORS_URL
     
     print(f"Fetching team colors from {url}...")
     
     try:
         response = requests.get(url, timeout=15)
         response.raise_for_status()
-        data = response.json()
-        
-        teams_dict = {}
-        
-        for team in data:
-            team_short = team.get('TeamShort', '')
-            team_long = team.get('TeamLong', '')
-            colors = team.get('TeamColours', [])
-            
-            if colors and len(colors) > 0:
-                colors = team.get('TeamColours', [])
-                if not colors: continue
-                
-                # Normalize all to upper case
-                colors = [c.upper() for c in colors]
-                # Store both short and long names
-                if team_short:
-                    teams_dict[team_short] = colors
-                if team_long:
-                    teams_dict[team_long] = colors
+        teams_dict = _parse_team_colors(response.json())
         
         print(f"Successfully fetched {len(teams_dict)} team color entries")
+        if return_hash:
+            return teams_dict, hashlib.sha256(response.content).hexdigest()
         return teams_dict
         
     except Exception as e:
         print(f"ERROR fetching team colors: {e}")
-        return {}
+        return ({}, None) if return_hash else {}
+
+
+class TeamMatchIndex:
+    """
+    Prebuilt index over scraped team names for `find_best_match`.
+
+    Every candidate is normalized once. A character-trigram inverted index
+    retrieves the only candidates that can satisfy the substring rule (a
+    string contains another only if it contains all of its trigrams), and
+    the first one in source order wins, as in the linear scan.
+
+    Args:
+        scraped_teams: Team name -> color, in source order
+    """
+
+    def __init__(self, scraped_teams: Dict[str, str]):
+        self.names = list(scraped_teams)
+        self.colors = list(scraped_teams.values())
+        self.normalized = [normalize_for_matching(name) for name in self.names]
+        self.national = ['national' in name.lower() for name in self.names]
+        self.exact = {}
+        for pos, normalized in enumerate(self.normalized):
+            self.exact.setdefault(normalized, pos)
+
+        self.trigram_counts = []
+        self.postings = defaultdict(list)
+        for pos, normalized in enumerate(self.normalized):
+            trigrams = _trigrams(normalized) if len(normalized) >= 4 else set()
+            self.trigram_counts.append(len(trigrams))
+            for trigram in trigrams:
+                self.postings[trigram].append(pos)
+
+    def match(self, csv_team_name: str) -> Optional[tuple]:
+        """
+        Best matching scraped team for a CSV team name.
 
+        Returns:
+            (matched_name, color) or None
+        """
+        normalized_search = normalize_for_matching(csv_team_name)
 
-def find_best_match(csv_team_name: str, scraped_teams: Dict[str, str]) -> Optional[tuple]:
+        # Try exact normalized match first
+        pos = self.exact.get(normalized_search)
+        if pos is not None:
+            return (self.names[pos], self.colors[pos])
+        if len(normalized_search) < 4:
+            return None
+
+        # Substring candidates: share all trigrams of the search, or all of their own
+        search_trigrams = _trigrams(normalized_search)
+        shared = Counter(pos for trigram in search_trigrams for pos in self.postings.get(trigram, ()))
+        excluded_terms = _EXCLUSIONS.get(normalized_search, [])
+        for pos in sorted(shared):
+            if shared[pos] != len(search_trigrams) and shared[pos] != self.trigram_counts[pos]:
+                continue
+            # Skip national teams
+            if self.national[pos]:
+                continue
+            normalized_scraped = self.normalized[pos]
+            if any(term in normalized_scraped for term in excluded_terms):
+                continue
+            if normalized_search in normalized_scraped or normalized_scraped in normalized_search:
+                return (self.names[pos], self.colors[pos])
+        return None
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def find_best_match(csv_team_name: str, scraped_teams) -> Optional[tuple]:
     """
     Find best matching team from scraped data.
     
+    Args:
+        scraped_teams: TeamMatchIndex, or a name -> color dict (indexed on the fly)
+    
     Returns:
         (matched_name, color) or None
     """
-    normalized_search = normalize_for_matching(csv_team_name)
-    
-    # Exclusion list for teams that cause false matches
-    exclusions = {
-        'espanol': ['spain', 'española', 'español'],  # Don't match Espanyol to Spain/Española teams
+    index = scraped_teams if isinstance(scraped_teams, TeamMatchIndex) else TeamMatchIndex(scraped_teams)
+    return index.match(csv_team_name)
+
+
+def load_team_color_source(cache_path: Path, refresh: bool = False, max_age_days: float = 7):
+    """
+    Scraped team colors from the local cache, fetching them only when needed.
+
+    The API is queried when there is no cache, it is older than
+    `max_age_days`, or `refresh` is set. Cached resolutions are kept only while
+    the source JSON hash (and matcher version) are unchanged.
+
+    Returns:
+        dict: cache with keys source_sha256, fetched_at, teams and resolved,
+        or None if the colors could not be fetched
+    """
+    cache = None
+    if cache_path.exists():
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        age_days = (time.time() - cache['fetched_at']) / 86400
+        if not refresh and age_days <= max_age_days:
+            print(f"Using cached team colors from {cache_path} ({age_days:.1f} days old)")
+            return cache
+
+    teams, source_sha256 = fetch_all_team_colors(return_hash=True)
+    if not teams:
+        # Stale colors are better than none
+        return cache
+
+    keep = cache is not None and cache['source_sha256'] == source_sha256 and cache.get('matcher_version') == MATCHER_VERSION
+    cache = {
+        'source_url': COLORS_URL,
+        'source_sha256': source_sha256,
+        'matcher_version': MATCHER_VERSION,
+        'fetched_at': time.time(),
+        'teams': teams,
+        'resolved': cache['resolved'] if keep else {},
     }
-    
-    # Try exact normalized match first
-    for team_name, color in scraped_teams.items():
-        normalized_scraped = normalize_for_matching(team_name)
-        
-        if normalized_search == normalized_scraped:
-            return (team_name, color)
-    
-    # Try substring matching
-    for team_name, color in scraped_teams.items():
-        # Skip national teams
-        if 'national' in team_name.lower():
-            continue
-        
-        normalized_scraped = normalize_for_matching(team_name)
-        
-        # Check exclusion list
-        if normalized_search in exclusions:
-            skip = False
-            for excluded_term in exclusions[normalized_search]:
-                if excluded_term in normalized_scraped:
-                    skip = True
-                    break
-            if skip:
-                continue
-        
-        if len(normalized_search) >= 4 and len(normalized_scraped) >= 4:
-            if normalized_search in normalized_scraped or normalized_scraped in normalized_search:
-                return (team_name, color)
-    
-    return None
+    save_team_color_cache(cache, cache_path)
+    return cache
+
+
+def save_team_color_cache(cache: dict, cache_path: Path):
+    """Write the team color cache."""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
 
 
 
@@ -197,8 +314,13 @@ def save_color_json(colors: Dict[str, str], json_path: Path):
         json.dump(output, f, indent=2, ensure_ascii=False, sort_keys=False)
 
 
-def update_team_colors(country: str, data_dir: Path, output_dir: Path):
-    """Update team colors JSON by fetching from API and matching."""
+def update_team_colors(country: str, data_dir: Path, output_dir: Path, refresh: bool = False):
+    """
+    Update team colors JSON by fetching from API and matching.
+    
+    The API response and resolved matches are cached in `output_dir`
+    (see `load_team_color_source`), so reruns do not hit the network.
+    """
     
     print(f"\n{'='*60}")
     print(f"Updating team colors for {country}")
@@ -215,14 +337,18 @@ def update_team_colors(country: str, data_dir: Path, output_dir: Path):
     csv_teams = extract_teams_from_csvs(data_dir)
     print(f"Teams found in CSV files: {len(csv_teams)}\n")
     
-    # Fetch all colors from API
-    scraped_colors = fetch_all_team_colors()
+    # Fetch all colors from API (or the cache)
+    cache_path = output_dir / CACHE_FILENAME
+    cache = load_team_color_source(cache_path, refresh=refresh)
     
-    if not scraped_colors:
+    if not cache:
         print("ERROR: Failed to fetch any colors. Aborting.")
         return
     
     print(f"\nMatching CSV teams to fetched data...\n")
+    index = None
+    resolved = cache['resolved']
+    resolved_count = len(resolved)
     
     matched = 0
     not_found = []
@@ -233,7 +359,10 @@ def update_team_colors(country: str, data_dir: Path, output_dir: Path):
             continue
         
         # Try to find match
-        match = find_best_match(csv_team, scraped_colors)
+        if csv_team not in resolved:
+            index = index or TeamMatchIndex(cache['teams'])
+            resolved[csv_team] = index.match(csv_team)
+        match = resolved[csv_team]
         
         if match:
             matched_name, color = match
@@ -247,6 +376,8 @@ def update_team_colors(country: str, data_dir: Path, output_dir: Path):
     
     # Save
     save_color_json(colors, json_path)
+    if len(resolved) != resolved_count:
+        save_team_color_cache(cache, cache_path)
     
     print(f"\n{'='*60}")
     print(f"Summary:")
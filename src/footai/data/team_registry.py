@@ -0,0 +1,147 @@
+"""
+Shared team registry and compact loaders for match files.
+
+Every team gets a stable integer ID the first time it is seen, kept in
+`data/processed/team_registry.json` across seasons and countries. Loaders return
+HomeTeam/AwayTeam as categoricals whose codes are these IDs (or as int32 codes
+directly), and the low-cardinality label columns (Div, FTR, ...) as plain
+categoricals, so team filters, groupbys and merges compare integers instead of
+strings and multi-country frames take much less memory.
+
+Files on disk keep team names; IDs only live in memory and in the registry.
+"""
+
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from footai.utils.config import PROCESSED_DIR
+
+REGISTRY_PATH = PROCESSED_DIR / 'team_registry.json'
+TEAM_COLUMNS = ['HomeTeam', 'AwayTeam']
+LABEL_COLUMNS = ['Div', 'Division', 'Country', 'FTR', 'HTR']
+
+_registries = {}
+
+
+class TeamRegistry:
+    """
+    Append-only mapping team name <-> integer ID.
+
+    Args:
+        names: Team names in ID order (ID = position)
+        path: JSON file the registry is saved to
+    """
+
+    def __init__(self, names=None, path=REGISTRY_PATH):
+        self.path = Path(path)
+        self.names = []
+        self.ids = {}
+        self.register(names or [])
+
+    @classmethod
+    def load(cls, path=REGISTRY_PATH):
+        """Load the registry from `path`, or start an empty one if it does not exist."""
+        path = Path(path)
+        if not path.exists():
+            return cls(path=path)
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f)['teams'], path=path)
+
+    def register(self, teams):
+        """Give an ID to every unseen team name, in order of first appearance."""
+        for team in pd.unique(pd.Series(teams, dtype=object).dropna()):
+            if team not in self.ids:
+                self.ids[team] = len(self.names)
+                self.names.append(team)
+
+    def encode(self, teams):
+        """
+        Map team names to their IDs, registering unseen names.
+
+        Returns:
+            np.ndarray of int32 IDs, -1 for missing names
+        """
+        codes, uniques = pd.factorize(pd.Series(teams, dtype=object))
+        self.register(uniques)
+        lookup = np.array([self.ids[team] for team in uniques], dtype=np.int32)
+        return np.where(codes >= 0, lookup[codes], -1).astype(np.int32)
+
+    def categorical(self, teams):
+        """Team names as a Categorical whose codes are the registry IDs."""
+        codes = self.encode(teams)
+        return pd.Categorical.from_codes(codes, categories=pd.Index(self.names, dtype=object))
+
+    def save(self):
+        """
+        Write the registry atomically, keeping IDs already on disk.
+
+        Names saved by another process since this registry was loaded keep
+        their IDs; names only known here are appended after them.
+        """
+        on_disk = TeamRegistry.load(self.path)
+        on_disk.register(self.names)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'teams': on_disk.names}, f, indent=1, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+def get_team_registry(path=REGISTRY_PATH):
+    """Process-wide registry for `path`, loaded once."""
+    path = Path(path)
+    if path not in _registries:
+        _registries[path] = TeamRegistry.load(path)
+    return _registries[path]
+
+
+def compact_match_columns(df, registry=None, team_codes=False):
+    """
+    Convert team and label columns of a match frame in place.
+
+    Args:
+        df: Match DataFrame
+        registry: TeamRegistry (default: the shared one)
+        team_codes: Store HomeTeam/AwayTeam as int32 IDs instead of categoricals
+
+    Returns:
+        The same DataFrame
+    """
+    registry = registry or get_team_registry()
+    teams = [col for col in TEAM_COLUMNS if col in df.columns]
+    # Register all teams first so every team column shares one category list
+    registry.register(pd.concat([df[col].astype(object) for col in teams]) if teams else [])
+    for col in teams:
+        df[col] = registry.encode(df[col].astype(object)) if team_codes else registry.categorical(df[col].astype(object))
+    for col in LABEL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    return df
+
+
+def read_match_csv(path, registry=None, team_codes=False, **kwargs):
+    """
+    Read a match CSV (raw, Elo or features) with compact team and label columns.
+
+    Args:
+        path: CSV file
+        registry: TeamRegistry (default: the shared one)
+        team_codes: Return HomeTeam/AwayTeam as int32 IDs instead of categoricals
+        **kwargs: Passed to `pd.read_csv`
+    """
+    df = pd.read_csv(path, **kwargs)
+    return compact_match_columns(df, registry=registry, team_codes=team_codes)
+
+
+def update_team_registry(csv_paths, path=REGISTRY_PATH):
+    """Register the teams of the given match files and save the registry."""
+    registry = get_team_registry(path)
+    for csv_path in csv_paths:
+        if Path(csv_path).exists():
+            df = pd.read_csv(csv_path, usecols=lambda col: col in TEAM_COLUMNS)
+            registry.register(pd.concat([df[col] for col in df.columns]))
+    registry.save()
+    return registry
@@ -1,4 +1,5 @@
 """Main execution logic for footAI commands."""
+import importlib
 from footai.cli.parser import create_parser
 from footai.utils.paths import parse_start_years
 from footai.utils.config import (
@@ -7,20 +8,18 @@ from footai.utils.config import (
     get_default_divisions,
     get_divisions_for_countries
 )
-from footai.cli import (
-    download,
-    promotion,
-    elo,
-    features,
-    train,
-    plot
-)
 
 def main():
     #Parse common parameters
     parser = create_parser()
     args = parser.parse_args()
-    if args.elo_transfer or args.multi_division: args.multi_season=True
+    if args.global_elo:
+        # The global engine is a single full pass; the sweep only scores per-country chains
+        if args.cmd == 'elo-sweep':
+            parser.error('--global-elo is not supported by elo-sweep, which scores the per-country chains')
+        if args.cmd == 'elo' and (args.incremental or args.resume_from or args.jobs != 1):
+            parser.error('--incremental, --resume-from and --jobs cannot be combined with --global-elo')
+    if args.elo_transfer or args.multi_division or args.global_elo: args.multi_season=True
     if not hasattr(args, 'tier') : args.tier=None
     if args.tier :args.multi_division=False
     if args.verbose: print("Running the code with args:", args)
@@ -36,17 +35,19 @@ def main():
     seasons = parse_start_years(args.season_start)
     dirs = setup_directories(args)
 
-    # Command registry
+    # Command registry (modules are imported on use, so a command does not load the others' dependencies)
     commands = {
-        'download': download.execute,
-        'promotion-relegation': promotion.execute,
-        'elo': elo.execute,
-        'features': features.execute,
-        'train': train.execute,
-        'plot': plot.execute,
+        'download': 'download',
+        'promotion-relegation': 'promotion',
+        'elo': 'elo',
+        'elo-sweep': 'sweep',
+        'features': 'features',
+        'train': 'train',
+        'plot': 'plot',
     }
-    handler = commands.get(args.cmd)
-    if handler:
+    module = commands.get(args.cmd)
+    if module:
+        handler = importlib.import_module(f'footai.cli.{module}').execute
         handler(args.countries, seasons, divisions, args, dirs)
     else:
         print(f"Unknown command: {args.cmd}")
@@ -7,6 +7,16 @@ Core features: Add match, odds, draw and  features
 
 import numpy as np
 import pandas as pd
+from footai.ml.feature_engineering.ledger import TeamMatchLedger, build_team_ledger
+from footai.ml.feature_engineering.market import implied_probability_stats
+from footai.ml.feature_engineering.rolling import grouped_shifted_mean, rolling_slopes
+
+
+def _ledger_for(df: pd.DataFrame, ledger: TeamMatchLedger = None) -> TeamMatchLedger:
+    """The given ledger if it describes `df` row by row, else a fresh one."""
+    if ledger is not None and ledger.n_matches == len(df):
+        return ledger
+    return build_team_ledger(df)
 
 def add_match_features(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -81,13 +91,17 @@ def add_odds_features(df: pd.DataFrame) -> pd.DataFrame:
         df['odds_movement_magnitude'] = np.abs(df['draw_odds_drift'])
     return df
 
-def add_draw_features(df: pd.DataFrame) -> pd.DataFrame:
+def add_draw_features(df: pd.DataFrame, ledger: TeamMatchLedger = None, draw_windows=(10,)) -> pd.DataFrame:
     """
     Add draw-optimized features: odds consensus/dispersion, totals probs,
     parity indicators, low-event composites, and rolling draw rates.
     
     Args:
         df: DataFrame with odds and L5 features (post-engineer_features).
+        ledger: TeamMatchLedger of `df` (built if not given)
+        draw_windows: Windows of the team draw rates ({home,away}_draw_rate_l{w}
+            over the team's home/away matches, {home,away}_overall_draw_rate_l{w}
+            over all its matches)
     
     Returns:
         DataFrame with added draw features.
@@ -96,8 +110,7 @@ def add_draw_features(df: pd.DataFrame) -> pd.DataFrame:
     draw_odds_cols = ['B365D', 'BWD', 'WH D', 'IWD', 'PSD']  # Adjust if exact col names vary; use available D odds
     available_draw_odds = [col for col in draw_odds_cols if col in df.columns]
     if available_draw_odds:
-        df['draw_prob_consensus'] = df[available_draw_odds].apply(lambda x: np.mean(1 / x), axis=1)
-        df['draw_prob_dispersion'] = df[available_draw_odds].apply(lambda x: np.std(1 / x), axis=1)
+        df['draw_prob_consensus'], df['draw_prob_dispersion'] = implied_probability_stats(df, available_draw_odds)
     else:
         df['draw_prob_consensus'] = 1 / df['B365D'] if 'B365D' in df.columns else np.nan
         df['draw_prob_dispersion'] = np.nan
@@ -105,9 +118,7 @@ def add_draw_features(df: pd.DataFrame) -> pd.DataFrame:
     # Under 2.5 prob (implied from totals odds; use B365 as primary)
     if 'B365>2.5' in df.columns and 'B365<2.5' in df.columns:
         df['under_2_5_prob'] = 1 / (1 + df['B365>2.5'] / df['B365<2.5'])
-        under_mean = df['under_2_5_prob'].mean()
-        under_std = df['under_2_5_prob'].std()
-        df['under_2_5_zscore'] = (df['under_2_5_prob'] - under_mean) / under_std if under_std > 0 else 0
+        df['under_2_5_zscore'] = _under_2_5_zscore(df['under_2_5_prob'])
     else:
         df['under_2_5_prob'] = np.nan
         df['under_2_5_zscore'] = np.nan
@@ -143,85 +154,62 @@ def add_draw_features(df: pd.DataFrame) -> pd.DataFrame:
     else:
         df['min_goals_scored_l5'] = np.nan
     
-    # Team/League draw priors (rolling draw rate L10; compute post-sort for temporality)
-    # Add row_id to track original positions
-    df_sorted = df.sort_values('Date').copy()
-    df_sorted['row_id'] = df.index  # Matches original df index for merging back
-
-    # Map FTR to numeric: 1 if 'D', 0 otherwise (binary for draw rate); check if FTR exists/is string
-    if 'FTR' not in df_sorted.columns:
+    # Team draw priors: draw rate over each team's previous home, away and all matches
+    sides = ('home', 'away')
+    rate_columns = [f'{side}_draw_rate_l{w}' for w in draw_windows for side in sides]
+    rate_columns += [f'{side}_overall_draw_rate_l{w}' for w in draw_windows for side in sides]
+    if 'FTR' not in df.columns:
         print("Warning: 'FTR' column missing; skipping draw rates.")
-        df['home_draw_rate_l10'] = np.nan
-        df['away_draw_rate_l10'] = np.nan
+        for col in rate_columns:
+            df[col] = np.nan
     else:
-        # Binary: 1 if draw, 0 otherwise
-        is_draw = (df_sorted['FTR'] == 'D').astype(float)
-        
-        # Calculate draw rates for each team type
-        df_sorted['home_draw_rate_l10'] = np.nan
-        df_sorted['away_draw_rate_l10'] = np.nan
-
- 
-        # Process home teams
-        if 'HomeTeam' in df_sorted.columns:
-            for team in df_sorted['HomeTeam'].unique():
-                team_mask = df_sorted['HomeTeam'] == team
-                team_indices = df_sorted[team_mask].index
-                
-                # Calculate rolling mean (past 10 matches only - excluding current)
-                team_draws = is_draw[team_mask]
-                rolling_rate = team_draws.shift(1).rolling(window=10, min_periods=3).mean()
-                
-                # Assign back to dataframe
-                df_sorted.loc[team_indices, 'home_draw_rate_l10'] = rolling_rate.values
-        
-        # Process away teams
-        if 'AwayTeam' in df_sorted.columns:
-            for team in df_sorted['AwayTeam'].unique():
-                team_mask = df_sorted['AwayTeam'] == team
-                team_indices = df_sorted[team_mask].index
-                
-                # Calculate rolling mean (past 10 matches only - excluding current)
-                team_draws = is_draw[team_mask]
-                rolling_rate = team_draws.shift(1).rolling(window=10, min_periods=3).mean()
-                
-                # Assign back to dataframe
-                df_sorted.loc[team_indices, 'away_draw_rate_l10'] = rolling_rate.values
-        
-        # Merge back to original df (preserve original order)
-        df = df.merge(
-            df_sorted[['Date', 'HomeTeam', 'AwayTeam', 'home_draw_rate_l10', 'away_draw_rate_l10']],
-            on=['Date', 'HomeTeam', 'AwayTeam'],
-            how='left',
-            suffixes=('', '_new')
-        )
-        
-        # Use the new columns (drop old if exists)
-        if 'home_draw_rate_l10_new' in df.columns:
-            df['home_draw_rate_l10'] = df['home_draw_rate_l10_new']
-            df = df.drop('home_draw_rate_l10_new', axis=1)
-        if 'away_draw_rate_l10_new' in df.columns:
-            df['away_draw_rate_l10'] = df['away_draw_rate_l10_new']
-            df = df.drop('away_draw_rate_l10_new', axis=1)
+        ledger = _ledger_for(df, ledger)
+        side_masks = {'home': ledger.is_home, 'away': ~ledger.is_home}
+        rates = {}
+        for window in draw_windows:
+            min_periods = min(3, window)
+            # Past matches only (excluding current), per team and side
+            for side, mask in side_masks.items():
+                rates[f'{side}_draw_rate_l{window}'] = (
+                    mask, grouped_shifted_mean(ledger.is_draw[mask], ledger.team[mask], window, min_periods)
+                )
+            overall = grouped_shifted_mean(ledger.is_draw, ledger.team, window, min_periods)
+            for side, mask in side_masks.items():
+                rates[f'{side}_overall_draw_rate_l{window}'] = (mask, overall[mask])
+
+        for col in rate_columns:
+            mask, values = rates[col]
+            rate = np.full(len(df), np.nan)
+            rate[ledger.match[mask]] = values
+            df[col] = rate
     
     # League draw bias (per-division if Division column exists, else global)
-    if 'FTR' in df.columns:
-        if 'Division' in df.columns and df['Division'].nunique() > 1:
-            # Multi-league: per-division draw rate
-            league_draw_rates = df.groupby('Division')['FTR'].apply(lambda x: (x == 'D').mean())
-            df['league_draw_bias'] = df['Division'].map(league_draw_rates)
-        else:
-            # Single-league: global draw rate (same for all rows)
-            df['league_draw_bias'] = float((df['FTR'] == 'D').mean())
-    else:
-        df['league_draw_bias'] = np.nan
+    df['league_draw_bias'] = _league_draw_bias(df)
     
     return df
 
-def add_league_features(df):
-    """Add league-specific contextual features for pooled models."""
-    
-    # League-level aggregates (historical draw rates, etc.)
+
+def _under_2_5_zscore(under_prob):
+    """Z-score of the under 2.5 probability over the whole frame."""
+    under_mean = under_prob.mean()
+    under_std = under_prob.std()
+    return (under_prob - under_mean) / under_std if under_std > 0 else 0
+
+
+def _league_draw_bias(df):
+    """Draw rate of the frame (per division if several), for every row."""
+    if 'FTR' not in df.columns:
+        return np.nan
+    if 'Division' in df.columns and df['Division'].nunique() > 1:
+        # Multi-league: per-division draw rate
+        league_draw_rates = df.groupby('Division')['FTR'].apply(lambda x: (x == 'D').mean())
+        return df['Division'].map(league_draw_rates)
+    # Single-league: global draw rate (same for all rows)
+    return float((df['FTR'] == 'D').mean())
+
+
+def _league_stats(df):
+    """Per-league draw rate, average goals and home win rate (indexed by Div)."""
     league_stats = df.groupby('Div').agg({
         'FTR': lambda x: (x == 'D').mean(),  # draw_rate
         'FTHG': 'mean',  # avg_goals_home
@@ -229,11 +217,19 @@ def add_league_features(df):
     }).rename(columns={'FTR': 'league_draw_rate', 
                        'FTHG': 'league_avg_goals_home',
                        'FTAG': 'league_avg_goals_away'})
+    league_stats['league_home_advantage'] = df.groupby('Div')['FTR'].apply(lambda x: (x == 'H').mean())
+    return league_stats
+
+def add_league_features(df):
+    """Add league-specific contextual features for pooled models."""
+    
+    # League-level aggregates (historical draw rates, etc.)
+    league_stats = _league_stats(df)
+    home_wins = league_stats.pop('league_home_advantage')
     
     df = df.merge(league_stats, left_on='Div', right_index=True, how='left')
     
     # Home advantage by league
-    home_wins = df.groupby('Div')['FTR'].apply(lambda x: (x == 'H').mean())
     df['league_home_advantage'] = df['Div'].map(home_wins)
     
     # League identity (one-hot encoding for model to learn league-specific patterns)
@@ -243,7 +239,27 @@ def add_league_features(df):
     return df
 
 
-def add_momentum_features(df: pd.DataFrame) -> pd.DataFrame:
+def refresh_full_sample_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Recompute, in place, the columns that are statistics of the whole frame.
+
+    `league_draw_bias`, `under_2_5_zscore` and the `league_*` aggregates
+    depend on every row, so they are refreshed after rows are appended
+    (see `update_features`). Every other feature only looks at its own row
+    or the teams' earlier matches.
+    """
+    if 'under_2_5_zscore' in df.columns and 'B365>2.5' in df.columns and 'B365<2.5' in df.columns:
+        df['under_2_5_zscore'] = _under_2_5_zscore(df['under_2_5_prob'])
+    if 'league_draw_bias' in df.columns:
+        df['league_draw_bias'] = _league_draw_bias(df)
+    if 'league_draw_rate' in df.columns:
+        league_stats = _league_stats(df)
+        for col in league_stats.columns:
+            df[col] = df['Div'].map(league_stats[col]).astype(float)
+    return df
+
+
+def add_momentum_features(df: pd.DataFrame, ledger: TeamMatchLedger = None, trend_halflife: float = None) -> pd.DataFrame:
     """
     Add momentum/trajectory features using rolling slope calculations.
     
@@ -252,71 +268,47 @@ def add_momentum_features(df: pd.DataFrame) -> pd.DataFrame:
     
     Args:
         df: DataFrame with L5 rolling features already computed
+        ledger: TeamMatchLedger of `df` (built if not given)
+        trend_halflife: Also add exponentially weighted trends (*_ewtrend_L5,
+            ew_momentum_diff) with this half-life in matches
         
     Returns:
         DataFrame with new momentum features:
     
     Note:
         Requires that rolling features (goals_scored_L5, ppg_L5) have been
-        computed first via calculate_team_rolling_features().
+        computed first via rolling_team_features().
     """
-    from footai.ml.feature_engineering.rolling import calculate_slope
+    ledger = _ledger_for(df, ledger)
+    variants = {'trend': None}
+    if trend_halflife is not None:
+        variants['ewtrend'] = trend_halflife
+    trends = {
+        f'{side}_{stat}_{variant}_L5': np.full(len(df), np.nan)
+        for variant in variants for stat in ('goals', 'ppg') for side in ('home', 'away')
+    }
+    
+    # Slopes over each team's home and away matches (in date order), all teams at once
+    for side, mask in (('home', ledger.is_home), ('away', ~ledger.is_home)):
+        if f'{side}_goals_scored_L5' not in df.columns:
+            continue
+        positions = ledger.match[mask]
+        for stat, col in (('goals', f'{side}_goals_scored_L5'), ('ppg', f'{side}_ppg_L5')):
+            values = df[col].to_numpy(dtype=float)[positions]
+            for variant, halflife in variants.items():
+                trends[f'{side}_{stat}_{variant}_L5'][positions] = rolling_slopes(values, ledger.team[mask], window=5, halflife=halflife)
+    
+    for col, values in trends.items():
+        df[col] = values
     
     # Sort by date to ensure temporal correctness
     df = df.sort_values('Date').copy()
     
-    # Initialize momentum columns
-    df['home_goals_trend_L5'] = np.nan
-    df['away_goals_trend_L5'] = np.nan
-    df['home_ppg_trend_L5'] = np.nan
-    df['away_ppg_trend_L5'] = np.nan
-    
-    # Process each team's home matches
-    if 'HomeTeam' in df.columns and 'home_goals_scored_L5' in df.columns:
-        for team in df['HomeTeam'].unique():
-            team_mask = df['HomeTeam'] == team
-            team_indices = df[team_mask].index
-            
-            # Get team's historical goals (sorted by date)
-            team_goals = df.loc[team_mask, 'home_goals_scored_L5']
-            team_ppg = df.loc[team_mask, 'home_ppg_L5']
-            
-            # Calculate slopes using rolling window
-            goals_slopes = team_goals.rolling(window=5, min_periods=5).apply(
-                calculate_slope, raw=False
-            )
-            ppg_slopes = team_ppg.rolling(window=5, min_periods=5).apply(
-                calculate_slope, raw=False
-            )
-            
-            # Assign back to dataframe
-            df.loc[team_indices, 'home_goals_trend_L5'] = goals_slopes.values
-            df.loc[team_indices, 'home_ppg_trend_L5'] = ppg_slopes.values
-    
-    # Process each team's away matches
-    if 'AwayTeam' in df.columns and 'away_goals_scored_L5' in df.columns:
-        for team in df['AwayTeam'].unique():
-            team_mask = df['AwayTeam'] == team
-            team_indices = df[team_mask].index
-            
-            # Get team's historical goals (sorted by date)
-            team_goals = df.loc[team_mask, 'away_goals_scored_L5']
-            team_ppg = df.loc[team_mask, 'away_ppg_L5']
-            
-            # Calculate slopes using rolling window
-            goals_slopes = team_goals.rolling(window=5, min_periods=5).apply(
-                calculate_slope, raw=False
-            )
-            ppg_slopes = team_ppg.rolling(window=5, min_periods=5).apply(
-                calculate_slope, raw=False
-            )
-            
-            # Assign back to dataframe
-            df.loc[team_indices, 'away_goals_trend_L5'] = goals_slopes.values
-            df.loc[team_indices, 'away_ppg_trend_L5'] = ppg_slopes.values
-    
     # Calculate momentum differential
     df['momentum_diff'] = df['home_ppg_trend_L5'] - df['away_ppg_trend_L5']
+
+    if trend_halflife is not None:
+        df['ew_momentum_diff'] = df['home_ppg_ewtrend_L5'] - df['away_ppg_ewtrend_L5']
     
     return df
 
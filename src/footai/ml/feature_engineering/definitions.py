@@ -52,6 +52,9 @@ DRAW_CORE_LEGACY = [
     'odds_draw_prob_norm',      # Normalized draw probability
     'asian_handicap_diff',      # Handicap-based parity (if exists)
 ] 
+# No builder produces these; sets using them are trained on them only if the file has them
+OPTIONAL_FEATURES = ['odds_draw_prob_norm', 'asian_handicap_diff']
+
 # Data-driven top 5 (from baseline_draw_full analysis)
 DRAW_CORE = [
     'abs_odds_prob_diff',      # Odds parity indicator
@@ -148,6 +151,18 @@ INTERACTION_FEATURES = [
     'movement_parity_signal',   # draw_drift * (1 - abs_odds_diff)
 ]
 
+# --------------------------------------------------------------------------
+# Bookmaker Market Features (every book with H/D/A odds)
+# --------------------------------------------------------------------------
+
+MARKET_FEATURES = [
+    'market_draw_prob',         # Consensus margin-free draw probability
+    'market_draw_dispersion',   # Books' disagreement on the draw
+    'market_overround',         # Average bookmaker margin
+    'market_best_overround',    # Margin left at the best prices
+    'market_books',             # Number of books quoting the match
+]
+
 # --------------------------------------------------------------------------
 # Combined Feature Sets 
 # --------------------------------------------------------------------------
@@ -187,6 +202,10 @@ CORNERS_OPTIMIZED = BASELINE_ODDS_OPTIMIZED + CORNERS_FEATURES
 INTERACTIONS_LITE = BASELINE_ODDS_LITE + INTERACTION_FEATURES
 INTERACTIONS_OPTIMIZED = BASELINE_ODDS_OPTIMIZED + INTERACTION_FEATURES
 
+#Market
+MARKET_LITE = BASELINE_ODDS_LITE + MARKET_FEATURES
+MARKET_OPTIMIZED = BASELINE_ODDS_OPTIMIZED + MARKET_FEATURES
+
 # Current contenders
 BASELINE_LITE = BASELINE_ODDS_LITE
 BASELINE_OPTIMIZED = BASELINE_ODDS_OPTIMIZED
@@ -226,6 +245,9 @@ FEATURE_SETS = {
     #interactions
     'interactions_lite' : INTERACTIONS_LITE,
     'interactions_optimized' : INTERACTIONS_OPTIMIZED,
+    #market
+    'market_lite' : MARKET_LITE,
+    'market_optimized' : MARKET_OPTIMIZED,
 }
 
 
@@ -0,0 +1,111 @@
+"""
+Team-Match Ledger
+=================
+
+Long-format view of a match frame: one row per team appearance (home and
+away stacked), sorted by team and then chronologically, with per-team
+offsets. Built once per feature run; the rolling, draw and momentum builders
+read team histories from it instead of rescanning the match frame.
+"""
+import numpy as np
+import pandas as pd
+
+
+class TeamMatchLedger:
+    """
+    Array-backed team appearance table.
+
+    Rows of team `t` are `offsets[t]:offsets[t + 1]`, in date order (ties keep
+    the match frame order). Every array has one entry per appearance.
+
+    Attributes:
+        teams: Team names; the team code is the position
+        offsets: int64 array of length len(teams) + 1
+        match: Row position of the match in the frame the ledger was built from
+        team: Team code
+        is_home: True for home appearances
+        date: Match date (datetime64)
+        goals_for, goals_against: Goals from the team's point of view
+        points: 3/1/0 from the team's point of view (0 if the result is missing)
+        is_draw: 1.0 for a draw, 0.0 otherwise
+        shots_for, shots_against, shots_on_target_for, shots_on_target_against,
+        fouls_for, fouls_against, corners_for, corners_against: Match stats
+            from the team's point of view (NaN when the column is missing)
+    """
+
+    # (team's stat, opponent's stat) -> (home column, away column)
+    STAT_COLUMNS = {
+        'goals': ('FTHG', 'FTAG'),
+        'shots': ('HS', 'AS'),
+        'shots_on_target': ('HST', 'AST'),
+        'fouls': ('HF', 'AF'),
+        'corners': ('HC', 'AC'),
+    }
+
+    def __init__(self, teams, offsets, columns, n_matches):
+        self.teams = list(teams)
+        self.codes = {name: code for code, name in enumerate(self.teams)}
+        self.offsets = offsets
+        self.n_matches = n_matches
+        for name, values in columns.items():
+            setattr(self, name, values)
+
+    @classmethod
+    def from_matches(cls, df):
+        """
+        Build the ledger from a match frame (HomeTeam, AwayTeam, Date, FTR, FTHG, FTAG, ...).
+
+        Rows with a missing team are left out.
+        """
+        n = len(df)
+        codes, teams = pd.factorize(pd.concat([df['HomeTeam'], df['AwayTeam']], ignore_index=True))
+        match = np.concatenate([np.arange(n), np.arange(n)])
+        is_home = np.concatenate([np.ones(n, dtype=bool), np.zeros(n, dtype=bool)])
+        dates = pd.to_datetime(df['Date']).to_numpy() if 'Date' in df.columns else np.zeros(n, dtype='datetime64[ns]')
+        date = np.concatenate([dates, dates])
+
+        ftr = df['FTR'].astype(object).to_numpy() if 'FTR' in df.columns else np.full(n, None, dtype=object)
+        home_points = np.select([ftr == 'H', ftr == 'D'], [3.0, 1.0], 0.0)
+        away_points = np.select([ftr == 'A', ftr == 'D'], [3.0, 1.0], 0.0)
+        draws = (ftr == 'D').astype(float)
+        columns = {
+            'points': np.concatenate([home_points, away_points]),
+            'is_draw': np.concatenate([draws, draws]),
+        }
+        for stat, (home_col, away_col) in cls.STAT_COLUMNS.items():
+            home = _float_column(df, home_col)
+            away = _float_column(df, away_col)
+            columns[f'{stat}_for'] = np.concatenate([home, away])
+            columns[f'{stat}_against'] = np.concatenate([away, home])
+
+        # Team-major, then date, then frame order
+        valid = np.flatnonzero(codes >= 0)
+        order = valid[np.lexsort((match[valid], date[valid].astype('datetime64[ns]').astype(np.int64), codes[valid]))]
+        team = codes[order].astype(np.int32)
+        offsets = np.searchsorted(team, np.arange(len(teams) + 1)).astype(np.int64)
+
+        columns = {name: values[order] for name, values in columns.items()}
+        columns.update(match=match[order], team=team, is_home=is_home[order], date=date[order])
+        return cls(teams, offsets, columns, n)
+
+    def __len__(self):
+        return len(self.match)
+
+    def team_code(self, team_name):
+        """Code of `team_name`, or None if it never plays."""
+        return self.codes.get(team_name)
+
+    def rows(self, team):
+        """Slice of the ledger rows of a team code."""
+        return slice(self.offsets[team], self.offsets[team + 1])
+
+
+def build_team_ledger(df):
+    """Team-match ledger of a match frame (see `TeamMatchLedger`)."""
+    return TeamMatchLedger.from_matches(df)
+
+
+def _float_column(df, column):
+    if column not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
@@ -0,0 +1,141 @@
+"""
+Bookmaker Market Features
+=========================
+
+Implied probabilities from every bookmaker's 1X2 odds in the match frame.
+
+Bookmaker columns are discovered from the header (a prefix with H, D and A
+columns, e.g. B365H/B365D/B365A), so seasons quoting different books need no
+configuration. The odds are turned into one (matches x books x outcomes)
+array and every feature is a NumPy reduction over it.
+"""
+
+import numpy as np
+import pandas as pd
+
+OUTCOMES = ('H', 'D', 'A')
+OUTCOME_NAMES = ('home', 'draw', 'away')
+
+# Prefixes that summarise the other books (market max/average) rather than quote odds
+AGGREGATE_PREFIXES = ('Max', 'Avg', 'BbMx', 'BbAv')
+
+
+def discover_bookmakers(columns, closing=False):
+    """
+    Bookmaker prefixes with a full H/D/A odds triple.
+
+    Closing odds are the same prefix plus 'C' (B365CH for B365H, PSCH for PSH).
+
+    Args:
+        columns: Column names of the match frame
+        closing: Return the closing-odds prefixes instead of the opening ones
+
+    Returns:
+        list of str: Prefixes in column order (e.g. ['B365', 'BW', 'IW', 'PS'])
+    """
+    columns = list(columns)
+    available = set(columns)
+    prefixes = []
+    for col in columns:
+        prefix = col[:-1]
+        if not col.endswith('H') or not prefix or prefix in prefixes:
+            continue
+        if any(prefix + outcome not in available for outcome in OUTCOMES):
+            continue
+        is_closing = prefix.endswith('C') and prefix[:-1] + 'H' in available
+        base = prefix[:-1] if is_closing else prefix
+        if is_closing == closing and base not in AGGREGATE_PREFIXES:
+            prefixes.append(prefix)
+    return prefixes
+
+
+def odds_array(df, prefixes):
+    """
+    Decimal odds as a (matches, books, outcomes) float array.
+
+    Missing, non-numeric and non-positive prices are NaN.
+    """
+    odds = np.full((len(df), len(prefixes), len(OUTCOMES)), np.nan)
+    for b, prefix in enumerate(prefixes):
+        for o, outcome in enumerate(OUTCOMES):
+            odds[:, b, o] = pd.to_numeric(df[prefix + outcome], errors='coerce').to_numpy(dtype=float)
+    odds[~(odds > 0)] = np.nan
+    return odds
+
+
+def nan_mean_std(values, axis=-1):
+    """
+    Mean and population standard deviation over `axis`, skipping NaN.
+
+    Same arithmetic as pandas' skipna mean/std(ddof=0) (sum of the non-NaN
+    values over their count), so the results match the row-wise `apply` this
+    replaced bit for bit. Both are NaN where no value is present.
+    """
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=axis)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(valid, values, 0.0).sum(axis=axis) / count
+        deviation = np.where(valid, (np.expand_dims(mean, axis) - values) ** 2, 0.0)
+        std = np.sqrt(deviation.sum(axis=axis) / count)
+    return np.where(count > 0, mean, np.nan), np.where(count > 0, std, np.nan)
+
+
+def implied_probability_stats(df, columns):
+    """
+    Consensus (mean) and dispersion (std) of 1/odds over the given columns, per row.
+
+    Used for the draw consensus of `add_draw_features`.
+    """
+    with np.errstate(divide='ignore'):
+        probs = 1 / df[columns].to_numpy(dtype=float)
+    return nan_mean_std(probs, axis=1)
+
+
+def add_market_features(df: pd.DataFrame, closing: bool = False) -> pd.DataFrame:
+    """
+    Add bookmaker market features from every available 1X2 odds triple.
+
+    Per match, over the books quoting all three outcomes:
+        market_books: Number of books
+        market_overround: Average bookmaker margin (sum of 1/odds - 1)
+        market_{home,draw,away}_prob: Consensus margin-removed probability
+        market_{home,draw,away}_dispersion: Std of the margin-removed probabilities
+    and over every quoted price:
+        market_best_{home,draw,away}_odds: Best (highest) price
+        market_best_overround: Margin left when backing every best price
+
+    Args:
+        df: DataFrame with bookmaker odds columns
+        closing: Use closing odds (B365CH, ...) instead of opening odds
+
+    Returns:
+        DataFrame with the market features (NaN where no book quotes the match)
+    """
+    prefixes = discover_bookmakers(df.columns, closing=closing)
+    odds = odds_array(df, prefixes)
+    implied = 1 / odds
+
+    # Books with an incomplete triple have no margin and are left out of the consensus
+    book_total = implied.sum(axis=2)
+    fair = implied / book_total[:, :, None]
+    fair_mean, fair_std = nan_mean_std(np.moveaxis(fair, 1, 2))
+    overround, _ = nan_mean_std(book_total - 1)
+
+    features = {
+        'market_books': (~np.isnan(book_total)).sum(axis=1),
+        'market_overround': overround,
+    }
+    for o, name in enumerate(OUTCOME_NAMES):
+        features[f'market_{name}_prob'] = fair_mean[:, o]
+    for o, name in enumerate(OUTCOME_NAMES):
+        features[f'market_{name}_dispersion'] = fair_std[:, o]
+
+    quoted = ~np.isnan(odds)
+    best = np.where(quoted.any(axis=1), np.where(quoted, odds, -np.inf).max(axis=1), np.nan)
+    for o, name in enumerate(OUTCOME_NAMES):
+        features[f'market_best_{name}_odds'] = best[:, o]
+    features['market_best_overround'] = (1 / best).sum(axis=1) - 1
+
+    for col, values in features.items():
+        df[col] = values
+    return df
@@ -9,8 +9,13 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from typing import  List
-from footai.utils.paths import get_multiseason_path
-from footai.ml.feature_engineering.rolling import calculate_team_rolling_features
+from footai.utils.paths import get_multiseason_path, get_elo_suffix
+from footai.data.team_registry import compact_match_columns
+from footai.data.feature_store import save_feature_store, load_feature_store, feature_store_exists
+from footai.ml.feature_engineering.rolling import ROLLING_STATS, rolling_team_features
+from footai.ml.feature_engineering.ledger import build_team_ledger
+from footai.ml.feature_engineering.market import add_market_features
+from footai.ml.feature_engineering.registry import FEATURE_VERSION, feature_set_builders
 from footai.ml.feature_engineering.builders import (
     add_match_features, 
     add_odds_features, 
@@ -18,118 +23,118 @@ from footai.ml.feature_engineering.builders import (
     add_league_features,
     add_momentum_features,
     add_corners_features,
-    add_interaction_features
+    add_interaction_features,
+    refresh_full_sample_features
 )
 
 
-def engineer_features(df: pd.DataFrame, window_sizes: List[int] = [3, 5], verbose: bool = False) -> pd.DataFrame:
+def engineer_features(df: pd.DataFrame, window_sizes: List[int] = [3, 5], verbose: bool = False, draw_windows: List[int] = [10],
+                      trend_halflife: float = None, feature_set: str = None) -> pd.DataFrame:
     """
     Main feature engineering pipeline.
 
+    With a `feature_set`, only the builders its columns depend on run (see
+    `registry.FEATURE_BUILDERS`); the other feature columns are left out.
+
     Args:
         df: DataFrame with match data (must have Date column and Elo ratings)
         window_sizes: Rolling window sizes for features (default: [3, 5])
         verbose: Whether to print progress
+        draw_windows: Windows of the team draw rates (default: [10])
+        trend_halflife: Half-life (matches) of the optional exponentially weighted momentum trends
+        feature_set: Name in FEATURE_SETS to compute the features of (default: all features)
 
     Returns:
         DataFrame enriched with all engineered features
     """
     if verbose:
         print("Starting feature engineering...")
+    builders = feature_set_builders(feature_set, {
+        'window_sizes': window_sizes, 'draw_windows': draw_windows, 'trend_halflife': trend_halflife,
+    })
+    if verbose and feature_set is not None:
+        print(f"Feature set '{feature_set}' needs: {', '.join(builders)}")
 
     # Prepare data
-    df = df[
-        df['HomeTeam'].notna() &
-        df['AwayTeam'].notna() &
-        (df['HomeTeam'].astype(str).str.strip().str.lower() != 'nan') &
-        (df['AwayTeam'].astype(str).str.strip().str.lower() != 'nan') &
-        (df['HomeTeam'].astype(str).str.strip() != '') &
-        (df['AwayTeam'].astype(str).str.strip() != '')
-    ].copy()
+    df = _valid_matches(df)
     enriched_df = df.copy()
     enriched_df['Date'] = pd.to_datetime(enriched_df['Date'])
     enriched_df = enriched_df.sort_values('Date').reset_index(drop=True)
 
-    # Cache for team features
-    team_cache = {}
+    # One team-appearance table shared by the rolling, draw and momentum builders
+    ledger = build_team_ledger(enriched_df)
 
-    # For each window size, add rolling features
-    for window in window_sizes:
-        if verbose:
-            print(f"Processing window size: {window}")
-
-        # Initialize columns
-        feature_cols = [
-            f'home_goals_scored_L{window}',
-            f'home_goals_conceded_L{window}',
-            f'home_ppg_L{window}',
-            f'home_shots_L{window}',
-            f'home_shot_accuracy_L{window}',
-            f'home_fouls_L{window}',
-            f'away_goals_scored_L{window}',
-            f'away_goals_conceded_L{window}',
-            f'away_ppg_L{window}',
-            f'away_shots_L{window}',
-            f'away_shot_accuracy_L{window}',
-            f'away_fouls_L{window}',
-        ]
-
-        for col in feature_cols:
-            enriched_df[col] = np.nan
-
-        # Process each match
-        for idx, row in enriched_df.iterrows():
-            home_team = row['HomeTeam']
-            away_team = row['AwayTeam']
-            match_date = row['Date']
+    # Features are stored per ledger row and scattered to the match rows, so
+    # a team playing twice on one date (e.g. after concatenating divisions)
+    # keeps one value per match
+    sides = {'home': ledger.is_home, 'away': ~ledger.is_home}
 
-            # Get features for both teams
-            home_features = calculate_team_rolling_features(enriched_df, home_team, window, team_cache)
-            away_features = calculate_team_rolling_features(enriched_df, away_team, window, team_cache)
-
-            # Get features up to this match
-            if match_date in home_features:
-                for feat_name, feat_value in home_features[match_date].items():
-                    enriched_df.at[idx, f'home_{feat_name}'] = feat_value
-
-            if match_date in away_features:
-                for feat_name, feat_value in away_features[match_date].items():
-                    enriched_df.at[idx, f'away_{feat_name}'] = feat_value
+    # Rolling features for all windows in one pass over the ledger
+    if 'rolling' in builders:
+        if verbose:
+            print(f"Processing window sizes: {', '.join(map(str, window_sizes))}")
+        team_features = rolling_team_features(ledger, window_sizes)
+        for window in window_sizes:
+            names = [f'{name}_L{window}' for name in ROLLING_STATS]
+            # Home/away blocks first, corners last (the order the columns always had)
+            column_order = [(side, name) for side in sides for name in names[:-1]] + [(side, names[-1]) for side in sides]
+            new_columns = {}
+            for side, name in column_order:
+                column = np.full(len(enriched_df), np.nan)
+                mask = sides[side]
+                column[ledger.match[mask]] = team_features[name][mask]
+                new_columns[f'{side}_{name}'] = column
+            # Columns already in the input are overwritten in place, the rest appended in one go
+            for col in [col for col in new_columns if col in enriched_df.columns]:
+                enriched_df[col] = new_columns.pop(col)
+            enriched_df = pd.concat([enriched_df, pd.DataFrame(new_columns, index=enriched_df.index)], axis=1)
 
     # Add match-level features
-    if verbose:
-        print("Adding match-level features...")
-    enriched_df = add_match_features(enriched_df)
+    if 'match' in builders:
+        if verbose:
+            print("Adding match-level features...")
+        enriched_df = add_match_features(enriched_df)
 
     # Add betting odds features
-    if verbose:
-        print("Adding betting market features...")
-    enriched_df = add_odds_features(enriched_df)
+    if 'odds' in builders:
+        if verbose:
+            print("Adding betting market features...")
+        enriched_df = add_odds_features(enriched_df)
 
     # Add draw-optimized features
-    if verbose:
-        print("Adding draw-optimized features...")
-    enriched_df = add_draw_features(enriched_df)
+    if 'draw' in builders:
+        if verbose:
+            print("Adding draw-optimized features...")
+        enriched_df = add_draw_features(enriched_df, ledger=ledger, draw_windows=draw_windows)
 
 
     # Add league specific features
-    if verbose:
-        print("Adding league specific features...")
-    enriched_df = add_league_features(enriched_df)
+    if 'league' in builders:
+        if verbose:
+            print("Adding league specific features...")
+        enriched_df = add_league_features(enriched_df)
 
     # Add momentum features
-    if verbose:
-        print("Adding momentum specific features...")
-    enriched_df = add_momentum_features(enriched_df)
+    if 'momentum' in builders:
+        if verbose:
+            print("Adding momentum specific features...")
+        enriched_df = add_momentum_features(enriched_df, ledger=ledger, trend_halflife=trend_halflife)
 
     # Add momentum features
-    if verbose:
-        print("Adding corner features...")
-    enriched_df = add_corners_features(enriched_df) 
+    if 'corners' in builders:
+        if verbose:
+            print("Adding corner features...")
+        enriched_df = add_corners_features(enriched_df) 
 
-    if verbose:
-        print("Adding interaction features...")
-    enriched_df = add_interaction_features(enriched_df)
+    if 'interactions' in builders:
+        if verbose:
+            print("Adding interaction features...")
+        enriched_df = add_interaction_features(enriched_df)
+
+    if 'market' in builders:
+        if verbose:
+            print("Adding bookmaker market features...")
+        enriched_df = add_market_features(enriched_df)
     
     if verbose:
         print(f"Feature engineering complete!")
@@ -138,6 +143,139 @@ def engineer_features(df: pd.DataFrame, window_sizes: List[int] = [3, 5], verbos
     return enriched_df
 
 
+def _valid_matches(df: pd.DataFrame) -> pd.DataFrame:
+    """Rows with both team names present."""
+    return df[
+        df['HomeTeam'].notna() &
+        df['AwayTeam'].notna() &
+        (df['HomeTeam'].astype(str).str.strip().str.lower() != 'nan') &
+        (df['AwayTeam'].astype(str).str.strip().str.lower() != 'nan') &
+        (df['HomeTeam'].astype(str).str.strip() != '') &
+        (df['AwayTeam'].astype(str).str.strip() != '')
+    ].copy()
+
+
+def _match_keys(df: pd.DataFrame) -> pd.MultiIndex:
+    """(Date, HomeTeam, AwayTeam) of every row."""
+    return pd.MultiIndex.from_arrays([
+        pd.to_datetime(df['Date']),
+        df['HomeTeam'].astype(str).to_numpy(),
+        df['AwayTeam'].astype(str).to_numpy(),
+    ])
+
+
+# Previous same-side values the momentum slopes use (plus the new one)
+TREND_DEPTH = 4
+
+
+def _featured_windows(features_df, prefix):
+    """Window sizes of the columns named `prefix` + window."""
+    return sorted(int(col[len(prefix):]) for col in features_df.columns if col.startswith(prefix) and col[len(prefix):].isdigit())
+
+
+def update_features(features_df: pd.DataFrame, df: pd.DataFrame, window_sizes: List[int] = [3, 5], verbose: bool = False,
+                    draw_windows: List[int] = [10], trend_halflife: float = None, feature_set: str = None) -> pd.DataFrame:
+    """
+    Append features for the matches of `df` that are not in `features_df` yet.
+
+    The per-team state at the end of the existing features is the tail of
+    each team's history: its last home and away matches the draw rates and
+    momentum slopes look back on, plus `max(window_sizes)` earlier appearances so the rolling values those
+    rows feed into the momentum slopes are complete. Only these rows and
+    the new matches go through `engineer_features`; the new rows are then
+    appended and the whole-frame statistics (league draw rates, under 2.5
+    z-score) are refreshed for every row.
+
+    The new rows match a full run up to the summation order of those
+    whole-frame statistics. Rows are kept in file order, new ones last.
+
+    Args:
+        features_df: Existing features (output of `engineer_features`)
+        df: Match data with Elo ratings, the already featured matches included
+        window_sizes: Rolling window sizes the features were built with
+        verbose: Whether to print progress
+        draw_windows: Draw-rate windows the features were built with
+        trend_halflife: Half-life of the weighted trends the features were built with
+        feature_set: Feature set the features were built for (default: all features)
+
+    Returns:
+        DataFrame with the existing and new rows, or None if a full run is
+        needed (other window sizes or feature set, featured matches were
+        edited or removed, or new matches are older than the last featured one)
+    """
+    builders = feature_set_builders(feature_set, {
+        'window_sizes': window_sizes, 'draw_windows': draw_windows, 'trend_halflife': trend_halflife,
+    })
+    window_checks = [('home_goals_scored_L', window_sizes, 'rolling'), ('home_draw_rate_l', draw_windows, 'draw')]
+    for prefix, windows, builder in window_checks:
+        featured_windows = _featured_windows(features_df, prefix)
+        if featured_windows != (sorted(windows) if builder in builders else []):
+            print(f"Features were built with {prefix}* windows {featured_windows}, running full computation")
+            return None
+    if 'momentum' in builders and ('ew_momentum_diff' in features_df.columns) != (trend_halflife is not None):
+        print("Weighted momentum trends requested differently from the existing features, running full computation")
+        return None
+
+    df = _valid_matches(df)
+    keys = _match_keys(df)
+    featured_keys = _match_keys(features_df)
+    is_new = ~keys.isin(featured_keys)
+    if featured_keys.isin(keys).sum() != len(features_df):
+        print("Featured matches are missing from the Elo file, running full computation")
+        return None
+
+    # Already featured matches must carry the same ratings (same Elo run)
+    old = df[~is_new].set_index(keys[~is_new])
+    featured = features_df.set_index(featured_keys)
+    for col in ('HomeElo', 'AwayElo'):
+        if col in df.columns and not np.array_equal(old[col].reindex(featured.index).to_numpy(dtype=float),
+                                                    featured[col].to_numpy(dtype=float), equal_nan=True):
+            print(f"{col} of featured matches changed, running full computation")
+            return None
+
+    new_matches = df[is_new]
+    if new_matches.empty:
+        if verbose:
+            print("Features up to date")
+        return features_df
+    if len(features_df) and pd.to_datetime(new_matches['Date']).min() < pd.to_datetime(features_df['Date']).max():
+        print("New matches predate the last featured match, running full computation")
+        return None
+
+    # Tail of each playing team's history
+    history = features_df.reset_index(drop=True)
+    history['Date'] = pd.to_datetime(history['Date'])
+    ledger = build_team_ledger(history)
+    depth = max(window_sizes)
+    side_depth = max(max(draw_windows), TREND_DEPTH)
+    context = []
+    for team in pd.unique(pd.concat([new_matches['HomeTeam'], new_matches['AwayTeam']]).astype(str)):
+        code = ledger.team_code(team)
+        if code is None:
+            continue
+        rows = ledger.rows(code)
+        home = ledger.is_home[rows]
+        side_starts = [
+            positions[-side_depth] if len(positions) >= side_depth else 0
+            for positions in (np.flatnonzero(home), np.flatnonzero(~home))
+        ]
+        context.append(ledger.match[rows][max(0, min(side_starts) - depth):])
+    context = np.unique(np.concatenate(context)) if context else np.array([], dtype=int)
+    if verbose:
+        print(f"Computing {len(new_matches)} new matches from {len(context)} history rows")
+
+    recent = pd.concat([history.iloc[context][df.columns.intersection(history.columns)], new_matches], ignore_index=True)
+    new_features = engineer_features(recent, window_sizes=window_sizes, draw_windows=draw_windows, trend_halflife=trend_halflife,
+                                     feature_set=feature_set)
+    new_features = new_features[_match_keys(new_features).isin(keys[is_new])]
+    if set(new_features.columns) != set(history.columns):
+        print("Features were built for another feature set, running full computation")
+        return None
+
+    updated = pd.concat([history, new_features], ignore_index=True)
+    return refresh_full_sample_features(updated)
+
+
 def get_feature_columns(df: pd.DataFrame) -> List[str]:
     """
     Get list of engineered feature columns (excluding metadata and raw odds).
@@ -175,17 +313,18 @@ def get_feature_columns(df: pd.DataFrame) -> List[str]:
     return feature_cols
 
 
-def save_features(df: pd.DataFrame, output_path: str, verbose: bool = False):
+def save_features(df: pd.DataFrame, output_path: str, verbose: bool = False, metadata: dict = None):
     """
-    Save engineered features to CSV.
+    Save engineered features to the feature store (Parquet, or CSV without pyarrow).
 
     Args:
-        output_path: Path to save the CSV file
+        output_path: Feature CSV path (see `feature_store.save_feature_store`)
         verbose: Whether to print progress
+        metadata: Extra schema entries (e.g. the features cache key)
     """
-    df.to_csv(output_path, index=False)
+    written = save_feature_store(df, output_path, version=FEATURE_VERSION, metadata=metadata)
     if verbose:
-        print(f"Saved features to: {output_path}")
+        print(f"Saved features to: {written}")
         print(f"Shape: {df.shape}")
 
 
@@ -215,12 +354,12 @@ def combine_divisions_features(country, divisions, seasons, dirs, args):
     for division in divisions:
         feature_file = get_multiseason_path(dirs['feat'], division, seasons[0], seasons[-1], args)
         
-        if not Path(feature_file).exists():
+        if not feature_store_exists(feature_file):
             print(f"Warning: {division} features not found at {feature_file}")
             print(f"Run: footai features --country {country} --div {division} --season-start {','.join(seasons)} --multiseason")
             continue
         
-        df = pd.read_csv(feature_file)
+        df = load_feature_store(feature_file)
         df['Division'] = division
         all_dfs.append(df)
         
@@ -228,7 +367,7 @@ def combine_divisions_features(country, divisions, seasons, dirs, args):
     if not all_dfs:
         raise ValueError(f"No feature files found for divisions: {divisions}")
     
-    combined = pd.concat(all_dfs, ignore_index=True)
+    combined = compact_match_columns(pd.concat(all_dfs, ignore_index=True))
     combined = combined.sort_values('Date').reset_index(drop=True)
     
     # Add division features
@@ -238,13 +377,13 @@ def combine_divisions_features(country, divisions, seasons, dirs, args):
     })
     
     # Save combined file
-    suffix = '_transfer' if args.elo_transfer else '_multi'
+    suffix = get_elo_suffix(args)
     output_file = dirs['feat'] / f"{country}_multidiv_{seasons[0]}_to_{seasons[-1]}{suffix}.csv"
-    combined.to_csv(output_file, index=False)
+    written = save_feature_store(combined, output_file, version=FEATURE_VERSION)
     
     print(f"\nCombined dataset:")
     print(f"  Total matches: {len(combined)}")
     print(f"  Divisions: {divisions}")
-    print(f"  Output: {output_file}")
+    print(f"  Output: {written}")
     
     return output_file
@@ -0,0 +1,170 @@
+"""
+Feature Builder Registry
+========================
+
+Which columns each step of `engineer_features` produces and which columns it
+needs, so a run can be limited to the steps a feature set depends on.
+"""
+
+from typing import Dict, List
+
+from footai.ml.feature_engineering.definitions import FEATURE_SETS
+from footai.ml.feature_engineering.rolling import ROLLING_STATS
+
+SIDES = ('home', 'away')
+
+# Version of the feature code, stored with saved features; bump it when a
+# builder's columns or values change so stored features are rebuilt
+FEATURE_VERSION = 1
+
+
+def _rolling_columns(options):
+    return [
+        f'{side}_{stat}_L{window}'
+        for window in options['window_sizes'] for side in SIDES for stat in ROLLING_STATS
+    ]
+
+
+def _draw_columns(options):
+    rates = [f'{side}_draw_rate_l{window}' for window in options['draw_windows'] for side in SIDES]
+    rates += [f'{side}_overall_draw_rate_l{window}' for window in options['draw_windows'] for side in SIDES]
+    return [
+        'draw_prob_consensus', 'draw_prob_dispersion', 'under_2_5_prob', 'under_2_5_zscore',
+        'abs_elo_diff', 'elo_diff_sq', 'low_elo_diff', 'medium_elo_diff', 'abs_odds_prob_diff',
+        'abs_ahh', 'ahh_zero', 'ahh_flat', 'min_shots_l5', 'min_shot_acc_l5', 'min_goals_scored_l5',
+    ] + rates + ['league_draw_bias']
+
+
+def _momentum_columns(options):
+    variants = ['trend'] + (['ewtrend'] if options.get('trend_halflife') is not None else [])
+    columns = [f'{side}_{stat}_{variant}_L5' for variant in variants for stat in ('goals', 'ppg') for side in SIDES]
+    columns.append('momentum_diff')
+    if options.get('trend_halflife') is not None:
+        columns.append('ew_momentum_diff')
+    return columns
+
+
+# Builders in pipeline order. `produces` is a column list or a function of the
+# pipeline options (window_sizes, draw_windows, trend_halflife); `requires`
+# lists the columns read, raw or produced by an earlier builder.
+FEATURE_BUILDERS = {
+    'rolling': {
+        'produces': _rolling_columns,
+        'requires': ['Date', 'HomeTeam', 'AwayTeam', 'FTR', 'FTHG', 'FTAG', 'HS', 'AS', 'HST', 'AST', 'HF', 'AF', 'HC', 'AC'],
+    },
+    'match': {
+        'produces': ['elo_diff', 'form_diff_L5', 'home_gd_L5', 'away_gd_L5', 'foul_diff_L3', 'foul_diff_L5', 'is_home'],
+        'requires': [
+            'HomeElo', 'AwayElo', 'home_ppg_L5', 'away_ppg_L5',
+            'home_goals_scored_L5', 'home_goals_conceded_L5', 'away_goals_scored_L5', 'away_goals_conceded_L5',
+            'home_fouls_L3', 'away_fouls_L3', 'home_fouls_L5', 'away_fouls_L5',
+        ],
+    },
+    'odds': {
+        'produces': [
+            'odds_home_prob', 'odds_draw_prob', 'odds_away_prob', 'odds_home_prob_norm', 'odds_away_prob_norm',
+            'odds_elo_diff', 'draw_odds_drift', 'home_odds_drift', 'away_odds_drift', 'sharp_money_on_draw',
+            'odds_movement_magnitude',
+        ],
+        'requires': ['B365H', 'B365D', 'B365A', 'HomeExpected', 'AvgH', 'AvgD', 'AvgA', 'AvgCH', 'AvgCD', 'AvgCA'],
+    },
+    'draw': {
+        'produces': _draw_columns,
+        'requires': [
+            'elo_diff', 'odds_home_prob_norm', 'odds_away_prob_norm',
+            'home_shots_L5', 'away_shots_L5', 'home_shot_accuracy_L5', 'away_shot_accuracy_L5',
+            'home_goals_scored_L5', 'away_goals_scored_L5',
+        ],
+    },
+    'league': {
+        'produces': ['league_draw_rate', 'league_avg_goals_home', 'league_avg_goals_away', 'league_home_advantage'],
+        'requires': ['Div', 'FTR', 'FTHG', 'FTAG'],
+    },
+    'momentum': {
+        'produces': _momentum_columns,
+        'requires': ['home_goals_scored_L5', 'away_goals_scored_L5', 'home_ppg_L5', 'away_ppg_L5'],
+    },
+    'corners': {
+        'produces': ['corners_ratio', 'defensive_draw_signal'],
+        'requires': ['home_corners_L5', 'away_corners_L5', 'under_2_5_prob'],
+    },
+    'interactions': {
+        'produces': ['elo_odds_agreement', 'form_odds_weighted', 'parity_uncertainty', 'movement_parity_signal'],
+        'requires': [
+            'HomeElo', 'AwayElo', 'odds_home_prob_norm', 'odds_away_prob_norm', 'form_diff_L5',
+            'abs_odds_prob_diff', 'abs_elo_diff', 'draw_prob_dispersion', 'draw_odds_drift',
+        ],
+    },
+    'market': {
+        'produces': [
+            'market_books', 'market_overround',
+            'market_home_prob', 'market_draw_prob', 'market_away_prob',
+            'market_home_dispersion', 'market_draw_dispersion', 'market_away_dispersion',
+            'market_best_home_odds', 'market_best_draw_odds', 'market_best_away_odds', 'market_best_overround',
+        ],
+        'requires': [],
+    },
+}
+
+
+def builder_columns(name: str, options: Dict) -> List[str]:
+    """Columns produced by a builder with the given pipeline options."""
+    produces = FEATURE_BUILDERS[name]['produces']
+    return produces(options) if callable(produces) else list(produces)
+
+
+def required_builders(columns: List[str], options: Dict) -> List[str]:
+    """
+    Builders needed to produce `columns`: their producers and, transitively,
+    the producers of what those read.
+
+    Columns no builder produces (raw data, or windows not configured) are
+    taken from the input as they are.
+
+    Args:
+        columns: Wanted feature columns
+        options: Pipeline options (window_sizes, draw_windows, trend_halflife)
+
+    Returns:
+        list of str: Builder names, in pipeline order
+    """
+    producers = {col: name for name in FEATURE_BUILDERS for col in builder_columns(name, options)}
+    needed, seen = set(), set()
+    pending = list(columns)
+    while pending:
+        col = pending.pop()
+        if col in seen:
+            continue
+        seen.add(col)
+        name = producers.get(col)
+        if name is not None and name not in needed:
+            needed.add(name)
+            pending.extend(FEATURE_BUILDERS[name]['requires'])
+    return [name for name in FEATURE_BUILDERS if name in needed]
+
+
+def feature_set_builders(feature_set: str, options: Dict) -> List[str]:
+    """Builders needed for a `FEATURE_SETS` entry (all builders if `feature_set` is None)."""
+    if feature_set is None:
+        return list(FEATURE_BUILDERS)
+    if feature_set not in FEATURE_SETS:
+        raise ValueError(f"Unknown feature set: {feature_set}. Choose from {list(FEATURE_SETS.keys())}")
+    return required_builders(FEATURE_SETS[feature_set], options)
+
+
+# Columns training reads besides the features: target, ordering and division info
+TRAINING_METADATA = ['Date', 'FTR', 'Div', 'Division', 'Season', 'HomeTeam', 'AwayTeam', 'is_tier1', 'division_tier']
+
+
+def training_columns(feature_set: str):
+    """
+    Usecols filter for reading a features file to train on `feature_set`.
+
+    Returns:
+        Callable for `pd.read_csv(usecols=...)`, or None (read every column)
+        for sets that are not in FEATURE_SETS (e.g. 'all')
+    """
+    if feature_set not in FEATURE_SETS:
+        return None
+    wanted = set(FEATURE_SETS[feature_set]) | set(TRAINING_METADATA)
+    return lambda col: col in wanted
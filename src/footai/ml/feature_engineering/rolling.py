@@ -6,114 +6,154 @@ Temporal feature computation with no data leakage.
 """
 import pandas as pd
 import numpy as np
-from typing import Dict
-from scipy import stats
+from typing import Dict, List
+from footai.ml.feature_engineering.ledger import TeamMatchLedger, build_team_ledger
 
 
-def team_matches_rows(df, team_name):
-    """Extract chronological match history for a team."""
+def team_matches_rows(df, team_name, ledger=None):
+    """
+    Extract chronological match history for a team.
+
+    Args:
+        df: Match DataFrame
+        team_name: Name of the team
+        ledger: TeamMatchLedger of `df` (built if not given)
+    """
+    ledger = ledger if ledger is not None else build_team_ledger(df)
+    team = ledger.team_code(team_name)
+    if team is None:
+        return []
+    rows = ledger.rows(team)
+
     team_matches = []
-    for idx, row in df.iterrows():
-        if row['HomeTeam'] == team_name:
+    for (date, is_home, goals_for, goals_against, points,
+         shots, shots_on_target, fouls, corners) in zip(
+            ledger.date[rows], ledger.is_home[rows], ledger.goals_for[rows], ledger.goals_against[rows],
+            ledger.points[rows], ledger.shots_for[rows], ledger.shots_on_target_for[rows],
+            ledger.fouls_for[rows], ledger.corners_for[rows]):
+        if is_home:
             team_matches.append({
-                'date': row['Date'],
-                'goals_scored': row['FTHG'],
-                'goals_conceded': row['FTAG'],
-                'result': row['FTR'],  # H/D/A
+                'date': pd.Timestamp(date),
+                'goals_scored': goals_for,
+                'goals_conceded': goals_against,
+                'result': {3: 'H', 1: 'D'}.get(points, 'A'),  # H/D/A
                 'is_home': True,
                 # Shot data (might not exist in older seasons)
-                'shots': row.get('HS', None),
-                'shots_on_target': row.get('HST', None),
-                'fouls': row.get('HF', None),
-                'corners': row.get('HC', None),
+                'shots': shots,
+                'shots_on_target': shots_on_target,
+                'fouls': fouls,
+                'corners': corners,
 
             })
-        elif row['AwayTeam'] == team_name:
+        else:
             team_matches.append({
-                'date': row['Date'],
-                'goals_scored': row['FTAG'],
-                'goals_conceded': row['FTHG'],
-                'result': 'W' if row['FTR'] == 'A' else ('D' if row['FTR'] == 'D' else 'L'),
+                'date': pd.Timestamp(date),
+                'goals_scored': goals_for,
+                'goals_conceded': goals_against,
+                'result': {3: 'W', 1: 'D'}.get(points, 'L'),
                 'is_home': False,
                 # Shot data (might not exist in older seasons)
-                'shots_conceded': row.get('AS', None),
-                'shots_on_target_conceded': row.get('AST', None),
-                'fouls_conceded': row.get('AF', None),
-                'corners': row.get('AC', None),
+                'shots_conceded': shots,
+                'shots_on_target_conceded': shots_on_target,
+                'fouls_conceded': fouls,
+                'corners': corners,
             })
     return team_matches
 
-def calculate_team_rolling_features(df: pd.DataFrame, team_name: str, window: int, cache: Dict) -> Dict:
+# Rolling stats per team appearance, in output column order
+ROLLING_STATS = ['goals_scored', 'goals_conceded', 'ppg', 'shots', 'shot_accuracy', 'fouls', 'corners']
+
+
+def _prefix_sums(values):
+    """Running sum and count of the non-NaN values, with a leading 0 (window [a, b) = p[b] - p[a])."""
+    valid = ~np.isnan(values)
+    sums = np.concatenate([[0.0], np.cumsum(np.where(valid, values, 0.0))])
+    counts = np.concatenate([[0], np.cumsum(valid)])
+    return sums, counts
+
+
+def grouped_shifted_mean(values: np.ndarray, group: np.ndarray, window: int, min_periods: int = 1) -> np.ndarray:
     """
-    Calculate rolling features for a specific team.
+    Mean of the previous `window` values of the same group, at every position.
+
+    Same as `groupby(group).shift(1).rolling(window, min_periods).mean()`,
+    for `group` sorted so each group's positions are contiguous and in time
+    order (e.g. ledger rows), but computed from one set of prefix sums.
 
     Args:
-        df: DataFrame with all match data (sorted by date)
-        team_name: Name of the team
-        window: Rolling window size (e.g., 3 or 5 matches)
-        cache: Cache dictionary to store computed features
+        values: Values in group/time order (NaN is skipped)
+        group: Sorted group code of each position
+        window: Number of previous values
+        min_periods: Fewer previous values than this gives NaN
 
     Returns:
-        Dict mapping match_date -> feature dict
+        np.ndarray aligned with `values`
+    """
+    positions = np.arange(len(values))
+    start = np.maximum(np.searchsorted(group, group), positions - window)
+    sums, counts = _prefix_sums(values)
+    count = counts[positions] - counts[start]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = (sums[positions] - sums[start]) / count
+    return np.where(count >= min_periods, mean, np.nan)
+
+
+def rolling_team_features(ledger: TeamMatchLedger, window_sizes: List[int]) -> Dict[str, np.ndarray]:
     """
-    cache_key = f"{team_name}_{window}"
-    if cache_key in cache:
-        return cache[cache_key]
+    Rolling features of every team appearance, from the team's previous appearances.
+
+    All teams and windows are computed in one pass: each stat's prefix sums
+    over the ledger (team rows are contiguous and in date order) are built
+    once, and every window is a difference of two of them. Values match the
+    per-match computation this replaced: ppg gives a home appearance 1 point
+    for a draw and none for a win, shots, shot accuracy and fouls only count
+    home appearances, and a team's first appearance has no history (NaN).
 
-    # Extract team's matches
-    team_matches = team_matches_rows(df, team_name=team_name)
-    date_col = 'Date' if 'Date' in team_matches[0] else 'date'
-    team_df = pd.DataFrame(team_matches).sort_values(date_col).reset_index(drop=True)
+    Args:
+        ledger: TeamMatchLedger of the match frame
+        window_sizes: Rolling window sizes (e.g., [3, 5] matches)
+
+    Returns:
+        Dict mapping feature name (e.g. 'goals_scored_L5') -> array aligned
+        with the ledger rows, window by window in `ROLLING_STATS` order
+    """
+    rows = np.arange(len(ledger))
+    first = ledger.offsets[ledger.team]
+    has_history = rows > first
+
+    home = ledger.is_home
+    stats = {
+        'goals_scored': ledger.goals_for,
+        'goals_conceded': ledger.goals_against,
+        'ppg': np.where(home, ledger.is_draw, ledger.points),
+        'shots': np.where(home, ledger.shots_for, np.nan),
+        'shots_on_target': np.where(home, ledger.shots_on_target_for, np.nan),
+        'fouls': np.where(home, ledger.fouls_for, np.nan),
+        'corners': ledger.corners_for,
+    }
+    prefix = {name: _prefix_sums(values) for name, values in stats.items()}
 
-    # Calculate rolling features
     features = {}
-    for i in range(len(team_df)):
-        match_date = team_df.iloc[i][date_col]
-
-        if i < 1:
-            # First match - no history
-            features[match_date] = {
-                f'goals_scored_L{window}': np.nan,
-                f'goals_conceded_L{window}': np.nan,
-                f'ppg_L{window}': np.nan,
-                f'shots_L{window}': np.nan,
-                f'shot_accuracy_L{window}': np.nan,
-                f'corners_L{window}': np.nan,
-
-            }
-        else:
-            # Use only PREVIOUS matches (i-window to i-1)
-            prev_matches = team_df.iloc[max(0, i-window):i]
-
-            # Calculate points
-            points = prev_matches['result'].apply(
-                lambda x: 3 if x == 'W' else (1 if x == 'D' else 0)
-            )
-
-            # Shot accuracy
-            total_shots = prev_matches['shots'].sum()
-            shot_acc = (prev_matches['shots_on_target'].sum() / total_shots * 100) if total_shots > 0 else 0
-
-            # Foul aggregations
-            fouls_data = prev_matches['fouls'].dropna()
-            avg_fouls = fouls_data.mean() if len(fouls_data) > 0 else np.nan
-
-            # Corners aggregation
-            corners_data = prev_matches['corners'].dropna()
-            avg_corners = corners_data.mean() if len(corners_data) > 0 else np.nan
-
-            features[match_date] = {
-                f'goals_scored_L{window}': prev_matches['goals_scored'].mean(),
-                f'goals_conceded_L{window}': prev_matches['goals_conceded'].mean(),
-                f'ppg_L{window}': points.mean(),
-                f'shots_L{window}': prev_matches['shots'].mean(),
-                f'shot_accuracy_L{window}': shot_acc,
-                f'fouls_L{window}': avg_fouls,  
-                f'corners_L{window}': avg_corners,
-
-            }
-
-    cache[cache_key] = features
+    for window in window_sizes:
+        start = np.maximum(first, rows - window)
+        sums = {name: sums[rows] - sums[start] for name, (sums, _) in prefix.items()}
+        counts = {name: counts[rows] - counts[start] for name, (_, counts) in prefix.items()}
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = {name: sums[name] / counts[name] for name in stats}
+            shot_accuracy = np.where(sums['shots'] > 0, sums['shots_on_target'] / sums['shots'] * 100, 0.0)
+
+        window_features = {
+            'goals_scored': means['goals_scored'],
+            'goals_conceded': means['goals_conceded'],
+            'ppg': means['ppg'],
+            'shots': means['shots'],
+            'shot_accuracy': shot_accuracy,
+            'fouls': means['fouls'],
+            'corners': means['corners'],
+        }
+        for name in ROLLING_STATS:
+            features[f'{name}_L{window}'] = np.where(has_history, window_features[name], np.nan)
     return features
 
 
@@ -148,7 +188,57 @@ def calculate_slope(series, window=5):
     # X values: 0, 1, 2, 3, 4 for window=5
     x = np.arange(len(values))
     
-    # Calculate linear regression slope
+    # Calculate linear regression slope (scipy only loaded for this per-window reference)
+    from scipy import stats
     slope, intercept, r_value, p_value, std_err = stats.linregress(x, values)
     
-    return slope
\ No newline at end of file
+    return slope
+
+
+def slope_weights(window: int = 5, halflife: float = None) -> np.ndarray:
+    """
+    Weights that turn `window` consecutive values into their least-squares slope.
+
+    With x = 0..window-1 the OLS slope is sum(w * y), w = (x - mean(x)) / sum((x - mean(x))^2).
+    With a `halflife` (in matches) the fit is weighted, the latest value
+    weighing 1 and each earlier one 0.5 ** (1 / halflife) times the next.
+
+    Args:
+        window: Number of values in the fit
+        halflife: Half-life of the exponential weights (default: plain OLS)
+
+    Returns:
+        np.ndarray of `window` weights, oldest value first
+    """
+    x = np.arange(window, dtype=float)
+    fit_weights = np.ones(window) if halflife is None else 0.5 ** ((window - 1 - x) / halflife)
+    x_mean = (fit_weights * x).sum() / fit_weights.sum()
+    return fit_weights * (x - x_mean) / (fit_weights * (x - x_mean) ** 2).sum()
+
+
+def rolling_slopes(values: np.ndarray, group: np.ndarray, window: int = 5, halflife: float = None) -> np.ndarray:
+    """
+    Slope of the last `window` values of the same group, at every position.
+
+    Every window is one row of a strided view multiplied by `slope_weights`,
+    so all groups are fitted with a single matrix-vector product. Matches
+    `rolling(window, min_periods=window).apply(calculate_slope)` per group:
+    NaN until the group has `window` values and when any value is NaN.
+
+    Args:
+        values: Values in group/time order
+        group: Sorted group code of each position
+        window: Number of values in each fit
+        halflife: Exponentially weighted fit (see `slope_weights`)
+
+    Returns:
+        np.ndarray aligned with `values`
+    """
+    values = np.asarray(values, dtype=float)
+    slopes = np.full(len(values), np.nan)
+    if len(values) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window)
+        slopes[window - 1:] = windows @ slope_weights(window, halflife)
+    # Windows reaching back into the previous group
+    slopes[np.arange(len(values)) - np.searchsorted(group, group) < window - 1] = np.nan
+    return slopes
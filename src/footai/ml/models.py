@@ -1,9 +1,5 @@
 #From financial-ml
 import numpy as np
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import FunctionTransformer
-from sklearn.impute import SimpleImputer
-from sklearn.ensemble import RandomForestClassifier
 
 
 
@@ -122,9 +118,15 @@ def _sanitize_infinities(X):
 
 def build_sanitize():
     """Create transformer to replace infinite values with NaN."""
+    from sklearn.preprocessing import FunctionTransformer
     return FunctionTransformer(_sanitize_infinities, validate=False)
 
 def get_models(args):
+    # sklearn is imported here so that loading MODEL_METADATA (CLI parser) stays cheap
+    from sklearn.pipeline import Pipeline
+    from sklearn.impute import SimpleImputer
+    from sklearn.ensemble import RandomForestClassifier
+
     tier = getattr(args, "tier", None) if args else None
     use_multicountry = getattr(args, "multi_countries", False) if args else False
     if tier is not None:
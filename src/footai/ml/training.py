@@ -13,7 +13,10 @@ from sklearn.model_selection import TimeSeriesSplit
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score, recall_score
 from sklearn.preprocessing import LabelEncoder
 from footai.ml.models import get_models
+from footai.data.feature_store import load_feature_store
+from footai.data.feature_loader import check_feature_set
 from footai.utils.config import select_features, COUNTRIES
+from footai.ml.feature_engineering.registry import training_columns
 from footai.ml.evaluation import (
     get_tier_confusion_matrix,
     print_cv_strategy,
@@ -68,7 +71,9 @@ def train_model(features_csv, feature_set="baseline",
     if verbose:
         print(f"Loading features from: {features_csv}")
 
-    df = pd.read_csv(features_csv, low_memory=False)
+    # Only the feature set's columns are read
+    df = load_feature_store(features_csv, columns=training_columns(feature_set))
+    check_feature_set(features_csv, feature_set, df.columns)
     df['Date'] = pd.to_datetime(df['Date'])
     df = df.sort_values('Date')
 
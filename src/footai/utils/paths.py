@@ -17,6 +17,12 @@ def year_to_season_code(season):
         season = str(season)
     return season
 
+def get_elo_suffix(args):
+    '''File suffix of the Elo variant: one global engine, per-country chain with transfers, or plain chain'''
+    if getattr(args, 'global_elo', False):
+        return '_global'
+    return '_transfer' if args.elo_transfer else '_multi'
+
 def get_season_paths(country, season, division, dirs, args):
     """
     Get file paths for a season/division combination.
@@ -25,7 +31,7 @@ def get_season_paths(country, season, division, dirs, args):
     """
     
     if args.multi_season:
-        suffix = '_transfer' if args.elo_transfer else '_multi'  
+        suffix = get_elo_suffix(args)
     else:
         suffix = ''
 
@@ -50,11 +56,58 @@ def get_promotion_relegation_file(dirs, country, season):
 
 
 
+def get_roster_index_path(dirs, country):
+    '''Cached season x division team rosters, stored next to the raw data'''
+    raw_dir = Path(dirs[country]['raw'])
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    return raw_dir / f"{country}_rosters.json"
+
+
+def get_download_manifest_path(raw_file):
+    '''Download manifest (URL, ETag, Last-Modified, SHA-256, rows) of the raw files in the same directory'''
+    return Path(raw_file).parent / 'download_manifest.json'
+
+
+def get_feature_cache_dir(feat_dir):
+    '''Features cache shared by all countries, next to the per-country feature directories'''
+    cache_dir = Path(feat_dir).parent / 'cache'
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
 def get_multiseason_path(multiseason_dir, division, season_start, season_end, args=None):
-    suffix = '_transfer' if args.elo_transfer else '_multi'
+    suffix = get_elo_suffix(args)
     multiseason_dir.mkdir(parents=True, exist_ok=True)
     return multiseason_dir / f'{division}_{season_start}_to_{season_end}{suffix}.csv'
 
+def get_elo_snapshot_path(dirs, country, season, args):
+    '''Rating snapshot at the start of a season (after decay and transfers)'''
+    suffix = get_elo_suffix(args)
+    snapshot_dir = Path(dirs[country]['proc']) / "snapshots"
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    return snapshot_dir / f"{country}_{season}_elo_snapshot{suffix}.json"
+
+def get_elo_sweep_path(countries, seasons, args, results_dir='results'):
+    '''Results table of an Elo parameter sweep'''
+    suffix = get_elo_suffix(args)
+    sweep_dir = Path(results_dir) / "elo_sweep"
+    sweep_dir.mkdir(parents=True, exist_ok=True)
+    return sweep_dir / f"{'_'.join(countries)}_{seasons[0]}_to_{seasons[-1]}{suffix}.csv"
+
+def get_elo_state_path(multiseason_path):
+    '''End-of-file rating state stored next to a multi-season Elo file'''
+    multiseason_path = Path(multiseason_path)
+    state_dir = multiseason_path.parent / "state"
+    state_dir.mkdir(parents=True, exist_ok=True)
+    return state_dir / f"{multiseason_path.stem}_state.json"
+
+def get_elo_index_path(multiseason_path):
+    '''As-of rating index stored next to a multi-season Elo file'''
+    multiseason_path = Path(multiseason_path)
+    index_dir = multiseason_path.parent / "index"
+    index_dir.mkdir(parents=True, exist_ok=True)
+    return index_dir / f"{multiseason_path.stem}_index.npz"
+
 def get_data_loc(season, division, country, file_dir = None, file_type='', suffix='', verbose=False):
     """
     Generate file path for data storage.
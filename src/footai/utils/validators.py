@@ -118,3 +118,44 @@ def validate_decay_factors(value):
     
     
     return fvalue
+
+
+def validate_float_list(value):
+    """
+    Parse a comma- or space-separated list of numbers (e.g. "16,24,32").
+
+    Returns:
+        list[float]: Parsed values
+
+    Raises:
+        argparse.ArgumentTypeError: If any entry is not a number
+    """
+    parts = str(value).replace(',', ' ').split()
+    try:
+        values = [float(p) for p in parts]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected a list of numbers, got '{value}'")
+    if not values:
+        raise argparse.ArgumentTypeError("Expected at least one value")
+    return values
+
+
+def validate_decay_list(value):
+    """Parse a list of decay factors, each between 0 and 1 (inclusive)."""
+    values = validate_float_list(value)
+    for fvalue in values:
+        if fvalue < 0 or fvalue > 1:
+            raise argparse.ArgumentTypeError(f"Decay factor must be between 0 and 1 (inclusive), got {fvalue}")
+    return values
+
+
+def validate_window_list(value):
+    """Parse a list of rolling window sizes (positive integers), sorted and without duplicates."""
+    parts = str(value).replace(',', ' ').split()
+    try:
+        values = sorted({int(p) for p in parts})
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected a list of integers, got '{value}'")
+    if not values or values[0] < 1:
+        raise argparse.ArgumentTypeError(f"Window sizes must be positive integers, got '{value}'")
+    return values
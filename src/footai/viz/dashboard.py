@@ -1,4 +1,5 @@
 import types
+import pandas as pd
 from dash import (
     Dash,
     dcc,
@@ -6,7 +7,9 @@ from dash import (
     Input,
     Output
 )
+import plotly.graph_objects as go
 from footai.viz.plotter import plot_elo_rankings
+from footai.core.elo_index import load_elo_index
 from footai.utils.config import (
     setup_directories,
     COUNTRIES,
@@ -57,7 +60,13 @@ app.layout = html.Div([
         tooltip={"placement": "bottom", "always_visible": False}
     ),
 
-    dcc.Graph(id='elo-graph')
+    dcc.Graph(id='elo-graph'),
+
+    dcc.DatePickerSingle(
+        id='asof-date',
+        display_format='YYYY-MM-DD'
+    ),
+    dcc.Graph(id='asof-graph')
 ])
 
 @app.callback(
@@ -101,5 +110,34 @@ def update_graph(country='SP', division='SP1', season_range = 25):
         path = get_multiseason_path(dirs[country]['proc'], division, season_list[0],season_list[-1], args)
         return plot_elo_rankings(path, division=division, selected_seasons=selected_seasons, custom_title=f"({COUNTRIES[country]['divisions'][division]})")
 
+@app.callback(
+    Output('asof-graph', 'figure'),
+    [Input('country-dropdown', 'value'),
+     Input('division-dropdown', 'value'),
+     Input('asof-date', 'date')]
+)
+def update_asof_graph(country='SP', division='SP1', date=None):
+    """Bar chart of every team's rating on the picked date, read from the as-of index."""
+    fig = go.Figure()
+    fig.update_layout(yaxis_title="Elo Rating", height=400, template='plotly_white')
+    if date is None:
+        return fig.update_layout(title="Pick a date to see the ratings on that day")
+
+    args = types.SimpleNamespace(
+        countries = [country],
+        elo_transfer = True
+    )
+    dirs = setup_directories(args)
+    path = get_multiseason_path(dirs[country]['proc'], division, season_list[0], season_list[-1], args)
+    index = load_elo_index(path)
+
+    # Only teams with a match in the last 120 days (the plotter's gap threshold), so departed teams drop out
+    recent = index.ratings_as_of(date)
+    cutoff = pd.Timestamp(date) - pd.Timedelta(days=120)
+    ratings = {team: elo for team, elo in recent.items() if len(index.range(team, cutoff, date)[0])}
+    ranked = sorted(ratings.items(), key=lambda x: x[1], reverse=True)
+    fig.add_trace(go.Bar(x=[team for team, _ in ranked], y=[elo for _, elo in ranked]))
+    return fig.update_layout(title=f"Elo Ratings on {date} ({COUNTRIES[country]['divisions'][division]})")
+
 if __name__ == '__main__':
     app.run(debug=True, port=8050)
\ No newline at end of file
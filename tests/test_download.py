@@ -0,0 +1,127 @@
+"""Test the pooled season downloader against a local HTTP server."""
+import os
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from footai.data.match_data import CHUNK_SIZE, changed_files, download_seasons, file_sha256, load_download_manifest
+
+
+@pytest.fixture
+def fixture_server(temp_data_dir):
+    """Serve `<root>/<season>/<division>.csv` like football-data.co.uk; the first E1 request fails with 503, D1 is cut short."""
+    root = temp_data_dir / 'site'
+    (root / '2425').mkdir(parents=True)
+    (root / '2425' / 'SP1.csv').write_bytes('\ufeffDiv,HomeTeam,AwayTeam\nSP1,Sevilla,Betis\nSP1,Getafe,Cadiz\n'.encode('utf-8'))
+    (root / '2425' / 'E1.csv').write_bytes('Div,HomeTeam,AwayTeam\nE1,Leeds,Hull\n'.encode('utf-8'))
+    failures = {'/2425/E1.csv': 1}
+
+    class Handler(SimpleHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/2425/D1.csv':
+                # Connection dropped halfway through the body
+                self.send_response(200)
+                self.send_header('Content-Length', '1000')
+                self.end_headers()
+                self.wfile.write(b'Div,HomeTeam,AwayTeam\nD1,Bayern,')
+                self.close_connection = True
+                return
+            if failures.get(self.path):
+                failures[self.path] -= 1
+                self.send_error(503)
+                return
+            super().do_GET()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(Handler, directory=str(root)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", root
+    server.shutdown()
+    server.server_close()
+
+
+def test_concurrent_download_with_retry(fixture_server, temp_data_dir):
+    """Files are written without BOM, transient errors are retried and missing files reported."""
+    base_url, _ = fixture_server
+    out = temp_data_dir / 'raw'
+    out.mkdir()
+    downloads = [('2425', div, out / f'{div}.csv') for div in ('SP1', 'E1', 'I1')]
+    results = download_seasons(downloads, workers=3, retries=2, backoff=0.01, base_url=base_url)
+
+    assert [row['division'] for row in results] == ['SP1', 'E1', 'I1']
+    assert [row['success'] for row in results] == [True, True, False]
+    assert [row['matches'] for row in results] == [2, 1, 0]
+    assert [row['attempts'] for row in results] == [1, 2, 1]
+    assert (out / 'SP1.csv').read_text(encoding='utf-8').startswith('Div,HomeTeam')
+    assert not (out / 'I1.csv').exists()
+
+
+def test_conditional_redownload_only_changes_updated_files(fixture_server, temp_data_dir):
+    """Unchanged files answer 304 and are not rewritten; the manifest tracks the new content."""
+    base_url, root = fixture_server
+    out = temp_data_dir / 'raw'
+    out.mkdir()
+    downloads = [('2425', div, out / f'{div}.csv') for div in ('SP1', 'E1')]
+    first = download_seasons(downloads, retries=1, backoff=0.01, base_url=base_url)
+    assert changed_files(first) == [str(out / 'SP1.csv'), str(out / 'E1.csv')]
+    manifest = load_download_manifest(out / 'download_manifest.json')
+    assert manifest['SP1.csv']['rows'] == 2
+    assert manifest['SP1.csv']['sha256'] == file_sha256(out / 'SP1.csv')
+    mtime = (out / 'SP1.csv').stat().st_mtime_ns
+
+    (root / '2425' / 'E1.csv').write_text('Div,HomeTeam,AwayTeam\nE1,Leeds,Hull\nE1,Hull,Leeds\n', encoding='utf-8')
+    future = time.time() + 10
+    os.utime(root / '2425' / 'E1.csv', (future, future))
+    second = download_seasons(downloads, retries=1, backoff=0.01, base_url=base_url)
+    assert [row['success'] for row in second] == [True, True]
+    assert changed_files(second) == [str(out / 'E1.csv')]
+    assert 'not modified' in second[0]['message']
+    assert (out / 'SP1.csv').stat().st_mtime_ns == mtime
+    assert load_download_manifest(out / 'download_manifest.json')['E1.csv']['rows'] == 2
+
+
+def test_interrupted_download_keeps_previous_file(fixture_server, temp_data_dir):
+    """A truncated body is retried and never replaces the existing file."""
+    base_url, _ = fixture_server
+    out = temp_data_dir / 'raw'
+    out.mkdir()
+    (out / 'D1.csv').write_text('Div,HomeTeam,AwayTeam\nD1,Bayern,Mainz\n', encoding='utf-8')
+    results = download_seasons([('2425', 'D1', out / 'D1.csv')], retries=1, backoff=0.01, base_url=base_url)
+
+    assert not results[0]['success'] and results[0]['attempts'] == 2
+    assert (out / 'D1.csv').read_text(encoding='utf-8') == 'Div,HomeTeam,AwayTeam\nD1,Bayern,Mainz\n'
+    assert sorted(path.name for path in out.iterdir()) == ['D1.csv']
+
+
+def test_latin1_file_transcoded_across_chunks(fixture_server, temp_data_dir):
+    """A Latin-1 file whose accented names straddle chunk boundaries is stored as the same text in UTF-8."""
+    base_url, root = fixture_server
+    out = temp_data_dir / 'raw'
+    out.mkdir()
+    def pad_to(body, offset, prefix):
+        # Filler row so that the byte after `prefix` lands at `offset`
+        filler = offset - len(body) - len(prefix) - len(b'SP2,,Eibar\n')
+        return body + b'SP2,' + b'x' * filler + b',Eibar\n' + prefix
+
+    body = b'Div,HomeTeam,AwayTeam\n'
+    while len(body) < CHUNK_SIZE - 100:
+        body += b'SP2,Eibar,Huesca\n'
+    # The first chunk ends on the e-acute of "Alaves" (a byte the UTF-8 decoder is still holding),
+    # the second one on the a-acute of "Cadiz"
+    body = pad_to(body, CHUNK_SIZE - 1, b'SP2,Alav') + 'és,Atlético\n'.encode('latin-1')
+    while len(body) < 2 * CHUNK_SIZE - 100:
+        body += 'SP2,Leganés,Huesca\n'.encode('latin-1')
+    body = pad_to(body, 2 * CHUNK_SIZE - 1, b'SP2,C') + 'ádiz,Málaga\n'.encode('latin-1')
+    assert body[CHUNK_SIZE - 1] == 0xe9 and body[2 * CHUNK_SIZE - 1] == 0xe1
+    (root / '2425' / 'SP2.csv').write_bytes(body)
+
+    results = download_seasons([('2425', 'SP2', out / 'SP2.csv')], retries=1, backoff=0.01, base_url=base_url)
+    assert results[0]['success']
+    assert results[0]['matches'] == body.count(b'\n') - 1
+    stored = (out / 'SP2.csv').read_bytes().decode('utf-8')
+    assert stored == body.decode('latin-1')
+    assert 'SP2,Alavés,Atlético\n' in stored and 'SP2,Cádiz,Málaga\n' in stored
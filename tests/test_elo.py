@@ -0,0 +1,256 @@
+"""Test the array-backed Elo engine."""
+import numpy as np
+import pandas as pd
+from collections import defaultdict
+from footai.utils.paths import get_elo_snapshot_path, get_elo_sweep_path
+from footai.core.elo import EloEngine, apply_promotion_transfers, calculate_elo_season, expected_score, new_elo
+
+
+def _matches():
+    return pd.DataFrame({
+        'Date': ['10/08/2024', '11/08/2024', '17/08/2024', '18/08/2024', '24/08/2024'],
+        'HomeTeam': ['Sevilla', 'Betis', 'Betis', 'Sevilla', 'Getafe'],
+        'AwayTeam': ['Getafe', 'Cadiz', 'Sevilla', 'Cadiz', 'Betis'],
+        'FTHG': [2, 1, 0, 3, 1],
+        'FTAG': [0, 1, 1, 3, 2],
+    })
+
+
+def _rowwise_reference(df, team_starting_elos=None):
+    """Plain dict-based Elo loop the engine must reproduce exactly."""
+    elos = defaultdict(lambda: 1500)
+    elos.update(team_starting_elos or {})
+    rows = []
+    for home, away, hg, ag in zip(df['HomeTeam'], df['AwayTeam'], df['FTHG'], df['FTAG']):
+        he, ae = elos[home], elos[away]
+        hx, ax = expected_score(he, ae), expected_score(ae, he)
+        rows.append((he, ae, hx, ax))
+        actual = 1.0 if hg > ag else (0.0 if hg < ag else 0.5)
+        elos[home] = new_elo(he, hx, actual)
+        elos[away] = new_elo(ae, ax, 1.0 - actual)
+    return np.array(rows), dict(elos)
+
+
+def test_season_matches_rowwise_reference():
+    """Engine output is bit-identical to the row-wise loop."""
+    starting = {'Sevilla': 1550.25, 'Cadiz': 1460.5}
+    out = calculate_elo_season(_matches(), team_starting_elos=starting)
+    expected, _ = _rowwise_reference(_matches(), starting)
+    actual = out[['HomeElo', 'AwayElo', 'HomeExpected', 'AwayExpected']].to_numpy()
+    assert np.array_equal(actual, expected)
+
+
+def test_engine_keeps_codes_and_ratings_across_calls():
+    """Teams keep their integer code and rating between fixture batches."""
+    df = _matches()
+    engine = EloEngine()
+    engine.process(df['HomeTeam'][:2], df['AwayTeam'][:2], df['FTHG'][:2], df['FTAG'][:2])
+    engine.process(df['HomeTeam'][2:], df['AwayTeam'][2:], df['FTHG'][2:], df['FTAG'][2:])
+    _, reference = _rowwise_reference(df)
+    assert engine.teams == ['Sevilla', 'Betis', 'Getafe', 'Cadiz']
+    for team, code in engine.team_index.items():
+        assert engine.ratings[code] == reference[team]
+
+
+def test_incremental_append_matches_full_run(temp_data_dir):
+    """Appending new matchdays gives the same ratings as a full recomputation."""
+    import argparse
+    from footai.core.elo import calculate_elo_multiseason, append_elo_multiseason
+    from footai.utils.paths import get_multiseason_path
+
+    args = argparse.Namespace(multi_season=True, elo_transfer=False, verbose=False)
+    dirs = {'SP': {key: temp_data_dir / key for key in ('raw', 'proc', 'feat', 'fig')}}
+    raw_path = temp_data_dir / 'raw' / 'SP_2425_SP1.csv'
+    raw_path.parent.mkdir(parents=True)
+    matches = _matches()
+
+    matches.to_csv(raw_path, index=False)
+    calculate_elo_multiseason(['2425'], ['SP1'], 'SP', dirs, args=args)
+    multi_path = get_multiseason_path(dirs['SP']['proc'], 'SP1', '2425', '2425', args)
+    full = pd.read_csv(multi_path)
+
+    matches.iloc[:3].to_csv(raw_path, index=False)
+    calculate_elo_multiseason(['2425'], ['SP1'], 'SP', dirs, args=args)
+    matches.to_csv(raw_path, index=False)
+    assert append_elo_multiseason(['2425'], ['SP1'], 'SP', dirs, args=args)
+    pd.testing.assert_frame_equal(pd.read_csv(multi_path), full)
+
+
+
+def test_incremental_append_refuses_other_parameters(temp_data_dir):
+    """A state built with other decay factors or transfer mode is not appended to."""
+    import argparse
+    from footai.core.elo import calculate_elo_multiseason, append_elo_multiseason
+
+    args = argparse.Namespace(multi_season=True, elo_transfer=False, verbose=False)
+    dirs = {'SP': {key: temp_data_dir / key for key in ('raw', 'proc', 'feat', 'fig')}}
+    raw_path = temp_data_dir / 'raw' / 'SP_2425_SP1.csv'
+    raw_path.parent.mkdir(parents=True)
+    matches = _matches()
+    matches.iloc[:3].to_csv(raw_path, index=False)
+    calculate_elo_multiseason(['2425'], ['SP1'], 'SP', dirs, decay_factors={'tier1': 0.9}, args=args)
+    matches.to_csv(raw_path, index=False)
+
+    assert not append_elo_multiseason(['2425'], ['SP1'], 'SP', dirs, decay_factors={'tier1': 0.8}, args=args)
+    assert append_elo_multiseason(['2425'], ['SP1'], 'SP', dirs, decay_factors={'tier1': 0.9}, args=args)
+
+def test_resume_from_snapshot_skips_earlier_raw_files(temp_data_dir):
+    """Resuming at a season boundary reproduces the full run without the earlier raw files."""
+    import argparse
+    from footai.core.elo import calculate_elo_multiseason
+    from footai.utils.paths import get_multiseason_path
+
+    args = argparse.Namespace(multi_season=True, elo_transfer=False, verbose=False)
+    dirs = {'SP': {key: temp_data_dir / key for key in ('raw', 'proc', 'feat', 'fig')}}
+    dirs['SP']['raw'].mkdir(parents=True)
+    seasons = ['2324', '2425']
+    for season in seasons:
+        _matches().to_csv(dirs['SP']['raw'] / f'SP_{season}_SP1.csv', index=False)
+
+    calculate_elo_multiseason(seasons, ['SP1'], 'SP', dirs, args=args)
+    multi_path = get_multiseason_path(dirs['SP']['proc'], 'SP1', seasons[0], seasons[-1], args)
+    full = pd.read_csv(multi_path)
+
+    (dirs['SP']['raw'] / 'SP_2324_SP1.csv').unlink()
+    calculate_elo_multiseason(seasons, ['SP1'], 'SP', dirs, args=args, resume_from='2425')
+    pd.testing.assert_frame_equal(pd.read_csv(multi_path), full)
+
+
+def test_sweep_variant_matches_single_run(temp_data_dir):
+    """A sweep variant scores the same HomeExpected as the single-run chain."""
+    import argparse
+    from footai.core.elo import calculate_elo_multiseason
+    from footai.core.elo_sweep import build_param_grid, sweep_elo_parameters
+    from footai.utils.paths import get_multiseason_path
+
+    args = argparse.Namespace(multi_season=True, elo_transfer=False, verbose=False)
+    dirs = {'SP': {key: temp_data_dir / key for key in ('raw', 'proc', 'feat', 'fig')}}
+    dirs['SP']['raw'].mkdir(parents=True)
+    seasons = ['2324', '2425']
+    for season in seasons:
+        _matches().to_csv(dirs['SP']['raw'] / f'SP_{season}_SP1.csv', index=False)
+
+    calculate_elo_multiseason(seasons, ['SP1'], 'SP', dirs, decay_factors={'tier1': 0.8}, args=args)
+    chain = pd.read_csv(get_multiseason_path(dirs['SP']['proc'], 'SP1', seasons[0], seasons[-1], args))
+    chain = chain[chain['Season'] == 2425]
+    outcome = np.where(chain['FTHG'] > chain['FTAG'], 1.0, np.where(chain['FTHG'] < chain['FTAG'], 0.0, 0.5))
+
+    grid = build_param_grid([16, 32], [0.8], [0.8], [1500])
+    results = sweep_elo_parameters(seasons, ['SP1'], 'SP', dirs, grid, args=args)
+    assert results['n_matches'].tolist() == [5, 5]
+    assert np.isclose(results['brier'].iloc[1], np.mean((chain['HomeExpected'] - outcome) ** 2))
+
+
+def test_multiseason_carries_post_season_ratings(temp_data_dir):
+    """The next season starts from each team's rating after its last match."""
+    import argparse
+    from footai.core.elo import calculate_elo_multiseason
+    from footai.utils.paths import get_multiseason_path
+
+    args = argparse.Namespace(multi_season=True, elo_transfer=False, verbose=False)
+    dirs = {'SP': {key: temp_data_dir / key for key in ('raw', 'proc', 'feat', 'fig')}}
+    dirs['SP']['raw'].mkdir(parents=True)
+    seasons = ['2324', '2425']
+    for season in seasons:
+        _matches().to_csv(dirs['SP']['raw'] / f'SP_{season}_SP1.csv', index=False)
+
+    calculate_elo_multiseason(seasons, ['SP1'], 'SP', dirs, decay_factors={'tier1': 1.0}, args=args)
+    multi = pd.read_csv(get_multiseason_path(dirs['SP']['proc'], 'SP1', seasons[0], seasons[-1], args))
+    _, post_season = _rowwise_reference(_matches())
+    second = multi[multi['Season'] == 2425].iloc[0]
+    assert second['HomeElo'] == post_season[second['HomeTeam']]
+    assert second['AwayElo'] == post_season[second['AwayTeam']]
+
+
+def test_asof_index_follows_incremental_append(temp_data_dir):
+    """The persisted as-of index answers with post-match ratings and stays in sync on append."""
+    import argparse
+    from footai.core.elo import calculate_elo_multiseason, append_elo_multiseason
+    from footai.core.elo_index import EloHistoryIndex
+    from footai.utils.paths import get_multiseason_path, get_elo_index_path
+
+    args = argparse.Namespace(multi_season=True, elo_transfer=False, verbose=False)
+    dirs = {'SP': {key: temp_data_dir / key for key in ('raw', 'proc', 'feat', 'fig')}}
+    raw_path = temp_data_dir / 'raw' / 'SP_2425_SP1.csv'
+    raw_path.parent.mkdir(parents=True)
+    matches = _matches()
+    matches.iloc[:3].to_csv(raw_path, index=False)
+    calculate_elo_multiseason(['2425'], ['SP1'], 'SP', dirs, args=args)
+    matches.to_csv(raw_path, index=False)
+    assert append_elo_multiseason(['2425'], ['SP1'], 'SP', dirs, args=args)
+
+    index_path = get_elo_index_path(get_multiseason_path(dirs['SP']['proc'], 'SP1', '2425', '2425', args))
+    index = EloHistoryIndex.load(index_path)
+    _, final = _rowwise_reference(matches)
+    assert index.ratings_as_of('2024-12-31') == final
+    assert np.isnan(index.rating_as_of('Sevilla', '2024-08-09'))
+    assert index.rating_as_of('Sevilla', ['2024-08-16', '2024-08-17'])[1] == index.range('Sevilla', '2024-08-17', '2024-08-17')[1][0]
+
+    calculate_elo_multiseason(['2425'], ['SP1'], 'SP', dirs, args=args)
+    rebuilt = EloHistoryIndex.load(index_path)
+    assert index.teams == rebuilt.teams
+    assert np.array_equal(index.offsets, rebuilt.offsets)
+    assert np.array_equal(index.dates, rebuilt.dates)
+    assert np.array_equal(index.ratings, rebuilt.ratings)
+
+
+def test_global_engine_keeps_team_rating_across_divisions(temp_data_dir):
+    """One rating table: a relegated team carries its own rating into the lower division."""
+    import argparse
+    from footai.core.elo import calculate_elo_multiseason
+    from footai.core.elo_global import calculate_elo_global
+    from footai.utils.paths import get_multiseason_path
+
+    dirs = {'SP': {key: temp_data_dir / key for key in ('raw', 'proc', 'feat', 'fig')}}
+    dirs['SP']['raw'].mkdir(parents=True)
+    lower = pd.DataFrame({
+        'Date': ['12/08/2023', '10/08/2024'],
+        'HomeTeam': ['Eibar', 'Eibar'],
+        'AwayTeam': ['Oviedo', 'Cadiz'],
+        'FTHG': [1, 2],
+        'FTAG': [0, 2],
+    })
+    for season in ['2324', '2425']:
+        _matches().to_csv(dirs['SP']['raw'] / f'SP_{season}_SP1.csv', index=False)
+        lower[lower['Date'].str.endswith(f'20{season[:2]}')].to_csv(dirs['SP']['raw'] / f'SP_{season}_SP2.csv', index=False)
+
+    # A single division without team changes reproduces the per-country chain
+    args = argparse.Namespace(multi_season=True, elo_transfer=False, verbose=False, global_elo=True)
+    chain_args = argparse.Namespace(multi_season=True, elo_transfer=False, verbose=False)
+    calculate_elo_global(['2324', '2425'], ['SP'], {'SP': ['SP1']}, dirs, decay_factors={'tier1': 0.9}, args=args)
+    calculate_elo_multiseason(['2324', '2425'], ['SP1'], 'SP', dirs, decay_factors={'tier1': 0.9}, args=chain_args)
+    pd.testing.assert_frame_equal(
+        pd.read_csv(get_multiseason_path(dirs['SP']['proc'], 'SP1', '2324', '2425', args)),
+        pd.read_csv(get_multiseason_path(dirs['SP']['proc'], 'SP1', '2324', '2425', chain_args)),
+    )
+
+    engine = calculate_elo_global(['2324', '2425'], ['SP'], {'SP': ['SP1', 'SP2']}, dirs, decay_factors={'tier1': 0.9, 'tier2': 1.0}, args=args)
+    sp2 = pd.read_csv(get_multiseason_path(dirs['SP']['proc'], 'SP2', '2324', '2425', args))
+    _, post_season = _rowwise_reference(_matches())
+    # Cadiz enters SP2 with its own tier-1 rating, decayed once
+    assert sp2.iloc[-1]['AwayElo'] == 1500 + (post_season['Cadiz'] - 1500) * 0.9
+    assert set(engine.final_ratings()) == {'Sevilla', 'Betis', 'Getafe', 'Cadiz', 'Eibar', 'Oviedo'}
+
+
+def test_promotion_transfers_without_tier2_relegations():
+    """Tier 1 <-> tier 2 swaps apply even when no team left tier 2 downwards."""
+    # Tier 2 only swapped teams with tier 1: nobody went down to tier 3
+    promo_relego = pd.DataFrame({
+        'tier': ['tier1', 'tier1', 'tier2'],
+        'team': ['Cadiz', 'Leganes', 'Cadiz'],
+        'status': ['relegated', 'promoted', 'promoted'],
+    })
+    carry = {'SP1': {}, 'SP2': {}}
+    apply_promotion_transfers(promo_relego, {'Cadiz': 1450.0}, {'Leganes': 1560.0}, carry, ['SP1', 'SP2'],
+                              {'tier1': 0.5, 'tier2': 0.5}, initial_elo=1500)
+    assert carry['SP1'] == {'Leganes': 1475.0}
+    assert carry['SP2'] == {'Cadiz': 1530.0}
+
+
+def test_snapshot_and_sweep_paths_per_elo_variant(temp_data_dir):
+    """Global, transfer and plain multi-season runs never share snapshot or sweep files."""
+    import argparse
+    dirs = {'SP': {'proc': temp_data_dir}}
+    variants = [argparse.Namespace(elo_transfer=transfer, global_elo=global_elo) for transfer, global_elo in ((True, True), (True, False), (False, False))]
+    assert len({get_elo_snapshot_path(dirs, 'SP', '2425', args) for args in variants}) == 3
+    assert len({get_elo_sweep_path(['SP'], ['2324', '2425'], args, results_dir=temp_data_dir) for args in variants}) == 3
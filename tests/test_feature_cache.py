@@ -0,0 +1,35 @@
+"""Test the content-addressed features cache."""
+import os
+import pandas as pd
+from footai.data.feature_cache import feature_cache_key, restore_cached_features, store_cached_features
+from footai.data.feature_store import save_feature_store, load_feature_store
+from footai.data.team_registry import TeamRegistry
+
+
+def test_cache_restores_entry_and_evicts_oldest(temp_data_dir):
+    """A stored entry is restored on key match, other inputs miss, old entries are evicted."""
+    registry = TeamRegistry(path=temp_data_dir / 'team_registry.json')
+    cache_dir = temp_data_dir / 'cache'
+    cache_dir.mkdir()
+    elo_path = temp_data_dir / 'SP1_elo.csv'
+    elo_path.write_text('Date,HomeTeam,AwayTeam\n2024-08-15,Sevilla,Betis\n')
+    key = feature_cache_key(elo_path, 1, window_sizes=[3, 5], feature_set=None)
+    assert key != feature_cache_key(elo_path, 2, window_sizes=[3, 5], feature_set=None)
+    assert key != feature_cache_key(elo_path, 1, window_sizes=[3, 5, 10], feature_set=None)
+
+    feat_path = temp_data_dir / 'SP1_feat.csv'
+    df = pd.DataFrame({'Date': pd.to_datetime(['2024-08-15']), 'elo_diff': [12.5]})
+    save_feature_store(df, feat_path, version=1, metadata={'cache_key': key})
+    assert store_cached_features(cache_dir, key, feat_path, max_bytes=10 ** 6) == []
+
+    other_path = temp_data_dir / 'other' / 'SP1_feat.csv'
+    other_path.parent.mkdir()
+    assert not restore_cached_features(cache_dir, 'missing', other_path)
+    assert restore_cached_features(cache_dir, key, other_path)
+    assert load_feature_store(other_path, registry=registry)['elo_diff'].tolist() == [12.5]
+
+    # A newer entry pushes the least recently used one out of a small cache
+    os.utime(cache_dir / key, (0, 0))
+    save_feature_store(df, feat_path, version=1, metadata={'cache_key': 'newer'})
+    assert store_cached_features(cache_dir, 'newer', feat_path, max_bytes=1) == [key]
+    assert sorted(os.listdir(cache_dir)) == ['newer']
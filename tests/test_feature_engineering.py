@@ -0,0 +1,183 @@
+"""Test the feature engineering building blocks."""
+import numpy as np
+import pandas as pd
+from footai.ml.feature_engineering.ledger import build_team_ledger
+from footai.ml.feature_engineering.market import add_market_features, discover_bookmakers
+from footai.ml.feature_engineering.pipeline import engineer_features, update_features
+from footai.ml.feature_engineering.registry import feature_set_builders
+from footai.ml.feature_engineering.rolling import (
+    ROLLING_STATS, calculate_slope, grouped_shifted_mean, rolling_slopes, rolling_team_features
+)
+
+
+def _matches():
+    return pd.DataFrame({
+        'Date': pd.to_datetime(['2024-08-10', '2024-08-11', '2024-08-17', '2024-08-18', '2024-08-24', '2024-08-25']),
+        'HomeTeam': ['Sevilla', 'Betis', 'Betis', 'Sevilla', 'Getafe', 'Cadiz'],
+        'AwayTeam': ['Getafe', 'Cadiz', 'Sevilla', 'Cadiz', 'Betis', 'Sevilla'],
+        'FTHG': [2, 1, 0, 3, 1, 0],
+        'FTAG': [0, 1, 1, 3, 2, 0],
+        'FTR': ['H', 'D', 'A', 'D', 'A', 'D'],
+        'HS': [10, 8, 7, 15, 9, 5],
+        'AS': [4, 8, 12, 9, 11, 6],
+    })
+
+
+def _season(teams=('Sevilla', 'Betis', 'Getafe', 'Cadiz', 'Eibar', 'Girona'), rounds=10, seed=0):
+    """Round-robin fixtures with random scores, odds and Elo ratings."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for day in range(rounds):
+        rotated = list(teams[:1]) + list(np.roll(teams[1:], day))
+        for i in range(len(teams) // 2):
+            home, away = rotated[i], rotated[-1 - i]
+            home_goals, away_goals = rng.integers(0, 4, size=2)
+            rows.append({
+                'Div': 'SP1', 'Date': pd.Timestamp('2024-08-10') + pd.Timedelta(days=7 * day),
+                'HomeTeam': home, 'AwayTeam': away, 'FTHG': home_goals, 'FTAG': away_goals,
+                'FTR': 'H' if home_goals > away_goals else ('A' if home_goals < away_goals else 'D'),
+                'HS': rng.integers(5, 20), 'HST': rng.integers(0, 5), 'HF': rng.integers(5, 15), 'HC': rng.integers(0, 10),
+                'AS': rng.integers(5, 20), 'AST': rng.integers(0, 5), 'AF': rng.integers(5, 15), 'AC': rng.integers(0, 10),
+                'B365H': rng.uniform(1.5, 4), 'B365D': rng.uniform(3, 4), 'B365A': rng.uniform(1.5, 5),
+                'HomeElo': rng.uniform(1400, 1600), 'AwayElo': rng.uniform(1400, 1600),
+            })
+    return pd.DataFrame(rows)
+
+
+def test_ledger_stacks_appearances_per_team():
+    """Each team's rows are its home and away matches in date order, seen from its side."""
+    df = _matches()
+    ledger = build_team_ledger(df)
+    assert len(ledger) == 2 * len(df)
+    assert ledger.offsets[-1] == len(ledger)
+
+    sevilla = ledger.rows(ledger.team_code('Sevilla'))
+    assert ledger.match[sevilla].tolist() == [0, 2, 3, 5]
+    assert ledger.is_home[sevilla].tolist() == [True, False, True, False]
+    assert ledger.goals_for[sevilla].tolist() == [2, 1, 3, 0]
+    assert ledger.points[sevilla].tolist() == [3, 3, 1, 1]
+    assert ledger.shots_for[sevilla].tolist() == [10, 12, 15, 6]
+    betis = ledger.rows(ledger.team_code('Betis'))
+    assert ledger.match[betis][ledger.is_home[betis]].tolist() == [1, 2]
+    assert ledger.match[betis][~ledger.is_home[betis]].tolist() == [4]
+    assert np.isnan(ledger.corners_for).all()
+
+
+def test_rolling_features_use_previous_appearances_only():
+    """Window stats come from the team's earlier matches, with the legacy home-side ppg/shots rules."""
+    ledger = build_team_ledger(_matches())
+    features = rolling_team_features(ledger, window_sizes=[3])
+    sevilla = ledger.rows(ledger.team_code('Sevilla'))
+
+    assert np.isnan([values[sevilla][0] for values in features.values()]).all()
+    last = sevilla.stop - 1
+    assert features['goals_scored_L3'][last] == 2.0
+    assert features['ppg_L3'][last] == 4 / 3
+    assert features['shots_L3'][last] == 12.5
+    assert features['shot_accuracy_L3'][last] == 0.0
+    assert np.isnan(features['fouls_L3'][last])
+
+
+def test_team_features_keyed_by_match_not_date():
+    """Two matches of a team on the same date keep their own rolling values."""
+    df = _matches()
+    df.loc[3, 'Date'] = df.loc[2, 'Date']
+    ledger = build_team_ledger(df)
+    goals = rolling_team_features(ledger, window_sizes=[3])['goals_scored_L3']
+
+    sevilla = ledger.rows(ledger.team_code('Sevilla'))
+    by_match = dict(zip(ledger.match[sevilla].tolist(), goals[sevilla].tolist()))
+    assert sorted(by_match) == [0, 2, 3, 5]
+    assert by_match[2] == 2.0
+    assert by_match[3] == 1.5
+
+
+def test_update_features_matches_full_run():
+    """Appending the last two matchdays gives the rows a full run would."""
+    df = _season()
+    features = engineer_features(df.iloc[:-6])
+    updated = update_features(features, df)
+    full = engineer_features(df).sort_values(['Date', 'HomeTeam']).reset_index(drop=True)
+
+    assert len(updated) == len(df)
+    assert list(updated.columns) == list(full.columns)
+    new_rows = updated.iloc[-6:].sort_values(['Date', 'HomeTeam']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(new_rows, full.iloc[-6:].reset_index(drop=True), check_exact=False, rtol=1e-12)
+    assert update_features(features, df.iloc[:-12]) is None
+
+
+def test_feature_set_runs_only_needed_builders():
+    """A baseline run skips the draw/momentum/interaction builders and keeps the full run's values."""
+    options = {'window_sizes': [3, 5], 'draw_windows': [10], 'trend_halflife': None}
+    assert feature_set_builders('baseline', options) == ['rolling', 'match', 'odds']
+    assert feature_set_builders('momentum_lite', options)[-1] == 'momentum'
+
+    df = _season()
+    baseline = engineer_features(df, feature_set='baseline')
+    full = engineer_features(df)
+    assert 'momentum_diff' not in baseline.columns and 'draw_prob_consensus' not in baseline.columns
+    keys = ['Date', 'HomeTeam', 'AwayTeam']
+    pd.testing.assert_frame_equal(
+        baseline.set_index(keys).sort_index(),
+        full.set_index(keys).sort_index()[baseline.columns.drop(keys)],
+    )
+    # Features of another set are not extended, but rebuilt
+    assert update_features(full, df, feature_set='baseline') is None
+
+
+def test_rolling_windows_share_one_pass():
+    """Several windows at once give the same values as one window at a time."""
+    ledger = build_team_ledger(_season())
+    features = rolling_team_features(ledger, window_sizes=[3, 5, 10])
+    assert list(features)[:7] == [f'{name}_L3' for name in ROLLING_STATS]
+    for window in (3, 10):
+        for name, values in rolling_team_features(ledger, window_sizes=[window]).items():
+            np.testing.assert_array_equal(features[name], values)
+
+
+def test_market_features_from_discovered_books():
+    """Every H/D/A triple is a book; aggregates and closing odds are not."""
+    df = pd.DataFrame({
+        'B365H': [2.0, 2.5], 'B365D': [3.0, 3.2], 'B365A': [4.0, np.nan],
+        'PSH': [2.1, 2.6], 'PSD': [3.4, 3.3], 'PSA': [4.2, 3.0],
+        'PSCH': [2.2, 2.4], 'PSCD': [3.3, 3.1], 'PSCA': [3.9, 3.2],
+        'MaxH': [2.2, 2.7], 'MaxD': [3.5, 3.4], 'MaxA': [4.5, 3.1],
+    })
+    assert discover_bookmakers(df.columns) == ['B365', 'PS']
+    assert discover_bookmakers(df.columns, closing=True) == ['PSC']
+
+    df = add_market_features(df)
+    assert df['market_books'].tolist() == [2, 1]
+    margins = [1 / 2.0 + 1 / 3.0 + 1 / 4.0 - 1, 1 / 2.1 + 1 / 3.4 + 1 / 4.2 - 1]
+    assert np.isclose(df['market_overround'][0], np.mean(margins))
+    probs = df[['market_home_prob', 'market_draw_prob', 'market_away_prob']].sum(axis=1)
+    np.testing.assert_allclose(probs, 1.0)
+    assert df['market_best_draw_odds'].tolist() == [3.4, 3.3]
+    assert df['market_best_away_odds'].tolist() == [4.2, 3.0]
+
+
+def test_grouped_shifted_mean_matches_pandas():
+    """Prefix-sum draw rates equal groupby().shift(1).rolling().mean()."""
+    rng = np.random.default_rng(1)
+    group = np.sort(rng.integers(0, 5, size=200))
+    values = rng.integers(0, 2, size=200).astype(float)
+    for window, min_periods in ((10, 3), (5, 3), (20, 1)):
+        expected = (
+            pd.Series(values).groupby(group).transform(lambda x: x.shift(1).rolling(window, min_periods=min_periods).mean())
+        )
+        np.testing.assert_array_equal(grouped_shifted_mean(values, group, window, min_periods), expected.to_numpy())
+
+
+def test_rolling_slopes_match_linregress():
+    """Closed-form slopes equal scipy's per window, within each group only."""
+    rng = np.random.default_rng(2)
+    group = np.repeat([0, 1, 2], [4, 9, 12])
+    values = rng.normal(size=len(group))
+    values[20] = np.nan
+    expected = pd.Series(values).groupby(group).transform(
+        lambda x: x.rolling(5, min_periods=5).apply(calculate_slope, raw=False)
+    )
+    np.testing.assert_allclose(rolling_slopes(values, group), expected.to_numpy(), rtol=1e-12, atol=1e-14)
+
+    # Weighted fit of a straight line is still its slope
+    assert np.isclose(rolling_slopes(np.arange(6.0) * 0.5, np.zeros(6), halflife=2)[-1], 0.5)
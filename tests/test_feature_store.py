@@ -0,0 +1,54 @@
+"""Test the feature store round trip and column selection."""
+import numpy as np
+import pandas as pd
+import pytest
+from footai.data.feature_loader import check_feature_set
+from footai.data.feature_store import save_feature_store, load_feature_store, read_feature_schema, feature_store_exists
+from footai.data.team_registry import TeamRegistry
+from footai.ml.feature_engineering.definitions import FEATURE_SETS
+
+
+def test_round_trip_keeps_dtypes_and_selects_columns(temp_data_dir):
+    """Stored dtypes come back without inference and only the asked columns are read."""
+    registry = TeamRegistry(path=temp_data_dir / 'team_registry.json')
+    path = temp_data_dir / 'SP1_2324_to_2425_transfer.csv'
+    df = pd.DataFrame({
+        'Date': pd.to_datetime(['2023-08-11', '2023-08-12', '2024-08-15']),
+        'HomeTeam': registry.categorical(pd.Series(['Sevilla', 'Getafe', 'Betis'], dtype=object)),
+        'AwayTeam': registry.categorical(pd.Series(['Getafe', 'Betis', 'Sevilla'], dtype=object)),
+        'FTR': pd.Categorical(['H', 'D', 'A']),
+        'Season': [2324, 2324, 2425],
+        'is_home': [1, 1, 1],
+        'elo_diff': [12.5, np.nan, -0.1],
+        'league_home_advantage': pd.Series([0.45, 0.45, 0.5]).astype('category'),
+    })
+    assert not feature_store_exists(path)
+    save_feature_store(df, path, version=3)
+    assert feature_store_exists(path)
+    assert read_feature_schema(path)['version'] == 3
+
+    back = load_feature_store(path, registry=registry)
+    assert list(back.columns) == list(df.columns)
+    assert back['Date'].dtype.kind == 'M' and back['is_home'].dtype == np.int64
+    assert back['HomeTeam'].tolist() == ['Sevilla', 'Getafe', 'Betis']
+    assert back['league_home_advantage'].tolist() == [0.45, 0.45, 0.5]
+    np.testing.assert_allclose(back['elo_diff'], df['elo_diff'])
+
+    subset = load_feature_store(path, columns=lambda col: col in {'Date', 'FTR', 'elo_diff', 'missing'}, registry=registry)
+    assert list(subset.columns) == ['Date', 'FTR', 'elo_diff']
+
+
+def test_training_rejects_features_of_another_set(temp_data_dir):
+    """A file built for one feature set, or lacking a column of the set, is refused for training."""
+    path = temp_data_dir / 'SP1_2324_to_2425_transfer.csv'
+    df = pd.DataFrame({col: [0.5, 0.25] for col in FEATURE_SETS['baseline']})
+    save_feature_store(df, path, version=1, metadata={'feature_set': 'baseline'})
+    check_feature_set(path, 'baseline', df.columns)
+    with pytest.raises(ValueError, match="built for feature set 'baseline'"):
+        check_feature_set(path, 'odds_optimized', df.columns)
+
+    # Full runs (no set recorded) are checked column by column
+    save_feature_store(df, path, version=1, metadata={'feature_set': None})
+    with pytest.raises(ValueError, match='missing columns'):
+        check_feature_set(path, 'odds_optimized', df.columns)
+    check_feature_set(path, 'baseline', df.columns)
@@ -0,0 +1,43 @@
+"""Test the indexed team-name matcher and the team color cache."""
+import json
+import time
+import pandas as pd
+from footai.data import team_colors
+from footai.data.team_colors import CACHE_FILENAME, TeamMatchIndex, update_team_colors
+
+
+def test_index_matches_exact_then_first_substring():
+    """Exact normalized names win, then the first substring match in source order."""
+    index = TeamMatchIndex({
+        'Spain National Team': ['#AA0000'],
+        'Atlético Madrid': ['#CB3524'],
+        'Real Betis Balompié': ['#00954C'],
+        'Betis': ['#00FF00'],
+        'RCD Espanyol Barcelona': ['#007FC8'],
+    })
+    assert index.match('Ath Madrid') == ('Atlético Madrid', ['#CB3524'])
+    assert index.match('Betis') == ('Betis', ['#00FF00'])
+    assert index.match('Espanyol') == ('RCD Espanyol Barcelona', ['#007FC8'])
+    assert index.match('Spain') is None
+    assert index.match('Vigo') is None
+
+
+def test_rerun_uses_cache_without_fetching(temp_data_dir, monkeypatch):
+    """A fresh cache is used as the source and resolved names are stored for the next run."""
+    raw_dir, color_dir = temp_data_dir / 'raw', temp_data_dir / 'colors'
+    raw_dir.mkdir()
+    color_dir.mkdir()
+    pd.DataFrame({'HomeTeam': ['Betis', 'Getafe'], 'AwayTeam': ['Getafe', 'Betis']}).to_csv(raw_dir / 'SP_2425_SP1.csv', index=False)
+    with open(color_dir / CACHE_FILENAME, 'w', encoding='utf-8') as f:
+        json.dump({'source_sha256': 'abc', 'matcher_version': team_colors.MATCHER_VERSION, 'fetched_at': time.time(),
+                   'teams': {'Real Betis': ['#00954C']}, 'resolved': {}}, f)
+
+    def no_network(*args, **kwargs):
+        raise AssertionError('remote fetch')
+    monkeypatch.setattr(team_colors.requests, 'get', no_network)
+
+    update_team_colors('SP', raw_dir, color_dir)
+    with open(color_dir / 'SP_colors.json', encoding='utf-8') as f:
+        assert json.load(f)['colors'] == {'Betis': ['#00954C'], 'Getafe': '#CCCCCC'}
+    with open(color_dir / CACHE_FILENAME, encoding='utf-8') as f:
+        assert json.load(f)['resolved'] == {'Betis': ['Real Betis', ['#00954C']], 'Getafe': None}
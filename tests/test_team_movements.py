@@ -0,0 +1,55 @@
+"""Test promotion/relegation detection from the cached roster index."""
+import argparse
+import pandas as pd
+from footai.core.team_movements import identify_promotions_relegations, load_roster_index
+from footai.data.team_registry import TeamRegistry
+
+
+def _write_season(raw_dir, season, division, teams):
+    pd.DataFrame({'HomeTeam': teams, 'AwayTeam': teams[::-1]}).to_csv(raw_dir / f'SP_{season}_{division}.csv', index=False)
+
+
+def test_rosters_cached_and_refreshed_on_change(temp_data_dir):
+    """All seasons are compared in one call; only rewritten raw files are re-indexed."""
+    args = argparse.Namespace(multi_season=False, elo_transfer=False, verbose=False)
+    dirs = {'SP': {key: temp_data_dir / key for key in ('raw', 'proc', 'feat', 'fig')}}
+    dirs['SP']['raw'].mkdir(parents=True)
+    registry = TeamRegistry(path=temp_data_dir / 'team_registry.json')
+    _write_season(dirs['SP']['raw'], '2223', 'SP1', ['Sevilla', 'Betis', 'Cadiz'])
+    _write_season(dirs['SP']['raw'], '2223', 'SP2', ['Getafe', 'Eibar'])
+    _write_season(dirs['SP']['raw'], '2324', 'SP1', ['Sevilla', 'Betis', 'Getafe'])
+    _write_season(dirs['SP']['raw'], '2324', 'SP2', ['Cadiz', 'Eibar'])
+    _write_season(dirs['SP']['raw'], '2425', 'SP1', ['Sevilla', 'Getafe', 'Eibar'])
+    _write_season(dirs['SP']['raw'], '2425', 'SP2', ['Cadiz', 'Betis'])
+
+    results = identify_promotions_relegations(['2324', '2425'], 'SP', dirs, args, registry=registry)
+    assert results['2324'].values.tolist() == [
+        ['2223_2324', 'tier1', 'Cadiz', 'relegated'],
+        ['2223_2324', 'tier1', 'Getafe', 'promoted'],
+        ['2223_2324', 'tier2', 'Getafe', 'relegated'],
+        ['2223_2324', 'tier2', 'Cadiz', 'promoted'],
+    ]
+    assert set(results['2425'].loc[results['2425']['tier'] == 'tier1', 'team']) == {'Betis', 'Eibar'}
+    assert (temp_data_dir / 'raw' / 'SP_rosters.json').exists()
+
+    # Rewritten file is re-read, the others come from the index
+    _write_season(dirs['SP']['raw'], '2425', 'SP1', ['Sevilla', 'Getafe', 'Eibar', 'Leganes'])
+    rosters = load_roster_index(['2324', '2425'], 'SP', dirs, args, registry=registry)
+    assert {registry.names[team_id] for team_id in rosters[('2425', 'SP1')]} == {'Sevilla', 'Getafe', 'Eibar', 'Leganes'}
+    assert {registry.names[team_id] for team_id in rosters[('2324', 'SP2')]} == {'Cadiz', 'Eibar'}
+
+
+def test_roster_index_independent_of_registry_ids(temp_data_dir):
+    """A registry rebuilt in another order still maps the cached rosters to the right teams."""
+    args = argparse.Namespace(multi_season=False, elo_transfer=False, verbose=False)
+    dirs = {'SP': {key: temp_data_dir / key for key in ('raw', 'proc', 'feat', 'fig')}}
+    dirs['SP']['raw'].mkdir(parents=True)
+    _write_season(dirs['SP']['raw'], '2324', 'SP1', ['Sevilla', 'Betis'])
+    _write_season(dirs['SP']['raw'], '2324', 'SP2', ['Cadiz', 'Eibar'])
+    load_roster_index(['2324'], 'SP', dirs, args, registry=TeamRegistry(path=temp_data_dir / 'first.json'))
+
+    # Another country indexed first: the same IDs now belong to other teams
+    registry = TeamRegistry(['Milan', 'Inter', 'Roma', 'Lazio'], path=temp_data_dir / 'second.json')
+    rosters = load_roster_index(['2324'], 'SP', dirs, args, registry=registry)
+    assert {registry.names[team_id] for team_id in rosters[('2324', 'SP1')]} == {'Sevilla', 'Betis'}
+    assert {registry.names[team_id] for team_id in rosters[('2324', 'SP2')]} == {'Cadiz', 'Eibar'}
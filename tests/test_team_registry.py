@@ -0,0 +1,42 @@
+"""Test the shared team registry and compact match loaders."""
+import numpy as np
+import pandas as pd
+from footai.data.team_registry import TeamRegistry, compact_match_columns, read_match_csv
+
+
+def test_ids_are_stable_across_saves(temp_data_dir):
+    """IDs survive a save/load round trip and concurrent saves keep existing IDs."""
+    path = temp_data_dir / 'team_registry.json'
+    first = TeamRegistry(path=path)
+    other = TeamRegistry(path=path)
+    assert first.encode(['Sevilla', None, 'Betis', 'Sevilla']).tolist() == [0, -1, 1, 0]
+    first.save()
+
+    other.register(['Milan'])
+    other.save()
+    reloaded = TeamRegistry.load(path)
+    assert reloaded.names == ['Sevilla', 'Betis', 'Milan']
+    assert reloaded.encode(['Milan', 'Juventus']).tolist() == [2, 3]
+
+
+def test_loader_returns_registry_categoricals(temp_data_dir):
+    """Team columns share one category list whose codes are the registry IDs."""
+    registry = TeamRegistry(['Getafe'], path=temp_data_dir / 'team_registry.json')
+    csv_path = temp_data_dir / 'matches.csv'
+    pd.DataFrame({
+        'Div': ['SP1', 'SP1'],
+        'HomeTeam': ['Sevilla', 'Getafe'],
+        'AwayTeam': ['Getafe', 'Betis'],
+        'FTR': ['H', 'D'],
+    }).to_csv(csv_path, index=False)
+
+    df = read_match_csv(csv_path, registry=registry)
+    assert df['HomeTeam'].cat.codes.tolist() == [1, 0]
+    assert df['AwayTeam'].cat.codes.tolist() == [0, 2]
+    assert df['HomeTeam'].dtype == df['AwayTeam'].dtype
+    assert isinstance(df['FTR'].dtype, pd.CategoricalDtype)
+    assert (df['HomeTeam'] == 'Getafe').tolist() == [False, True]
+
+    codes = compact_match_columns(pd.read_csv(csv_path), registry=registry, team_codes=True)
+    assert codes['AwayTeam'].dtype == np.int32
+    assert codes['AwayTeam'].tolist() == [0, 2]